@@ -14,7 +14,11 @@ if [[ ! -f "${SNAPSHOT_PATH}" ]]; then
   exit 1
 fi
 
+/opt/kurer-spb/.venv/bin/python /opt/kurer-spb/tg/backups/runner.py verify "${SNAPSHOT_PATH}"
+
 systemctl stop kurer-api kurer-bot
+# WAL sidecar files belong to the old database and must not be replayed onto the snapshot.
+rm -f "${TARGET_DB}-wal" "${TARGET_DB}-shm"
 cp "${SNAPSHOT_PATH}" "${TARGET_DB}"
 systemctl start kurer-api kurer-bot
 
@@ -2,20 +2,28 @@
 
 from __future__ import annotations
 
+import hmac
 import logging
 import sqlite3
 from pathlib import Path
 
-import aiosqlite
-from fastapi import APIRouter, FastAPI
+from fastapi import APIRouter, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, JSONResponse, Response
 
 from api.bootstrap import ensure_bootstrap_admin
 from api.config import settings
-from api.routers import applications, auth, campaigns, stats, users
-from database.db import DB_PATH, init_db
+from api.database import db_session
+from api.events import ApplicationWatcher, application_events
+from api.instrumentation import MetricsMiddleware, QueryBudgetMiddleware
+from api.routers import applications, auth, campaigns, debug, imports, stats, users
+from backups.scheduler import BackupScheduler
+from database.checkpoint import WalCheckpointManager
+from database.db import DB_PATH, DatabaseBusyError, init_db
 from migrations.runner import migrate_to_latest
+from telemetry.loop_monitor import LoopLagMonitor
+from telemetry.memory import register_process_metrics
+from telemetry.metrics import CONTENT_TYPE, REGISTRY
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +45,18 @@ def _admin_index() -> Path:
     return settings.admin_dist_dir.resolve() / "index.html"
 
 
+def _build_backup_scheduler() -> BackupScheduler:
+    return BackupScheduler(
+        db_path=DB_PATH,
+        backup_dir=settings.backup_dir or DB_PATH.parent / "backups",
+        interval_seconds=settings.backup_interval_minutes * 60,
+        keep_last=settings.backup_keep_last,
+        keep_daily=settings.backup_keep_daily,
+        pages_per_step=settings.backup_pages_per_step,
+        step_sleep=settings.backup_step_sleep_ms / 1000.0,
+    )
+
+
 def create_app() -> FastAPI:
     app = FastAPI(
         title=settings.app_name,
@@ -52,17 +72,49 @@ def create_app() -> FastAPI:
         allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
         allow_headers=["Authorization", "Content-Type"],
     )
+    app.add_middleware(
+        QueryBudgetMiddleware,
+        budget=settings.query_budget,
+        expose_header=settings.query_count_header,
+    )
+    if settings.metrics_enabled:
+        # Streams stay open for hours; they would swamp the latency histogram.
+        app.add_middleware(
+            MetricsMiddleware,
+            exclude_paths=("/metrics", f"{settings.api_prefix}/applications/stream"),
+        )
+        register_process_metrics()
+
+    @app.exception_handler(DatabaseBusyError)
+    async def database_busy_handler(_: Request, exc: DatabaseBusyError) -> JSONResponse:
+        logger.warning("Write lock timeout: %s", exc)
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Database is busy. Please retry."},
+            headers={"Retry-After": "1"},
+        )
 
     api_router = APIRouter(prefix=settings.api_prefix)
     api_router.include_router(auth.router)
     api_router.include_router(users.router)
     api_router.include_router(campaigns.router)
     api_router.include_router(applications.router)
+    api_router.include_router(imports.router)
     api_router.include_router(stats.router)
+    api_router.include_router(debug.router)
     app.include_router(api_router)
 
     @app.on_event("startup")
     async def startup_event() -> None:
+        # Started first so blocking startup work (migrations) is measured too
+        if settings.loop_monitor_interval_ms:
+            app.state.loop_monitor = LoopLagMonitor(
+                interval=settings.loop_monitor_interval_ms / 1000,
+                block_threshold=settings.loop_block_threshold_ms / 1000,
+                capture_stacks=settings.loop_capture_stacks,
+            )
+            app.state.loop_monitor.start()
+
         await init_db()
 
         if settings.auto_migrate:
@@ -76,9 +128,7 @@ def create_app() -> FastAPI:
             if applied:
                 logger.info("Applied DB migrations: %s", ", ".join(applied))
 
-        async with aiosqlite.connect(str(DB_PATH)) as db:
-            db.row_factory = aiosqlite.Row
-            await db.execute("PRAGMA foreign_keys = ON")
+        async with db_session() as db:
             created = await ensure_bootstrap_admin(db)
             if created:
                 logger.info(
@@ -86,10 +136,58 @@ def create_app() -> FastAPI:
                     settings.bootstrap_admin_login,
                 )
 
+        app.state.checkpoint_manager = WalCheckpointManager()
+        app.state.checkpoint_manager.start()
+
+        if settings.backup_enabled:
+            app.state.backup_scheduler = _build_backup_scheduler()
+            app.state.backup_scheduler.start()
+
+        if settings.stream_poll_ms:
+            app.state.application_watcher = ApplicationWatcher(
+                application_events,
+                applications.load_changed_after,
+                interval=settings.stream_poll_ms / 1000,
+            )
+            app.state.application_watcher.start()
+
+    @app.on_event("shutdown")
+    async def shutdown_event() -> None:
+        await imports.import_jobs.stop()
+
+        watcher: ApplicationWatcher | None = getattr(app.state, "application_watcher", None)
+        if watcher is not None:
+            await watcher.stop()
+
+        scheduler: BackupScheduler | None = getattr(app.state, "backup_scheduler", None)
+        if scheduler is not None:
+            await scheduler.stop()
+
+        checkpoint_manager: WalCheckpointManager | None = getattr(
+            app.state, "checkpoint_manager", None
+        )
+        if checkpoint_manager is not None:
+            await checkpoint_manager.stop()
+
+        loop_monitor: LoopLagMonitor | None = getattr(app.state, "loop_monitor", None)
+        if loop_monitor is not None:
+            await loop_monitor.stop()
+
     @app.get("/healthz", include_in_schema=False)
     async def healthz() -> dict[str, str]:
         return {"status": "ok"}
 
+    if settings.metrics_enabled:
+
+        @app.get("/metrics", include_in_schema=False)
+        async def metrics(request: Request) -> Response:
+            if settings.metrics_token:
+                # Compared as bytes: compare_digest rejects non-ASCII str.
+                supplied = request.headers.get("authorization", "").encode("latin-1")
+                if not hmac.compare_digest(supplied, f"Bearer {settings.metrics_token}".encode()):
+                    return JSONResponse(status_code=401, content={"detail": "Not authenticated."})
+            return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
+
     @app.get("/admin", include_in_schema=False)
     async def admin_root() -> Response:
         index_path = _admin_index()
@@ -7,6 +7,7 @@ import aiosqlite
 from api.config import settings
 from api.database import fetchone
 from api.security import hash_password
+from database.db import write_transaction
 
 
 async def ensure_bootstrap_admin(db: aiosqlite.Connection) -> bool:
@@ -22,17 +23,18 @@ async def ensure_bootstrap_admin(db: aiosqlite.Connection) -> bool:
     if existing:
         return False
 
-    await db.execute(
-        """
-        INSERT INTO users (login, password_hash, name, role, percent, is_active, created_at)
-        VALUES (?, ?, ?, 'admin', NULL, 1, datetime('now'))
-        """,
-        (
-            settings.bootstrap_admin_login,
-            hash_password(settings.bootstrap_admin_password),
-            settings.bootstrap_admin_name,
-        ),
-    )
-    await db.commit()
+    password_hash = hash_password(settings.bootstrap_admin_password)
+    async with write_transaction(db, site="bootstrap_admin"):
+        await db.execute(
+            """
+            INSERT INTO users (login, password_hash, name, role, percent, is_active, created_at)
+            VALUES (?, ?, ?, 'admin', NULL, 1, datetime('now'))
+            """,
+            (
+                settings.bootstrap_admin_login,
+                password_hash,
+                settings.bootstrap_admin_name,
+            ),
+        )
     return True
 
@@ -54,6 +54,32 @@ class Settings:
     bootstrap_admin_password: str
     bootstrap_admin_name: str
     auto_migrate: bool
+    backup_enabled: bool
+    backup_dir: Path | None
+    backup_interval_minutes: int
+    backup_keep_last: int
+    backup_keep_daily: int
+    backup_pages_per_step: int
+    backup_step_sleep_ms: int
+    metrics_enabled: bool
+    metrics_token: str
+    query_budget: int
+    query_count_header: bool
+    loop_monitor_interval_ms: int
+    loop_block_threshold_ms: int
+    loop_capture_stacks: bool
+    profile_max_seconds: int
+    profile_max_concurrent: int
+    memory_trace_frames: int
+    stream_poll_ms: int
+    stream_heartbeat_seconds: int
+    stream_max_clients: int
+    stream_queue_size: int
+    stream_ticket_ttl_seconds: int
+    bulk_update_max_items: int
+    import_max_bytes: int
+    import_batch_size: int
+    import_dir: Path | None
 
 
 def _resolve_admin_dist_dir(raw_value: str) -> Path:
@@ -63,6 +89,12 @@ def _resolve_admin_dist_dir(raw_value: str) -> Path:
     return (REPO_DIR / raw_path).resolve()
 
 
+def _resolve_optional_dir(raw_value: str) -> Path | None:
+    if not raw_value:
+        return None
+    return _resolve_admin_dist_dir(raw_value)
+
+
 def _build_settings() -> Settings:
     admin_dist_raw = os.getenv("ADMIN_DIST_DIR", "admin-dist").strip() or "admin-dist"
     return Settings(
@@ -92,6 +124,32 @@ def _build_settings() -> Settings:
         bootstrap_admin_name=os.getenv("ADMIN_BOOTSTRAP_NAME", "Administrator").strip()
         or "Administrator",
         auto_migrate=_as_bool(os.getenv("API_AUTO_MIGRATE", "true"), default=True),
+        backup_enabled=_as_bool(os.getenv("API_BACKUP_ENABLED", ""), default=False),
+        backup_dir=_resolve_optional_dir(os.getenv("API_BACKUP_DIR", "").strip()),
+        backup_interval_minutes=_int_env("API_BACKUP_INTERVAL_MINUTES", 360),
+        backup_keep_last=_int_env("API_BACKUP_KEEP_LAST", 7),
+        backup_keep_daily=_int_env("API_BACKUP_KEEP_DAILY", 14),
+        backup_pages_per_step=_int_env("API_BACKUP_PAGES_PER_STEP", 256),
+        backup_step_sleep_ms=_int_env("API_BACKUP_STEP_SLEEP_MS", 50),
+        metrics_enabled=_as_bool(os.getenv("API_METRICS_ENABLED", "true"), default=True),
+        metrics_token=os.getenv("API_METRICS_TOKEN", "").strip(),
+        query_budget=_int_env("API_QUERY_BUDGET", 25),
+        query_count_header=_as_bool(os.getenv("API_QUERY_COUNT_HEADER", ""), default=False),
+        loop_monitor_interval_ms=_int_env("LOOP_MONITOR_INTERVAL_MS", 250),
+        loop_block_threshold_ms=_int_env("LOOP_BLOCK_THRESHOLD_MS", 100),
+        loop_capture_stacks=_as_bool(os.getenv("LOOP_CAPTURE_STACKS", ""), default=False),
+        profile_max_seconds=_int_env("API_PROFILE_MAX_SECONDS", 60),
+        profile_max_concurrent=_int_env("API_PROFILE_MAX_CONCURRENT", 1),
+        memory_trace_frames=_int_env("MEMORY_TRACE_FRAMES", 10),
+        stream_poll_ms=_int_env("API_STREAM_POLL_MS", 1000),
+        stream_heartbeat_seconds=_int_env("API_STREAM_HEARTBEAT_SECONDS", 15),
+        stream_max_clients=_int_env("API_STREAM_MAX_CLIENTS", 100),
+        stream_queue_size=_int_env("API_STREAM_QUEUE_SIZE", 256),
+        stream_ticket_ttl_seconds=_int_env("API_STREAM_TICKET_TTL_SECONDS", 30),
+        bulk_update_max_items=_int_env("API_BULK_UPDATE_MAX_ITEMS", 1000),
+        import_max_bytes=_int_env("API_IMPORT_MAX_BYTES", 100 * 1024 * 1024),
+        import_batch_size=_int_env("API_IMPORT_BATCH_SIZE", 1000),
+        import_dir=_resolve_optional_dir(os.getenv("API_IMPORT_DIR", "").strip()),
     )
 
 
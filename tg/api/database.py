@@ -2,24 +2,37 @@
 
 from __future__ import annotations
 
+import time
 from collections.abc import AsyncIterator, Sequence
 from contextlib import asynccontextmanager
 from typing import Any
 
 import aiosqlite
 
-from database.db import DB_PATH
+from database.db import connect
+from telemetry.metrics import REGISTRY
+
+DB_QUERY_SECONDS = REGISTRY.histogram(
+    "api_db_query_duration_seconds",
+    "Time to execute a query and fetch its rows, by helper (fetchone, fetchall).",
+    ("operation",),
+)
+DB_SESSIONS_OPEN = REGISTRY.gauge(
+    "api_db_sessions_open",
+    "SQLite connections currently held by API requests and tasks.",
+)
 
 
 @asynccontextmanager
 async def db_session() -> AsyncIterator[aiosqlite.Connection]:
-    conn = await aiosqlite.connect(str(DB_PATH))
-    conn.row_factory = aiosqlite.Row
-    await conn.execute("PRAGMA foreign_keys = ON")
+    DB_SESSIONS_OPEN.inc()
     try:
-        yield conn
+        async with connect() as conn:
+            conn.row_factory = aiosqlite.Row
+            await conn.execute("PRAGMA foreign_keys = ON")
+            yield conn
     finally:
-        await conn.close()
+        DB_SESSIONS_OPEN.dec()
 
 
 async def get_db() -> AsyncIterator[aiosqlite.Connection]:
@@ -32,8 +45,10 @@ async def fetchone(
     query: str,
     params: Sequence[Any] = (),
 ) -> dict[str, Any] | None:
+    started = time.perf_counter()
     cursor = await conn.execute(query, params)
     row = await cursor.fetchone()
+    DB_QUERY_SECONDS.observe(time.perf_counter() - started, operation="fetchone")
     return dict(row) if row else None
 
 
@@ -42,7 +57,9 @@ async def fetchall(
     query: str,
     params: Sequence[Any] = (),
 ) -> list[dict[str, Any]]:
+    started = time.perf_counter()
     cursor = await conn.execute(query, params)
     rows = await cursor.fetchall()
+    DB_QUERY_SECONDS.observe(time.perf_counter() - started, operation="fetchall")
     return [dict(row) for row in rows]
 
@@ -5,11 +5,14 @@ from __future__ import annotations
 from typing import Any
 
 import aiosqlite
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
-from api.database import fetchone, get_db
+from api.config import settings
+from api.database import db_session, fetchone, get_db
+from api.events import application_events
 from api.security import TokenError, decode_token
+from api.stream_tickets import stream_tickets
 
 bearer_scheme = HTTPBearer(auto_error=False)
 
@@ -26,18 +29,34 @@ def _normalize_user(user: dict[str, Any]) -> dict[str, Any]:
     }
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
-    db: aiosqlite.Connection = Depends(get_db),
-) -> dict[str, Any]:
-    if not credentials or credentials.scheme.lower() != "bearer":
+async def _load_active_user(db: aiosqlite.Connection, user_id: int) -> dict[str, Any]:
+    user = await fetchone(
+        db,
+        """
+        SELECT id, login, name, role, percent, is_active, created_at
+        FROM users
+        WHERE id = ?
+        """,
+        (user_id,),
+    )
+    if not user or not user["is_active"]:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User is inactive or does not exist.",
+        )
+
+    return _normalize_user(user)
+
+
+async def _authenticate(token: str | None, db: aiosqlite.Connection) -> dict[str, Any]:
+    if not token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Authentication required.",
         )
 
     try:
-        payload = decode_token(credentials.credentials, expected_type="access")
+        payload = decode_token(token, expected_type="access")
         user_id = int(payload["sub"])
     except (TokenError, ValueError) as exc:
         raise HTTPException(
@@ -45,26 +64,78 @@ async def get_current_user(
             detail=str(exc),
         ) from exc
 
-    user = await fetchone(
-        db,
-        """
-        SELECT id, login, name, role, percent, is_active, created_at
-        FROM users
-        WHERE id = ?
-        """,
-        (user_id,),
-    )
-    if not user or not user["is_active"]:
+    user = await _load_active_user(db, user_id)
+    user["token_expires_at"] = int(payload["exp"])
+    return user
+
+
+def _bearer_token(credentials: HTTPAuthorizationCredentials | None) -> str | None:
+    if not credentials or credentials.scheme.lower() != "bearer":
+        return None
+    return credentials.credentials
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
+    db: aiosqlite.Connection = Depends(get_db),
+) -> dict[str, Any]:
+    return await _authenticate(_bearer_token(credentials), db)
+
+
+async def get_current_user_short_session(
+    credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
+) -> dict[str, Any]:
+    """
+    `get_current_user` for long-running requests (streams, uploads): the user
+    is loaded on a session closed right away, while a `get_db` connection
+    would stay open until the response finishes.
+    """
+    async with db_session() as db:
+        return await _authenticate(_bearer_token(credentials), db)
+
+
+def ensure_stream_capacity() -> None:
+    """Raise 503 when `API_STREAM_MAX_CLIENTS` event streams are already open."""
+    if application_events.subscriber_count >= settings.stream_max_clients:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many open streams.",
+        )
+
+
+async def get_stream_user(
+    credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
+    ticket: str | None = Query(default=None),
+) -> dict[str, Any]:
+    """
+    `get_current_user_short_session` that also accepts a single-use
+    `?ticket=` from `api.stream_tickets`, since browsers' EventSource cannot
+    send headers. Access tokens are never accepted in the URL.
+
+    Capacity is checked before the ticket is spent, so a client turned away
+    with 503 can retry with the same ticket.
+    """
+    if _bearer_token(credentials) or not ticket:
+        return await get_current_user_short_session(credentials)
+
+    ensure_stream_capacity()
+    redeemed = stream_tickets.redeem(ticket)
+    if redeemed is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User is inactive or does not exist.",
+            detail="Stream ticket is invalid or expired.",
         )
+    async with db_session() as db:
+        user = await _load_active_user(db, redeemed.user_id)
+    user["token_expires_at"] = int(redeemed.session_expires_at)
+    return user
 
-    return _normalize_user(user)
 
+def require_roles(*roles: str, short_session: bool = False):
+    """`short_session` authenticates like `get_current_user_short_session`."""
+    user_dependency = get_current_user_short_session if short_session else get_current_user
 
-def require_roles(*roles: str):
-    async def _require(user: dict[str, Any] = Depends(get_current_user)) -> dict[str, Any]:
+    async def _require(user: dict[str, Any] = Depends(user_dependency)) -> dict[str, Any]:
         if user["role"] not in roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -0,0 +1,221 @@
+"""
+In-process pub/sub of application events for the SSE stream.
+
+`ApplicationWatcher` is the single producer. It follows the applications'
+`row_version` (migration 0009), so inserts and updates from any process (the
+bot, other API workers) are published exactly once, in commit order. It polls
+`PRAGMA data_version`, which changes only when another connection commits, so
+an idle database costs one pragma per tick and no table reads. Routes that
+change applications call `wake()` to skip the wait for the next tick.
+
+Subscribers get a bounded queue filtered by investor. A subscriber that falls
+`queue_size` events behind is sent a single `resync` event and dropped; the
+client catches up through `/applications/changes` and reconnects instead of
+the server buffering forever.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, replace
+from typing import Any
+
+import aiosqlite
+
+from api.config import settings
+from api.database import db_session
+from telemetry.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+STREAM_EVENTS = REGISTRY.counter(
+    "api_stream_events_total",
+    "Application events published to SSE subscribers, by kind.",
+    ("kind",),
+)
+STREAM_OVERFLOWS = REGISTRY.counter(
+    "api_stream_overflows_total",
+    "SSE subscribers dropped because they fell too far behind.",
+)
+STREAM_SUBSCRIBERS = REGISTRY.gauge(
+    "api_stream_subscribers",
+    "Open SSE application streams.",
+)
+
+
+@dataclass(frozen=True)
+class ApplicationEvent:
+    kind: str
+    event_id: int
+    investor_id: int | None
+    data: dict[str, Any]
+
+    def encode(self) -> bytes:
+        payload = json.dumps(self.data, ensure_ascii=False, separators=(",", ":"))
+        return f"id: {self.event_id}\nevent: {self.kind}\ndata: {payload}\n\n".encode()
+
+
+RESYNC = ApplicationEvent(kind="resync", event_id=0, investor_id=None, data={})
+# Last event of a stream whose access token expired or whose user was
+# deactivated; the client must get a new ticket to reconnect.
+SESSION_EXPIRED = ApplicationEvent(kind="session.expired", event_id=0, investor_id=None, data={})
+
+
+class Subscription:
+    def __init__(self, investor_id: int | None, queue_size: int) -> None:
+        # None sees every application (admins).
+        self.investor_id = investor_id
+        self.queue: asyncio.Queue[ApplicationEvent] = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def wants(self, event: ApplicationEvent) -> bool:
+        return self.investor_id is None or self.investor_id == event.investor_id
+
+    def offer(self, event: ApplicationEvent) -> None:
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            STREAM_OVERFLOWS.inc()
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+    async def get(self) -> ApplicationEvent:
+        return await self.queue.get()
+
+
+class ApplicationEventBus:
+    def __init__(self, queue_size: int = 256) -> None:
+        self.queue_size = max(1, queue_size)
+        self._subscribers: set[Subscription] = set()
+        self._wakeup = asyncio.Event()
+        STREAM_SUBSCRIBERS.set_function(lambda: len(self._subscribers))
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, investor_id: int | None) -> Subscription:
+        subscription = Subscription(investor_id, self.queue_size)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    def wake(self) -> None:
+        """Ask the watcher to look for changes now."""
+        self._wakeup.set()
+
+    async def wait_for_wakeup(self, timeout: float) -> None:
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    def publish(self, event: ApplicationEvent) -> None:
+        STREAM_EVENTS.inc(kind=event.kind)
+        for subscription in tuple(self._subscribers):
+            if subscription.wants(event):
+                subscription.offer(event)
+
+
+# Loads applications changed after the given row version, oldest change first,
+# as `application.updated` events whose id is the row version.
+ApplicationLoader = Callable[[aiosqlite.Connection, int, int], Awaitable[list[ApplicationEvent]]]
+
+
+class ApplicationWatcher:
+    """
+    Publishes application changes committed by any connection.
+
+    Keeps a high-water mark of `row_version`; on every tick where
+    `PRAGMA data_version` moved it loads rows above the mark in pages of
+    `batch_size`. Rows above the `id` mark are published as
+    `application.created`. Without subscribers only the marks are refreshed.
+    """
+
+    def __init__(
+        self,
+        bus: ApplicationEventBus,
+        loader: ApplicationLoader,
+        *,
+        interval: float = 1.0,
+        batch_size: int = 500,
+    ) -> None:
+        self.bus = bus
+        self.loader = loader
+        self.interval = max(0.05, interval)
+        self.batch_size = max(1, batch_size)
+        self.high_water: int | None = None
+        self.last_id = 0
+        self._last_data_version: int | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="application-watcher")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _changed(self, db: aiosqlite.Connection) -> bool:
+        cursor = await db.execute("PRAGMA data_version")
+        row = await cursor.fetchone()
+        version = int(row[0]) if row else 0
+        changed = self._last_data_version != version
+        self._last_data_version = version
+        return changed
+
+    async def tick(self, db: aiosqlite.Connection) -> int:
+        """Publish new applications; returns how many were published."""
+        if not await self._changed(db) and self.high_water is not None:
+            return 0
+
+        if self.high_water is None or not self.bus.subscriber_count:
+            cursor = await db.execute(
+                "SELECT COALESCE(MAX(row_version), 0), COALESCE(MAX(id), 0) FROM applications"
+            )
+            row = await cursor.fetchone()
+            self.high_water, self.last_id = (int(row[0]), int(row[1])) if row else (0, 0)
+            return 0
+
+        published = 0
+        while True:
+            events = await self.loader(db, self.high_water, self.batch_size)
+            for event in events:
+                application_id = int(event.data["id"])
+                if application_id > self.last_id:
+                    event = replace(event, kind="application.created")
+                    self.last_id = application_id
+                self.bus.publish(event)
+                self.high_water = max(self.high_water, event.event_id)
+            published += len(events)
+            if len(events) < self.batch_size:
+                return published
+
+    async def _run(self) -> None:
+        async with db_session() as db:
+            while True:
+                try:
+                    await self.tick(db)
+                except aiosqlite.Error as exc:
+                    logger.warning("Application watcher failed: %s", exc)
+                await self.bus.wait_for_wakeup(self.interval)
+
+
+application_events = ApplicationEventBus(queue_size=settings.stream_queue_size)
@@ -0,0 +1,141 @@
+"""HTTP request metrics and SQL query budgets for the admin API."""
+
+from __future__ import annotations
+
+import logging
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from database.instrumentation import track_queries
+from telemetry.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total",
+    "HTTP requests by method, route template and status code.",
+    ("method", "route", "status"),
+)
+HTTP_LATENCY = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by method, route template and status code.",
+    ("method", "route", "status"),
+)
+HTTP_IN_FLIGHT = REGISTRY.gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being served.",
+)
+
+QUERIES_PER_REQUEST = REGISTRY.histogram(
+    "api_db_queries_per_request",
+    "SQL statements executed per request, by route template.",
+    ("route",),
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+QUERY_BUDGET_EXCEEDED = REGISTRY.counter(
+    "api_query_budget_exceeded_total",
+    "Requests that executed more SQL statements than API_QUERY_BUDGET.",
+    ("route",),
+)
+
+UNMATCHED_ROUTE = "<unmatched>"
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+
+
+def route_template(scope: Scope) -> str:
+    """
+    Route path template (`/api/campaigns/{campaign_id}`) so label values stay
+    bounded; raw paths of unknown URLs are never used as labels.
+    """
+    # Routes of included routers carry only their own prefix; newer FastAPI
+    # versions keep the full template in the effective route context.
+    fastapi_scope = scope.get("fastapi") or {}
+    for candidate in (fastapi_scope.get("effective_route_context"), scope.get("route")):
+        path = getattr(candidate, "path_format", None) or getattr(candidate, "path", None)
+        if path:
+            return path
+    return UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware; measures the full request including streaming bodies.
+    """
+
+    def __init__(self, app: ASGIApp, *, exclude_paths: tuple[str, ...] = ("/metrics",)) -> None:
+        self.app = app
+        self.exclude_paths = exclude_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope.get("path") in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            labels = {
+                "method": scope["method"],
+                "route": route_template(scope),
+                "status": str(status_code),
+            }
+            HTTP_REQUESTS.inc(**labels)
+            HTTP_LATENCY.observe(time.perf_counter() - started, **labels)
+
+
+class QueryBudgetMiddleware:
+    """
+    Counts SQL statements per request and warns when a request exceeds
+    `budget`, listing repeated statements (the usual N+1 signature).
+
+    With `expose_header` the count is also returned in `X-DB-Query-Count`,
+    which lets tests assert query counts through a plain HTTP client.
+    """
+
+    def __init__(self, app: ASGIApp, *, budget: int, expose_header: bool = False) -> None:
+        self.app = app
+        self.budget = budget
+        self.expose_header = expose_header
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as tracker:
+
+            async def send_wrapper(message: Message) -> None:
+                if self.expose_header and message["type"] == "http.response.start":
+                    headers = MutableHeaders(scope=message)
+                    headers[QUERY_COUNT_HEADER] = str(tracker.count)
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                if tracker.count:
+                    route = route_template(scope)
+                    QUERIES_PER_REQUEST.observe(tracker.count, route=route)
+                    if self.budget and tracker.count > self.budget:
+                        QUERY_BUDGET_EXCEEDED.inc(route=route)
+                        logger.warning(
+                            "Query budget exceeded: %s %s ran %s (budget %s, %.1f ms in SQL)",
+                            scope["method"],
+                            route,
+                            tracker.summary(),
+                            self.budget,
+                            tracker.total_seconds * 1000,
+                        )
@@ -8,6 +8,12 @@ from collections import defaultdict, deque
 from collections.abc import Hashable
 
 from api.config import settings
+from telemetry.metrics import REGISTRY
+
+TRACKED_KEYS = REGISTRY.gauge(
+    "api_rate_limiter_keys",
+    "Keys (client addresses) currently tracked by the login rate limiter.",
+)
 
 
 class SlidingWindowRateLimiter:
@@ -16,10 +22,23 @@ class SlidingWindowRateLimiter:
         self.window_seconds = max(1, window_seconds)
         self._events: defaultdict[Hashable, deque[float]] = defaultdict(deque)
         self._lock = asyncio.Lock()
+        self._last_sweep = time.time()
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def _sweep(self, now: float) -> None:
+        # Keys that never come back would otherwise stay forever.
+        stale = [key for key, queue in self._events.items() if not queue or now - queue[-1] > self.window_seconds]
+        for key in stale:
+            del self._events[key]
+        self._last_sweep = now
 
     async def allow(self, key: Hashable) -> tuple[bool, int]:
         now = time.time()
         async with self._lock:
+            if now - self._last_sweep > self.window_seconds:
+                self._sweep(now)
             queue = self._events[key]
             while queue and now - queue[0] > self.window_seconds:
                 queue.popleft()
@@ -40,4 +59,5 @@ login_rate_limiter = SlidingWindowRateLimiter(
     limit=settings.login_rate_limit,
     window_seconds=settings.login_rate_window_seconds,
 )
+TRACKED_KEYS.set_function(lambda: len(login_rate_limiter))
 
@@ -2,15 +2,31 @@
 
 from __future__ import annotations
 
+import asyncio
+import time
+from collections.abc import AsyncIterator
 from datetime import date
 from typing import Any
 
 import aiosqlite
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 
-from api.database import fetchall, fetchone, get_db
-from api.deps import get_current_user
-from api.schemas import ApplicationOut, ApplicationUpdate
+from api.config import settings
+from api.database import db_session, fetchall, fetchone, get_db
+from api.deps import ensure_stream_capacity, get_current_user, get_stream_user
+from api.events import RESYNC, SESSION_EXPIRED, ApplicationEvent, Subscription, application_events
+from api.schemas import (
+    ApplicationBulkUpdate,
+    ApplicationBulkUpdateResponse,
+    ApplicationBulkUpdateResult,
+    ApplicationChangesPage,
+    ApplicationOut,
+    ApplicationUpdate,
+    StreamTicketOut,
+)
+from api.stream_tickets import stream_tickets
+from database.db import APPLICATION_PATCH_SQL, write_transaction
 
 router = APIRouter(prefix="/applications", tags=["applications"])
 
@@ -31,6 +47,8 @@ def _serialize_application(row: dict[str, Any]) -> ApplicationOut:
         campaign_name=row.get("campaign_name"),
         status=row.get("status"),
         revenue=float(row["revenue"]) if row["revenue"] is not None else None,
+        row_version=row.get("row_version"),
+        updated_at=row.get("updated_at"),
     )
 
 
@@ -50,6 +68,8 @@ def _base_applications_query() -> str:
             a.campaign_id,
             a.revenue,
             COALESCE(a.status, 'new') AS status,
+            a.row_version,
+            a.updated_at,
             c.name AS campaign_name,
             c.investor_id
         FROM applications a
@@ -58,6 +78,145 @@ def _base_applications_query() -> str:
     """
 
 
+async def load_changed_after(
+    db: aiosqlite.Connection,
+    after_version: int,
+    limit: int,
+) -> list[ApplicationEvent]:
+    """`ApplicationWatcher` loader: applications changed after a row version."""
+    rows = await fetchall(
+        db,
+        _base_applications_query() + " AND a.row_version > ? ORDER BY a.row_version LIMIT ?",
+        (after_version, limit),
+    )
+    return [
+        ApplicationEvent(
+            kind="application.updated",
+            event_id=int(row["row_version"]),
+            investor_id=int(row["investor_id"]) if row["investor_id"] is not None else None,
+            data=_serialize_application(row).model_dump(mode="json"),
+        )
+        for row in rows
+    ]
+
+
+async def _user_is_active(user_id: int) -> bool:
+    async with db_session() as db:
+        row = await fetchone(db, "SELECT is_active FROM users WHERE id = ?", (user_id,))
+    return bool(row and row["is_active"])
+
+
+async def _event_stream(
+    subscription: Subscription,
+    user_id: int,
+    session_expires_at: float,
+) -> AsyncIterator[bytes]:
+    heartbeat = settings.stream_heartbeat_seconds
+    next_user_check = time.monotonic() + heartbeat
+    try:
+        yield b"retry: 5000\n\n"
+        while True:
+            remaining = session_expires_at - time.time()
+            event: ApplicationEvent | None = None
+            if remaining > 0:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), timeout=min(heartbeat, remaining))
+                except asyncio.TimeoutError:
+                    pass
+
+            # The stream must not outlive the token it was opened with, nor
+            # the user's account: both are checked at most a heartbeat apart.
+            if time.time() >= session_expires_at:
+                yield SESSION_EXPIRED.encode()
+                return
+            if time.monotonic() >= next_user_check:
+                next_user_check = time.monotonic() + heartbeat
+                if not await _user_is_active(user_id):
+                    yield SESSION_EXPIRED.encode()
+                    return
+
+            if event is None:
+                # Comment line; keeps proxies from closing an idle connection.
+                yield b": keep-alive\n\n"
+                continue
+            yield event.encode()
+            if event is RESYNC:
+                return
+    finally:
+        application_events.unsubscribe(subscription)
+
+
+@router.post("/stream/tickets", response_model=StreamTicketOut)
+async def create_stream_ticket(
+    current_user: dict[str, Any] = Depends(get_current_user),
+) -> StreamTicketOut:
+    """
+    Single-use ticket for `GET /applications/stream?ticket=`, for clients
+    such as EventSource that cannot send the Authorization header.
+    """
+    ticket = stream_tickets.issue(int(current_user["id"]), current_user["token_expires_at"])
+    return StreamTicketOut(ticket=ticket, expires_in=stream_tickets.ttl_seconds)
+
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_applications(
+    current_user: dict[str, Any] = Depends(get_stream_user),
+) -> StreamingResponse:
+    """
+    Server-Sent Events: `application.created` (including bot submissions) and
+    `application.updated`, each carrying an `ApplicationOut`. Investors only
+    receive applications of their campaigns. After `resync` the client must
+    catch up with `GET /applications/changes?since=<last event id>` and
+    reconnect; event ids are row versions. `session.expired` ends the stream
+    when the access token expires or the user is deactivated.
+
+    Authenticate with the Authorization header or a `?ticket=` from
+    `POST /applications/stream/tickets`.
+    """
+    ensure_stream_capacity()
+    investor_id = int(current_user["id"]) if current_user["role"] == "investor" else None
+    # Subscribed with no await since the capacity check, so concurrent opens
+    # cannot exceed the limit. Starlette starts iterating the stream right
+    # after the route returns; its finally clause releases the slot.
+    subscription = application_events.subscribe(investor_id)
+    return StreamingResponse(
+        _event_stream(subscription, int(current_user["id"]), current_user["token_expires_at"]),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/changes", response_model=ApplicationChangesPage)
+async def list_application_changes(
+    since: int = Query(default=0, ge=0),
+    limit: int = Query(default=500, ge=1, le=1000),
+    current_user: dict[str, Any] = Depends(get_current_user),
+    db: aiosqlite.Connection = Depends(get_db),
+) -> ApplicationChangesPage:
+    """
+    Applications inserted or updated after row version `since`, oldest change
+    first. Pass `next_since` back until `has_more` is false; keep it for the
+    next sync. Applications are never deleted, so there are no tombstones.
+    """
+    query = _base_applications_query() + " AND a.row_version > ?"
+    params: list[Any] = [since]
+
+    if current_user["role"] == "investor":
+        query += " AND c.investor_id = ?"
+        params.append(int(current_user["id"]))
+
+    query += " ORDER BY a.row_version LIMIT ?"
+    params.append(limit + 1)
+
+    rows = await fetchall(db, query, tuple(params))
+    items = [_serialize_application(row) for row in rows[:limit]]
+    return ApplicationChangesPage(
+        items=items,
+        next_since=items[-1].row_version if items else since,
+        has_more=len(rows) > limit,
+    )
+
+
 @router.get("", response_model=list[ApplicationOut])
 async def list_applications(
     campaign: int | None = Query(default=None),
@@ -96,6 +255,101 @@ async def list_applications(
     return [_serialize_application(row) for row in rows]
 
 
+def _placeholders(values: list[Any]) -> str:
+    return ", ".join("?" for _ in values)
+
+
+@router.patch("", response_model=ApplicationBulkUpdateResponse)
+async def bulk_update_applications(
+    payload: ApplicationBulkUpdate,
+    current_user: dict[str, Any] = Depends(get_current_user),
+    db: aiosqlite.Connection = Depends(get_db),
+) -> ApplicationBulkUpdateResponse:
+    """
+    Apply many `PUT /{id}` updates at once: ownership of all ids is checked in
+    one query and the writes go through one `executemany` in one transaction.
+    Items that fail (unknown id, other investor's campaign, nothing to set,
+    repeated id) are reported in `results` and do not block the others.
+    """
+    if len(payload.items) > settings.bulk_update_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.bulk_update_max_items} items per request.",
+        )
+
+    ids = list(dict.fromkeys(item.id for item in payload.items))
+    owners = {
+        int(row["id"]): row["investor_id"]
+        for row in await fetchall(
+            db,
+            f"""
+            SELECT a.id, c.investor_id
+            FROM applications a
+            LEFT JOIN campaigns c ON c.id = a.campaign_id
+            WHERE a.id IN ({_placeholders(ids)})
+            """,
+            ids,
+        )
+    }
+
+    is_investor = current_user["role"] == "investor"
+    errors: dict[int, str] = {}
+    params: list[tuple[Any, ...]] = []
+    seen: set[int] = set()
+    for position, item in enumerate(payload.items):
+        changes = item.model_dump(exclude_unset=True, exclude={"id"})
+        if item.id in seen:
+            errors[position] = "Duplicate id in request."
+        elif item.id not in owners:
+            errors[position] = "Application not found."
+        elif is_investor and int(owners[item.id] or -1) != int(current_user["id"]):
+            errors[position] = "You cannot update this application."
+        elif not changes:
+            errors[position] = "No fields to update."
+        else:
+            params.append(
+                (
+                    "status" in changes,
+                    changes.get("status"),
+                    "revenue" in changes,
+                    changes.get("revenue"),
+                    item.id,
+                )
+            )
+        seen.add(item.id)
+
+    rows: dict[int, dict[str, Any]] = {}
+    if params:
+        async with write_transaction(db, site="applications.bulk_update"):
+            await db.executemany(APPLICATION_PATCH_SQL, params)
+        updated_ids = [item_params[-1] for item_params in params]
+        rows = {
+            int(row["id"]): row
+            for row in await fetchall(
+                db,
+                _base_applications_query() + f" AND a.id IN ({_placeholders(updated_ids)})",
+                updated_ids,
+            )
+        }
+        application_events.wake()
+
+    results = [
+        ApplicationBulkUpdateResult(id=item.id, ok=False, error=errors[position])
+        if position in errors
+        else ApplicationBulkUpdateResult(
+            id=item.id,
+            ok=True,
+            application=_serialize_application(rows[item.id]),
+        )
+        for position, item in enumerate(payload.items)
+    ]
+    return ApplicationBulkUpdateResponse(
+        updated=len(params),
+        failed=len(errors),
+        results=results,
+    )
+
+
 @router.put("/{application_id}", response_model=ApplicationOut)
 async def update_application(
     application_id: int,
@@ -146,8 +400,8 @@ async def update_application(
 
     set_clause = ", ".join(f"{field} = ?" for field in updates)
     params = list(updates.values()) + [application_id]
-    await db.execute(f"UPDATE applications SET {set_clause} WHERE id = ?", params)
-    await db.commit()
+    async with write_transaction(db, site="applications.update"):
+        await db.execute(f"UPDATE applications SET {set_clause} WHERE id = ?", params)
 
     row = await fetchone(
         db,
@@ -169,5 +423,6 @@ async def update_application(
             detail="You cannot access this application.",
         )
 
+    application_events.wake()
     return _serialize_application(row)
 
@@ -22,6 +22,7 @@ from api.security import (
     hash_token,
     verify_password,
 )
+from database.db import write_transaction
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -77,22 +78,22 @@ async def login(
         tz=timezone.utc,
     ).strftime("%Y-%m-%d %H:%M:%S")
 
-    await db.execute(
-        """
-        INSERT INTO refresh_tokens (
-            user_id, token_hash, expires_at, created_at, revoked_at, ip, user_agent
+    async with write_transaction(db, site="auth.login"):
+        await db.execute(
+            """
+            INSERT INTO refresh_tokens (
+                user_id, token_hash, expires_at, created_at, revoked_at, ip, user_agent
+            )
+            VALUES (?, ?, ?, datetime('now'), NULL, ?, ?)
+            """,
+            (
+                int(user["id"]),
+                hash_token(refresh_token),
+                refresh_expires_at,
+                client_ip,
+                request.headers.get("user-agent", "")[:255],
+            ),
         )
-        VALUES (?, ?, ?, datetime('now'), NULL, ?, ?)
-        """,
-        (
-            int(user["id"]),
-            hash_token(refresh_token),
-            refresh_expires_at,
-            client_ip,
-            request.headers.get("user-agent", "")[:255],
-        ),
-    )
-    await db.commit()
 
     return AuthResponse(
         access_token=access_token,
@@ -153,12 +154,6 @@ async def refresh_tokens(
             detail="Refresh token is invalid or expired.",
         )
 
-    # Rotate refresh token to reduce replay risk.
-    await db.execute(
-        "UPDATE refresh_tokens SET revoked_at = ? WHERE token_hash = ? AND revoked_at IS NULL",
-        (now_utc, token_hash),
-    )
-
     access_token, access_claims = create_access_token(user_id, token_row["role"])
     refresh_token, refresh_claims = create_refresh_token(user_id, token_row["role"])
     refresh_expires_at = datetime.fromtimestamp(
@@ -167,22 +162,34 @@ async def refresh_tokens(
     ).strftime("%Y-%m-%d %H:%M:%S")
 
     client_ip = request.client.host if request.client and request.client.host else "unknown"
-    await db.execute(
-        """
-        INSERT INTO refresh_tokens (
-            user_id, token_hash, expires_at, created_at, revoked_at, ip, user_agent
+    async with write_transaction(db, site="auth.refresh"):
+        # Rotate refresh token to reduce replay risk.
+        cursor = await db.execute(
+            "UPDATE refresh_tokens SET revoked_at = ? WHERE token_hash = ? AND revoked_at IS NULL",
+            (now_utc, token_hash),
+        )
+        if cursor.rowcount == 0:
+            # A concurrent refresh already rotated this token.
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Refresh token is invalid or expired.",
+            )
+
+        await db.execute(
+            """
+            INSERT INTO refresh_tokens (
+                user_id, token_hash, expires_at, created_at, revoked_at, ip, user_agent
+            )
+            VALUES (?, ?, ?, datetime('now'), NULL, ?, ?)
+            """,
+            (
+                user_id,
+                hash_token(refresh_token),
+                refresh_expires_at,
+                client_ip,
+                request.headers.get("user-agent", "")[:255],
+            ),
         )
-        VALUES (?, ?, ?, datetime('now'), NULL, ?, ?)
-        """,
-        (
-            user_id,
-            hash_token(refresh_token),
-            refresh_expires_at,
-            client_ip,
-            request.headers.get("user-agent", "")[:255],
-        ),
-    )
-    await db.commit()
 
     return AuthResponse(
         access_token=access_token,
@@ -202,22 +209,28 @@ async def logout(
     revoked = 0
     now_utc = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
 
-    if payload and payload.refresh_token:
-        token_hash = hash_token(payload.refresh_token)
-        cursor = await db.execute(
-            """
-            UPDATE refresh_tokens
-            SET revoked_at = ?
-            WHERE token_hash = ? AND revoked_at IS NULL
-            """,
-            (now_utc, token_hash),
-        )
-        revoked += cursor.rowcount
-
+    token_hash = hash_token(payload.refresh_token) if payload and payload.refresh_token else None
+    user_id: int | None = None
     if credentials and credentials.scheme.lower() == "bearer":
         try:
             claims = decode_token(credentials.credentials, expected_type="access")
             user_id = int(claims["sub"])
+        except (TokenError, ValueError):
+            user_id = None
+
+    async with write_transaction(db, site="auth.logout"):
+        if token_hash:
+            cursor = await db.execute(
+                """
+                UPDATE refresh_tokens
+                SET revoked_at = ?
+                WHERE token_hash = ? AND revoked_at IS NULL
+                """,
+                (now_utc, token_hash),
+            )
+            revoked += cursor.rowcount
+
+        if user_id is not None:
             cursor = await db.execute(
                 """
                 UPDATE refresh_tokens
@@ -227,10 +240,7 @@ async def logout(
                 (now_utc, user_id),
             )
             revoked += cursor.rowcount
-        except (TokenError, ValueError):
-            pass
 
-    await db.commit()
     return {"success": True, "revoked": revoked}
 
 
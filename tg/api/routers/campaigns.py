@@ -10,6 +10,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from api.database import fetchall, fetchone, get_db
 from api.deps import get_current_user
 from api.schemas import CampaignCreate, CampaignOut, CampaignStatusUpdate, CampaignUpdate
+from database.db import write_transaction
 
 router = APIRouter(prefix="/campaigns", tags=["campaigns"])
 
@@ -130,14 +131,14 @@ async def create_campaign(
     else:
         investor_id = int(current_user["id"])
 
-    cursor = await db.execute(
-        """
-        INSERT INTO campaigns (investor_id, name, budget, status, created_at)
-        VALUES (?, ?, ?, ?, datetime('now'))
-        """,
-        (investor_id, payload.name, payload.budget, payload.status),
-    )
-    await db.commit()
+    async with write_transaction(db, site="campaigns.create"):
+        cursor = await db.execute(
+            """
+            INSERT INTO campaigns (investor_id, name, budget, status, created_at)
+            VALUES (?, ?, ?, ?, datetime('now'))
+            """,
+            (investor_id, payload.name, payload.budget, payload.status),
+        )
 
     campaign = await _fetch_campaign(db, int(cursor.lastrowid))
     if not campaign:
@@ -201,8 +202,8 @@ async def update_campaign(
 
     set_clause = ", ".join(f"{field} = ?" for field in updates)
     params = list(updates.values()) + [campaign_id]
-    await db.execute(f"UPDATE campaigns SET {set_clause} WHERE id = ?", params)
-    await db.commit()
+    async with write_transaction(db, site="campaigns.update"):
+        await db.execute(f"UPDATE campaigns SET {set_clause} WHERE id = ?", params)
 
     updated = await _fetch_campaign(db, campaign_id)
     if not updated:
@@ -234,11 +235,11 @@ async def update_campaign_status(
             detail="You cannot manage this campaign.",
         )
 
-    await db.execute(
-        "UPDATE campaigns SET status = ? WHERE id = ?",
-        (payload.status, campaign_id),
-    )
-    await db.commit()
+    async with write_transaction(db, site="campaigns.status"):
+        await db.execute(
+            "UPDATE campaigns SET status = ? WHERE id = ?",
+            (payload.status, campaign_id),
+        )
 
     updated = await _fetch_campaign(db, campaign_id)
     if not updated:
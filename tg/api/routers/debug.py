@@ -0,0 +1,89 @@
+"""Admin-only diagnostics routes."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import JSONResponse
+
+from api.config import settings
+from api.deps import require_roles
+from telemetry.memory import MemoryTracker
+from telemetry.profiling import (
+    KIND_CPROFILE,
+    KIND_SAMPLED,
+    ProfileSessions,
+    ProfilerBusyError,
+    profile_cprofile,
+    profile_sampled,
+)
+
+router = APIRouter(prefix="/debug", tags=["debug"])
+
+profile_sessions = ProfileSessions(settings.profile_max_concurrent)
+memory_tracker = MemoryTracker(frames=settings.memory_trace_frames)
+
+
+@router.post("/profile")
+async def profile(
+    seconds: float = Query(default=10.0, gt=0),
+    format: Literal["speedscope", "pstats"] = Query(default="speedscope"),
+    interval_ms: int = Query(default=5, ge=1, le=100),
+    # A request connection would stay open for the whole session.
+    _: dict[str, Any] = Depends(require_roles("admin", short_session=True)),
+) -> Response:
+    """
+    Profile the API process for `seconds` of live traffic.
+
+    `speedscope` samples the event-loop stack every `interval_ms` (low
+    overhead); `pstats` runs cProfile and returns a file for `pstats.Stats`.
+    """
+    if seconds > settings.profile_max_seconds:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Profiling session is limited to {settings.profile_max_seconds} seconds.",
+        )
+
+    kind = KIND_CPROFILE if format == "pstats" else KIND_SAMPLED
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    try:
+        with profile_sessions.session(kind):
+            if kind == KIND_CPROFILE:
+                data = await profile_cprofile(seconds)
+            else:
+                report = await profile_sampled(seconds, interval_ms / 1000, name=f"api {stamp}")
+    except ProfilerBusyError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc)) from exc
+
+    if kind == KIND_CPROFILE:
+        return Response(
+            content=data,
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": f'attachment; filename="api-{stamp}.pstats"'},
+        )
+    return JSONResponse(
+        content=report,
+        headers={"Content-Disposition": f'attachment; filename="api-{stamp}.speedscope.json"'},
+    )
+
+
+@router.post("/memory")
+async def capture_memory(
+    limit: int = Query(default=20, ge=1, le=200),
+    _: dict[str, Any] = Depends(require_roles("admin")),
+) -> dict[str, Any]:
+    """
+    Capture a tracemalloc snapshot: top allocation sites plus growth since the
+    previous capture. The first call starts tracing and returns the baseline.
+    """
+    return await memory_tracker.capture_async(limit)
+
+
+@router.delete("/memory", status_code=status.HTTP_204_NO_CONTENT)
+async def stop_memory_tracing(
+    _: dict[str, Any] = Depends(require_roles("admin")),
+) -> Response:
+    memory_tracker.stop()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
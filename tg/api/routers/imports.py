@@ -0,0 +1,102 @@
+"""CSV reconciliation import routes."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+from pathlib import Path
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+
+from api.config import settings
+from api.deps import get_current_user, get_current_user_short_session
+from api.schemas import ImportJobOut
+from reconciliation.importer import CsvBatches, ImportFormatError
+from reconciliation.jobs import ImportJob, ImportJobManager
+
+router = APIRouter(prefix="/applications/import", tags=["applications"])
+
+import_jobs = ImportJobManager(batch_size=settings.import_batch_size)
+
+
+def _investor_scope(user: dict[str, Any]) -> int | None:
+    return int(user["id"]) if user["role"] == "investor" else None
+
+
+def _job_for(job_id: str, user: dict[str, Any]) -> ImportJob:
+    job = import_jobs.get(job_id)
+    if job is None or (user["role"] != "admin" and job.owner_id != int(user["id"])):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import not found.",
+        )
+    return job
+
+
+async def _spool_upload(request: Request) -> Path:
+    """Copy the request body to a temporary file chunk by chunk."""
+    if settings.import_dir is not None:
+        settings.import_dir.mkdir(parents=True, exist_ok=True)
+    fd, name = tempfile.mkstemp(prefix="reconciliation-", suffix=".csv", dir=settings.import_dir)
+    path = Path(name)
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as spool:
+            async for chunk in request.stream():
+                size += len(chunk)
+                if size > settings.import_max_bytes:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"Upload is limited to {settings.import_max_bytes} bytes.",
+                    )
+                spool.write(chunk)
+        # Header problems are reported now rather than by a failed job.
+        CsvBatches(path).close()
+    except ImportFormatError as exc:
+        path.unlink(missing_ok=True)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    return path
+
+
+@router.post("", response_model=ImportJobOut, status_code=status.HTTP_202_ACCEPTED)
+async def start_import(
+    request: Request,
+    dry_run: bool = Query(default=False),
+    current_user: dict[str, Any] = Depends(get_current_user_short_session),
+) -> ImportJobOut:
+    """
+    Start a reconciliation import. The request body is the CSV file itself
+    (`Content-Type: text/csv`): an `id` column plus `status` and/or `revenue`.
+    Poll `GET /applications/import/{id}` for progress and per-row errors.
+    Investors can only update applications of their campaigns.
+    """
+    path = await _spool_upload(request)
+    job = import_jobs.submit(
+        path,
+        owner_id=int(current_user["id"]),
+        investor_id=_investor_scope(current_user),
+        dry_run=dry_run,
+    )
+    return ImportJobOut(**job.to_dict())
+
+
+@router.get("/{job_id}", response_model=ImportJobOut)
+async def get_import(
+    job_id: str,
+    current_user: dict[str, Any] = Depends(get_current_user),
+) -> ImportJobOut:
+    return ImportJobOut(**_job_for(job_id, current_user).to_dict())
+
+
+@router.delete("/{job_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def cancel_import(
+    job_id: str,
+    current_user: dict[str, Any] = Depends(get_current_user),
+) -> Response:
+    """Stop an import; batches committed before the cancel stay applied."""
+    import_jobs.cancel(_job_for(job_id, current_user))
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -2,16 +2,25 @@
 
 from __future__ import annotations
 
-from datetime import datetime, timezone
+from datetime import date, datetime, timedelta, timezone
 from typing import Any
 
 import aiosqlite
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 
 from api.database import fetchall, fetchone, get_db
 from api.deps import get_current_user
 from api.metrics import calc_profit_metrics
-from api.schemas import CampaignMetric, CampaignStatsResponse, DashboardResponse, DashboardTotals, TimelinePoint
+from api.schemas import (
+    CampaignMetric,
+    CampaignStatsResponse,
+    DashboardResponse,
+    DashboardTotals,
+    FunnelResponse,
+    FunnelStep,
+    TimelinePoint,
+)
+from services.funnel import FUNNEL_STEPS
 
 router = APIRouter(prefix="/stats", tags=["stats"])
 
@@ -207,3 +216,91 @@ async def campaign_stats(
         generated_at=datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
     )
 
+
+@router.get("/funnel", response_model=FunnelResponse)
+async def funnel_stats(
+    campaign_id: int | None = Query(default=None),
+    date_from: date | None = Query(default=None),
+    date_to: date | None = Query(default=None),
+    current_user: dict[str, Any] = Depends(get_current_user),
+    db: aiosqlite.Connection = Depends(get_db),
+) -> FunnelResponse:
+    """
+    Applicant funnel from the bot's per-minute rollups (`funnel_stats`).
+
+    Dates are UTC days, inclusive. Without `campaign_id` an admin sees all
+    traffic and an investor sees the sum over their own campaigns.
+    """
+    where_clauses: list[str] = []
+    params: list[Any] = []
+
+    if campaign_id is not None:
+        campaign = await fetchone(
+            db,
+            "SELECT id, investor_id FROM campaigns WHERE id = ?",
+            (campaign_id,),
+        )
+        if not campaign:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Campaign not found.",
+            )
+        if (
+            current_user["role"] == "investor"
+            and int(campaign["investor_id"]) != int(current_user["id"])
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You cannot access this campaign stats.",
+            )
+        where_clauses.append("f.campaign_id = ?")
+        params.append(campaign_id)
+    elif current_user["role"] == "investor":
+        where_clauses.append(
+            "f.campaign_id IN (SELECT id FROM campaigns WHERE investor_id = ?)"
+        )
+        params.append(int(current_user["id"]))
+
+    if date_from is not None:
+        where_clauses.append("f.bucket >= ?")
+        params.append(date_from.isoformat())
+    if date_to is not None:
+        where_clauses.append("f.bucket < ?")
+        params.append((date_to + timedelta(days=1)).isoformat())
+
+    where = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
+    try:
+        rows = await fetchall(
+            db,
+            f"""
+            SELECT f.step, SUM(f.count) AS amount
+            FROM funnel_stats f
+            {where}
+            GROUP BY f.step
+            """,
+            tuple(params),
+        )
+    except aiosqlite.OperationalError as exc:
+        # Missing until migration 0008 runs (API_AUTO_MIGRATE off) or the bot
+        # first flushes funnel events.
+        if "no such table" not in str(exc):
+            raise
+        rows = []
+    counts = {row["step"]: int(row["amount"] or 0) for row in rows}
+
+    steps: list[FunnelStep] = []
+    previous: int | None = None
+    for step in FUNNEL_STEPS:
+        amount = counts.pop(step, 0)
+        conversion = round(amount / previous * 100.0, 2) if previous else None
+        steps.append(FunnelStep(step=step, count=amount, conversion=conversion))
+        previous = amount
+
+    return FunnelResponse(
+        campaign_id=campaign_id,
+        steps=steps,
+        rejections=counts,
+        date_from=date_from.isoformat() if date_from else None,
+        date_to=date_to.isoformat() if date_to else None,
+        generated_at=datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+    )
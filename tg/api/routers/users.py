@@ -11,6 +11,7 @@ from api.database import fetchall, fetchone, get_db
 from api.deps import require_roles
 from api.schemas import UserCreate, UserOut, UserToggleResponse, UserUpdate
 from api.security import hash_password
+from database.db import write_transaction
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -63,29 +64,30 @@ async def create_user(
 ) -> UserOut:
     percent = payload.percent if payload.role == "investor" else None
 
+    password_hash = hash_password(payload.password)
     try:
-        cursor = await db.execute(
-            """
-            INSERT INTO users (
-                login, password_hash, name, role, percent, is_active, created_at
+        async with write_transaction(db, site="users.create"):
+            cursor = await db.execute(
+                """
+                INSERT INTO users (
+                    login, password_hash, name, role, percent, is_active, created_at
+                )
+                VALUES (?, ?, ?, ?, ?, 1, datetime('now'))
+                """,
+                (
+                    payload.login,
+                    password_hash,
+                    payload.name,
+                    payload.role,
+                    percent,
+                ),
             )
-            VALUES (?, ?, ?, ?, ?, 1, datetime('now'))
-            """,
-            (
-                payload.login,
-                hash_password(payload.password),
-                payload.name,
-                payload.role,
-                percent,
-            ),
-        )
     except aiosqlite.IntegrityError as exc:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="User with this login already exists.",
         ) from exc
 
-    await db.commit()
     user = await _get_user_by_id(db, int(cursor.lastrowid))
     if not user:
         raise HTTPException(
@@ -150,14 +152,14 @@ async def update_user(
     params = list(updates.values()) + [user_id]
 
     try:
-        await db.execute(f"UPDATE users SET {set_clause} WHERE id = ?", params)
+        async with write_transaction(db, site="users.update"):
+            await db.execute(f"UPDATE users SET {set_clause} WHERE id = ?", params)
     except aiosqlite.IntegrityError as exc:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Login is already taken.",
         ) from exc
 
-    await db.commit()
     user = await _get_user_by_id(db, user_id)
     if not user:
         raise HTTPException(
@@ -187,8 +189,8 @@ async def toggle_user_active(
         )
 
     next_state = 0 if bool(user["is_active"]) else 1
-    await db.execute("UPDATE users SET is_active = ? WHERE id = ?", (next_state, user_id))
-    await db.commit()
+    async with write_transaction(db, site="users.toggle"):
+        await db.execute("UPDATE users SET is_active = ? WHERE id = ?", (next_state, user_id))
 
     updated = await _get_user_by_id(db, user_id)
     if not updated:
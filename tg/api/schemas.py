@@ -108,6 +108,19 @@ class ApplicationOut(BaseModel):
     campaign_name: str | None
     status: str | None
     revenue: float | None
+    row_version: int | None = None
+    updated_at: str | None = None
+
+
+class ApplicationChangesPage(BaseModel):
+    items: list[ApplicationOut]
+    next_since: int
+    has_more: bool
+
+
+class StreamTicketOut(BaseModel):
+    ticket: str
+    expires_in: int
 
 
 class ApplicationUpdate(BaseModel):
@@ -115,6 +128,51 @@ class ApplicationUpdate(BaseModel):
     revenue: float | None = Field(default=None, ge=0)
 
 
+class ApplicationBulkUpdateItem(ApplicationUpdate):
+    id: int
+
+
+class ApplicationBulkUpdate(BaseModel):
+    items: list[ApplicationBulkUpdateItem] = Field(min_length=1)
+
+
+class ApplicationBulkUpdateResult(BaseModel):
+    id: int
+    ok: bool
+    error: str | None = None
+    application: ApplicationOut | None = None
+
+
+class ApplicationBulkUpdateResponse(BaseModel):
+    updated: int
+    failed: int
+    results: list[ApplicationBulkUpdateResult]
+
+
+class ImportRowError(BaseModel):
+    line: int
+    id: str
+    error: str
+
+
+class ImportJobOut(BaseModel):
+    id: str
+    status: Literal["queued", "running", "done", "failed", "cancelled"]
+    dry_run: bool
+    detail: str | None
+    created_at: str
+    started_at: str | None
+    finished_at: str | None
+    total_bytes: int
+    bytes_read: int
+    percent: float
+    rows_read: int
+    rows_applied: int
+    rows_failed: int
+    errors: list[ImportRowError]
+    errors_truncated: bool
+
+
 class AuthResponse(BaseModel):
     access_token: str
     refresh_token: str
@@ -168,6 +226,21 @@ class CampaignStatsResponse(BaseModel):
     generated_at: str
 
 
+class FunnelStep(BaseModel):
+    step: str
+    count: int
+    conversion: float | None
+
+
+class FunnelResponse(BaseModel):
+    campaign_id: int | None
+    steps: list[FunnelStep]
+    rejections: dict[str, int]
+    date_from: str | None
+    date_to: str | None
+    generated_at: str
+
+
 class ApplicationFilters(BaseModel):
     campaign: int | None = None
     status: str | None = None
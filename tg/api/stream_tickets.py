@@ -0,0 +1,70 @@
+"""
+Single-use tickets for opening an event stream.
+
+`EventSource` cannot send an `Authorization` header, and an access token in
+the URL ends up in uvicorn's and nginx's access logs. The client exchanges its
+token for a ticket (`POST /applications/stream/tickets`) and opens the stream
+with `?ticket=`. A ticket is valid for `API_STREAM_TICKET_TTL_SECONDS` and
+only once, so a logged URL is useless by the time anyone reads it. It carries
+the access token's expiry; the stream is closed then.
+
+Tickets live in process memory: the API runs as a single process.
+"""
+
+from __future__ import annotations
+
+import secrets
+import time
+from dataclasses import dataclass
+
+from api.config import settings
+from telemetry.metrics import REGISTRY
+
+OPEN_TICKETS = REGISTRY.gauge(
+    "api_stream_tickets",
+    "Issued stream tickets not yet redeemed or expired.",
+)
+
+
+@dataclass(frozen=True)
+class StreamTicket:
+    user_id: int
+    # Unix time the access token the ticket was issued for expires.
+    session_expires_at: float
+    expires_at: float
+
+
+class StreamTicketStore:
+    def __init__(self, *, ttl_seconds: int) -> None:
+        self.ttl_seconds = max(1, ttl_seconds)
+        self._tickets: dict[str, StreamTicket] = {}
+
+    def __len__(self) -> int:
+        return len(self._tickets)
+
+    def _sweep(self, now: float) -> None:
+        expired = [key for key, ticket in self._tickets.items() if ticket.expires_at <= now]
+        for key in expired:
+            del self._tickets[key]
+
+    def issue(self, user_id: int, session_expires_at: float) -> str:
+        now = time.time()
+        self._sweep(now)
+        key = secrets.token_urlsafe(24)
+        self._tickets[key] = StreamTicket(
+            user_id=user_id,
+            session_expires_at=session_expires_at,
+            expires_at=min(now + self.ttl_seconds, session_expires_at),
+        )
+        return key
+
+    def redeem(self, key: str) -> StreamTicket | None:
+        """Return the ticket and invalidate it; None if unknown or expired."""
+        ticket = self._tickets.pop(key, None)
+        if ticket is None or ticket.expires_at <= time.time():
+            return None
+        return ticket
+
+
+stream_tickets = StreamTicketStore(ttl_seconds=settings.stream_ticket_ttl_seconds)
+OPEN_TICKETS.set_function(lambda: len(stream_tickets))
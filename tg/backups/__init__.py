@@ -0,0 +1 @@
+"""Online SQLite snapshot tooling."""
@@ -0,0 +1,115 @@
+"""Command line entry point for hot SQLite snapshots."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+TG_DIR = Path(__file__).resolve().parents[1]
+REPO_DIR = TG_DIR.parent
+
+if str(TG_DIR) not in sys.path:
+    sys.path.insert(0, str(TG_DIR))
+
+load_dotenv(REPO_DIR / ".env")
+load_dotenv(TG_DIR / ".env")
+
+from backups.snapshot import (  # noqa: E402
+    BackupError,
+    create_snapshot,
+    list_snapshots,
+    rotate_snapshots,
+    verify_snapshot,
+)
+from database.db import DB_PATH  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Hot SQLite snapshot tool.")
+    parser.add_argument(
+        "--db",
+        type=str,
+        default=str(DB_PATH),
+        help="Path to sqlite database file.",
+    )
+    parser.add_argument(
+        "--dir",
+        type=str,
+        default=str(DB_PATH.parent / "backups"),
+        help="Directory where snapshots are stored.",
+    )
+
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    create_parser = subparsers.add_parser("create", help="Take a snapshot now.")
+    create_parser.add_argument(
+        "--pages",
+        type=int,
+        default=256,
+        help="Pages copied per backup step.",
+    )
+    create_parser.add_argument(
+        "--sleep-ms",
+        type=int,
+        default=50,
+        help="Pause between backup steps so writers are not starved.",
+    )
+
+    verify_parser = subparsers.add_parser("verify", help="Run quick_check on a snapshot.")
+    verify_parser.add_argument("path", type=str, help="Snapshot file to verify.")
+
+    rotate_parser = subparsers.add_parser("rotate", help="Apply retention policy.")
+    rotate_parser.add_argument("--keep-last", type=int, default=7)
+    rotate_parser.add_argument("--keep-daily", type=int, default=14)
+
+    subparsers.add_parser("list", help="List snapshots, newest first.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    db_path = Path(args.db).expanduser().resolve()
+    backup_dir = Path(args.dir).expanduser().resolve()
+
+    if args.command == "create":
+        try:
+            snapshot = create_snapshot(
+                db_path,
+                backup_dir,
+                pages_per_step=args.pages,
+                step_sleep=args.sleep_ms / 1000.0,
+            )
+        except BackupError as exc:
+            raise SystemExit(f"Snapshot failed: {exc}") from exc
+        print(f"Created: {snapshot.path} ({snapshot.size_bytes} bytes)")
+    elif args.command == "verify":
+        problems = verify_snapshot(Path(args.path).expanduser().resolve())
+        if problems:
+            raise SystemExit("quick_check failed:\n" + "\n".join(problems))
+        print("ok")
+    elif args.command == "rotate":
+        removed = rotate_snapshots(
+            backup_dir,
+            keep_last=args.keep_last,
+            keep_daily=args.keep_daily,
+        )
+        if removed:
+            print("Removed: " + ", ".join(path.name for path in removed))
+        else:
+            print("Nothing to remove.")
+    elif args.command == "list":
+        snapshots = list_snapshots(backup_dir)
+        if not snapshots:
+            print("No snapshots found.")
+        for snapshot in snapshots:
+            print(
+                f"{snapshot.path.name}\t{snapshot.size_bytes}\t"
+                f"{snapshot.created_at.strftime('%Y-%m-%d %H:%M:%S')}"
+            )
+
+
+if __name__ == "__main__":
+    main()
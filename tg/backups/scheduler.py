@@ -0,0 +1,83 @@
+"""Periodic snapshot task for the API process."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from pathlib import Path
+
+from backups.snapshot import Snapshot, create_snapshot, rotate_snapshots
+
+logger = logging.getLogger(__name__)
+
+
+class BackupScheduler:
+    """Take a snapshot every `interval_seconds` and apply retention afterwards."""
+
+    def __init__(
+        self,
+        *,
+        db_path: Path,
+        backup_dir: Path,
+        interval_seconds: int,
+        keep_last: int,
+        keep_daily: int,
+        pages_per_step: int,
+        step_sleep: float,
+    ) -> None:
+        self.db_path = db_path
+        self.backup_dir = backup_dir
+        self.interval_seconds = max(60, interval_seconds)
+        self.keep_last = keep_last
+        self.keep_daily = keep_daily
+        self.pages_per_step = pages_per_step
+        self.step_sleep = step_sleep
+        self._task: asyncio.Task[None] | None = None
+        self._lock = asyncio.Lock()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="backup-scheduler")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def run_once(self) -> Snapshot:
+        # The backup API and file I/O are blocking; keep them off the event loop.
+        async with self._lock:
+            return await asyncio.to_thread(self._backup_and_rotate)
+
+    def _backup_and_rotate(self) -> Snapshot:
+        snapshot = create_snapshot(
+            self.db_path,
+            self.backup_dir,
+            pages_per_step=self.pages_per_step,
+            step_sleep=self.step_sleep,
+        )
+        removed = rotate_snapshots(
+            self.backup_dir,
+            keep_last=self.keep_last,
+            keep_daily=self.keep_daily,
+        )
+        logger.info(
+            "DB snapshot created: %s (%s bytes), rotated out %s old snapshot(s).",
+            snapshot.path.name,
+            snapshot.size_bytes,
+            len(removed),
+        )
+        return snapshot
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.run_once()
+            except Exception:  # noqa: BLE001
+                logger.exception("Scheduled DB snapshot failed.")
@@ -0,0 +1,253 @@
+"""Hot SQLite snapshots built on the sqlite3 online backup API."""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_PREFIX = "applications-"
+SNAPSHOT_SUFFIX = ".db"
+PARTIAL_SUFFIX = ".partial"
+# Microseconds keep a scheduled and a manual snapshot taken in the same
+# second apart; names without them (older snapshots) are still recognised.
+TIMESTAMP_FORMAT = "%Y%m%d-%H%M%S-%f"
+LEGACY_TIMESTAMP_FORMAT = "%Y%m%d-%H%M%S"
+# Files SQLite keeps next to a WAL-mode database.
+SIDECAR_SUFFIXES = ("-wal", "-shm")
+
+
+class BackupError(Exception):
+    """Raised when a snapshot cannot be created or fails verification."""
+
+
+class _TooManyRestarts(Exception):
+    """Raised from the progress callback to abort a starving paged backup."""
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    path: Path
+    created_at: datetime
+    size_bytes: int
+
+
+def snapshot_name(created_at: datetime) -> str:
+    return f"{SNAPSHOT_PREFIX}{created_at.strftime(TIMESTAMP_FORMAT)}{SNAPSHOT_SUFFIX}"
+
+
+def _parse_snapshot_time(path: Path) -> datetime | None:
+    name = path.name
+    if not (name.startswith(SNAPSHOT_PREFIX) and name.endswith(SNAPSHOT_SUFFIX)):
+        return None
+
+    raw = name[len(SNAPSHOT_PREFIX):-len(SNAPSHOT_SUFFIX)]
+    for timestamp_format in (TIMESTAMP_FORMAT, LEGACY_TIMESTAMP_FORMAT):
+        try:
+            return datetime.strptime(raw, timestamp_format).replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+    return None
+
+
+def _sidecars(path: Path) -> list[Path]:
+    return [path.with_name(path.name + suffix) for suffix in SIDECAR_SUFFIXES]
+
+
+def _discard(path: Path) -> None:
+    for candidate in (path, *_sidecars(path)):
+        candidate.unlink(missing_ok=True)
+
+
+def list_snapshots(backup_dir: Path) -> list[Snapshot]:
+    """Return snapshots found in `backup_dir`, newest first."""
+    if not backup_dir.exists():
+        return []
+
+    snapshots: list[Snapshot] = []
+    for path in backup_dir.iterdir():
+        created_at = _parse_snapshot_time(path)
+        if created_at is None or not path.is_file():
+            continue
+        snapshots.append(
+            Snapshot(path=path, created_at=created_at, size_bytes=path.stat().st_size)
+        )
+
+    snapshots.sort(key=lambda item: item.created_at, reverse=True)
+    return snapshots
+
+
+def verify_snapshot(path: Path) -> list[str]:
+    """
+    Run `PRAGMA quick_check` against a snapshot file.
+
+    Returns an empty list when the snapshot is healthy, otherwise the reported problems.
+    """
+    try:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    except sqlite3.Error as exc:
+        return [str(exc)]
+
+    try:
+        rows = conn.execute("PRAGMA quick_check").fetchall()
+    except sqlite3.DatabaseError as exc:
+        return [str(exc)]
+    finally:
+        conn.close()
+
+    problems = [str(row[0]) for row in rows]
+    return [] if problems == ["ok"] else problems
+
+
+def _copy_database(
+    source: sqlite3.Connection,
+    target: sqlite3.Connection,
+    *,
+    pages_per_step: int,
+    step_sleep: float,
+    max_restarts: int,
+) -> None:
+    last_remaining: int | None = None
+    restarts = 0
+
+    def _progress(status: int, remaining: int, total: int) -> None:
+        nonlocal last_remaining, restarts
+        # A concurrent writer forces the backup to start over from page one.
+        if last_remaining is not None and remaining > last_remaining:
+            restarts += 1
+            if restarts > max_restarts:
+                raise _TooManyRestarts()
+        last_remaining = remaining
+
+    try:
+        source.backup(target, pages=pages_per_step, progress=_progress, sleep=step_sleep)
+    except _TooManyRestarts:
+        # Writers kept invalidating the paged copy; finish in a single step instead.
+        # In WAL mode this only holds a read snapshot and does not block writers.
+        logger.warning(
+            "Paged backup restarted %s times, falling back to single-step copy.",
+            restarts,
+        )
+        source.backup(target, pages=-1)
+
+
+def create_snapshot(
+    db_path: Path,
+    backup_dir: Path,
+    *,
+    pages_per_step: int = 256,
+    step_sleep: float = 0.05,
+    max_restarts: int = 5,
+    verify: bool = True,
+    now: datetime | None = None,
+) -> Snapshot:
+    """
+    Copy a live database into `backup_dir` without stopping readers or writers.
+
+    The copy is written to a `.partial` file, verified with `quick_check` and only
+    then renamed into place, so a listed snapshot is always complete. Both names
+    are claimed exclusively: a second snapshot with the same timestamp fails
+    instead of deleting or overwriting this one.
+    """
+    if not db_path.exists():
+        raise BackupError(f"Database not found: {db_path}")
+
+    backup_dir.mkdir(parents=True, exist_ok=True)
+    created_at = now or datetime.now(timezone.utc)
+    final_path = backup_dir / snapshot_name(created_at)
+    partial_path = final_path.with_name(final_path.name + PARTIAL_SUFFIX)
+    try:
+        os.close(os.open(partial_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL))
+    except FileExistsError as exc:
+        raise BackupError(f"Another snapshot is being written to {partial_path}") from exc
+    # Checked after claiming the partial: a writer with the same name has
+    # either renamed already or not started.
+    if final_path.exists():
+        partial_path.unlink()
+        raise BackupError(f"Snapshot already exists: {final_path}")
+
+    try:
+        try:
+            with closing(sqlite3.connect(str(db_path))) as source, closing(
+                sqlite3.connect(str(partial_path))
+            ) as target:
+                _copy_database(
+                    source,
+                    target,
+                    pages_per_step=max(1, pages_per_step),
+                    step_sleep=max(0.0, step_sleep),
+                    max_restarts=max(0, max_restarts),
+                )
+                # The copy inherits WAL mode from the live database; a snapshot
+                # is a single self-contained file, and opening it must not leave
+                # -wal/-shm files behind.
+                target.execute("PRAGMA journal_mode=DELETE")
+        except sqlite3.Error as exc:
+            raise BackupError(f"Backup of {db_path} failed: {exc}") from exc
+
+        if verify:
+            problems = verify_snapshot(partial_path)
+            if problems:
+                raise BackupError(
+                    f"Snapshot failed quick_check: {'; '.join(problems[:5])}"
+                )
+
+        for sidecar in _sidecars(partial_path):
+            sidecar.unlink(missing_ok=True)
+        os.replace(partial_path, final_path)
+    except BaseException:
+        # Includes cancellation and interrupts: a leftover partial would block
+        # the next snapshot with the same name.
+        _discard(partial_path)
+        raise
+
+    return Snapshot(
+        path=final_path,
+        created_at=created_at,
+        size_bytes=final_path.stat().st_size,
+    )
+
+
+def rotate_snapshots(backup_dir: Path, *, keep_last: int, keep_daily: int) -> list[Path]:
+    """
+    Delete snapshots outside the retention policy.
+
+    - the newest `keep_last` snapshots are always kept;
+    - additionally, the newest snapshot of each of the last `keep_daily` days is kept.
+
+    Sidecar files (`-wal`, `-shm`) are removed with their snapshot, and left
+    over ones whose snapshot is already gone are removed too.
+
+    Returns removed paths.
+    """
+    snapshots = list_snapshots(backup_dir)
+    keep: set[Path] = {item.path for item in snapshots[: max(0, keep_last)]}
+
+    days_seen: set[str] = set()
+    for item in snapshots:
+        if len(days_seen) >= max(0, keep_daily):
+            break
+        day = item.created_at.strftime("%Y-%m-%d")
+        if day in days_seen:
+            continue
+        days_seen.add(day)
+        keep.add(item.path)
+
+    removed: list[Path] = []
+    for item in snapshots:
+        if item.path in keep:
+            continue
+        _discard(item.path)
+        removed.append(item.path)
+
+    for path in backup_dir.glob(f"{SNAPSHOT_PREFIX}*"):
+        for suffix in SIDECAR_SUFFIXES:
+            if path.name.endswith(suffix) and not path.with_name(path.name[: -len(suffix)]).exists():
+                path.unlink(missing_ok=True)
+    return removed
@@ -0,0 +1,359 @@
+"""
+In-process load test for the admin API.
+
+Seeds a throwaway database, starts `create_app()` (lifespan included) and
+drives it through `httpx.ASGITransport` with concurrent virtual users, each
+running a weighted mix of scripted scenarios. No network and no uvicorn are
+involved, so numbers reflect the application, SQLite and the event loop only.
+
+    python tg/benchmarks/api_load.py --clients 32 --duration 30 --output before.json
+    python tg/benchmarks/api_load.py --scenarios dashboard,applications_list
+
+Compare JSON reports of two runs to judge a change.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+TG_DIR = Path(__file__).resolve().parents[1]
+if str(TG_DIR) not in sys.path:
+    sys.path.insert(0, str(TG_DIR))
+
+import httpx  # noqa: E402
+
+from benchmarks.common import print_table, run_metadata, summarize_latencies, write_report  # noqa: E402
+
+ADMIN_LOGIN = "bench_admin"
+PASSWORD = "bench_password"
+API = "/api"
+
+APPLICATION_STATUSES = ("new", "in_progress", "approved", "rejected")
+
+# name -> relative weight in the mix
+SCENARIO_WEIGHTS: dict[str, int] = {
+    "login": 1,
+    "refresh": 2,
+    "dashboard": 4,
+    "campaign_stats": 3,
+    "applications_list": 4,
+    "application_update": 2,
+}
+
+
+@dataclass
+class SeedInfo:
+    investor_logins: list[str]
+    campaigns_by_investor: dict[str, list[int]]
+    applications_by_investor: dict[str, list[int]]
+
+    @property
+    def all_campaigns(self) -> list[int]:
+        return [cid for ids in self.campaigns_by_investor.values() for cid in ids]
+
+    @property
+    def all_applications(self) -> list[int]:
+        return [aid for ids in self.applications_by_investor.values() for aid in ids]
+
+
+def seed_database(
+    db_path: Path,
+    *,
+    investors: int,
+    campaigns_per_investor: int,
+    applications: int,
+    seed: int,
+) -> SeedInfo:
+    """
+    Create the database with `migrations/generate.py` and pick the targets
+    virtual users will work with.
+    """
+    from api.security import hash_password
+    from migrations.generate import GeneratorConfig, create_database
+
+    create_database(
+        db_path,
+        GeneratorConfig(
+            investors=investors,
+            campaigns_per_investor=campaigns_per_investor,
+            applications=applications,
+            refresh_tokens_per_user=5,
+            password_hash=hash_password(PASSWORD),
+            seed=seed,
+        ),
+    )
+
+    conn = sqlite3.connect(db_path)
+    try:
+        campaigns_by_investor: dict[str, list[int]] = defaultdict(list)
+        for login, campaign_id in conn.execute(
+            """
+            SELECT u.login, c.id
+            FROM users u
+            JOIN campaigns c ON c.investor_id = u.id
+            WHERE u.role = 'investor' AND u.is_active = 1
+            ORDER BY u.id, c.id
+            """
+        ):
+            campaigns_by_investor[login].append(campaign_id)
+
+        applications_by_investor: dict[str, list[int]] = defaultdict(list)
+        for login, app_id in conn.execute(
+            """
+            SELECT u.login, a.id
+            FROM applications a
+            JOIN campaigns c ON c.id = a.campaign_id
+            JOIN users u ON u.id = c.investor_id
+            WHERE a.id % ? = 0
+            """,
+            (max(1, applications // 5000),),
+        ):
+            applications_by_investor[login].append(app_id)
+    finally:
+        conn.close()
+
+    logins = [login for login in campaigns_by_investor if applications_by_investor.get(login)]
+    return SeedInfo(
+        logins,
+        {login: campaigns_by_investor[login] for login in logins},
+        {login: applications_by_investor[login] for login in logins},
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: Any) -> AsyncIterator[None]:
+    """
+    Drive the ASGI lifespan protocol so startup/shutdown hooks run.
+    """
+    receive_queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+    sent: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+
+    async def receive() -> dict[str, Any]:
+        return await receive_queue.get()
+
+    async def send(message: dict[str, Any]) -> None:
+        await sent.put(message)
+
+    task = asyncio.create_task(app({"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}}, receive, send))
+    await receive_queue.put({"type": "lifespan.startup"})
+    message = await sent.get()
+    if message["type"] != "lifespan.startup.complete":
+        raise RuntimeError(f"Application startup failed: {message}")
+    try:
+        yield
+    finally:
+        await receive_queue.put({"type": "lifespan.shutdown"})
+        await sent.get()
+        await task
+
+
+@dataclass
+class VirtualUser:
+    client: httpx.AsyncClient
+    login: str
+    campaigns: list[int]
+    applications: list[int]
+    rng: random.Random
+    access_token: str = ""
+    refresh_token: str = ""
+    latencies: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self.access_token}"}
+
+    def _store_tokens(self, response: httpx.Response) -> None:
+        if response.status_code == 200:
+            payload = response.json()
+            self.access_token = payload["access_token"]
+            self.refresh_token = payload["refresh_token"]
+
+    async def login_(self) -> httpx.Response:
+        response = await self.client.post(f"{API}/auth/login", json={"login": self.login, "password": PASSWORD})
+        self._store_tokens(response)
+        return response
+
+    async def refresh(self) -> httpx.Response:
+        response = await self.client.post(f"{API}/auth/refresh", json={"refresh_token": self.refresh_token})
+        self._store_tokens(response)
+        return response
+
+    async def dashboard(self) -> httpx.Response:
+        return await self.client.get(f"{API}/stats/dashboard", headers=self.headers)
+
+    async def campaign_stats(self) -> httpx.Response:
+        campaign_id = self.rng.choice(self.campaigns)
+        return await self.client.get(f"{API}/stats/campaign/{campaign_id}", headers=self.headers)
+
+    async def applications_list(self) -> httpx.Response:
+        params: dict[str, Any] = {"campaign": self.rng.choice(self.campaigns)}
+        if self.rng.random() < 0.5:
+            params["status"] = self.rng.choice(APPLICATION_STATUSES)
+        if self.rng.random() < 0.5:
+            params["date_from"] = (datetime.now() - timedelta(days=self.rng.choice((7, 30)))).date().isoformat()
+        return await self.client.get(f"{API}/applications", params=params, headers=self.headers)
+
+    async def application_update(self) -> httpx.Response:
+        application_id = self.rng.choice(self.applications)
+        status = self.rng.choice(APPLICATION_STATUSES)
+        payload: dict[str, Any] = {"status": status}
+        if status == "approved":
+            payload["revenue"] = round(self.rng.uniform(500, 5000), 2)
+        return await self.client.put(f"{API}/applications/{application_id}", json=payload, headers=self.headers)
+
+    def scenario(self, name: str) -> Callable[[], Awaitable[httpx.Response]]:
+        return self.login_ if name == "login" else getattr(self, name)
+
+
+async def _drive(user: VirtualUser, scenarios: list[str], weights: list[int], measure_from: float, deadline: float) -> None:
+    while True:
+        started = time.perf_counter()
+        if started >= deadline:
+            return
+        name = user.rng.choices(scenarios, weights)[0]
+        response = await user.scenario(name)()
+        if started < measure_from:
+            continue
+        user.latencies[name].append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            user.errors[name] += 1
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(scenarios) - set(SCENARIO_WEIGHTS)
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+    weights = [SCENARIO_WEIGHTS[name] for name in scenarios]
+
+    seed_started = time.perf_counter()
+    info = seed_database(
+        Path(os.environ["DB_PATH"]),
+        investors=args.investors,
+        campaigns_per_investor=args.campaigns,
+        applications=args.applications,
+        seed=args.seed,
+    )
+    seed_seconds = time.perf_counter() - seed_started
+    print(f"Seeded {args.applications} applications in {seed_seconds:.1f}s")
+
+    from api.app import create_app
+
+    app = create_app()
+    async with lifespan(app):
+
+        transport = httpx.ASGITransport(app=app)
+        limits = httpx.Limits(max_connections=None)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", limits=limits) as client:
+            users = []
+            for n in range(args.clients):
+                rng = random.Random(args.seed + n)
+                if n % args.admin_every == 0:
+                    user = VirtualUser(client, ADMIN_LOGIN, info.all_campaigns, info.all_applications, rng)
+                else:
+                    login = info.investor_logins[n % len(info.investor_logins)]
+                    user = VirtualUser(
+                        client,
+                        login,
+                        info.campaigns_by_investor[login],
+                        info.applications_by_investor.get(login) or info.all_applications[:1],
+                        rng,
+                    )
+                response = await user.login_()
+                response.raise_for_status()
+                users.append(user)
+
+            started = time.perf_counter()
+            measure_from = started + args.warmup
+            deadline = measure_from + args.duration
+            await asyncio.gather(*(_drive(user, scenarios, weights, measure_from, deadline) for user in users))
+            elapsed = time.perf_counter() - measure_from
+
+    results: dict[str, dict[str, Any]] = {}
+    everything: list[float] = []
+    total_errors = 0
+    for name in scenarios:
+        latencies = [value for user in users for value in user.latencies.get(name, [])]
+        errors = sum(user.errors.get(name, 0) for user in users)
+        everything.extend(latencies)
+        total_errors += errors
+        results[name] = {**summarize_latencies(latencies, elapsed), "errors": errors}
+    results["total"] = {**summarize_latencies(everything, elapsed), "errors": total_errors}
+
+    return {
+        **run_metadata(
+            {
+                "clients": args.clients,
+                "duration_s": args.duration,
+                "warmup_s": args.warmup,
+                "scenarios": dict(zip(scenarios, weights)),
+                "investors": args.investors,
+                "campaigns_per_investor": args.campaigns,
+                "applications": args.applications,
+                "seed": args.seed,
+            }
+        ),
+        "seed_seconds": round(seed_seconds, 3),
+        "elapsed_s": round(elapsed, 3),
+        "results": results,
+    }
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="In-process load test for the admin API.")
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent virtual users.")
+    parser.add_argument("--duration", type=float, default=20.0, help="Measured seconds.")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Seconds excluded from results.")
+    parser.add_argument("--scenarios", default=",".join(SCENARIO_WEIGHTS), help="Comma-separated scenario names.")
+    parser.add_argument("--admin-every", type=int, default=4, help="Every Nth virtual user is the admin.")
+    parser.add_argument("--investors", type=int, default=10)
+    parser.add_argument("--campaigns", type=int, default=5, help="Campaigns per investor.")
+    parser.add_argument("--applications", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", help="Database file to create (default: temporary file).")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> dict[str, Any]:
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix="api-bench-") as tmp:
+        db_path = Path(args.db) if args.db else Path(tmp) / "bench.db"
+        if db_path.exists():
+            raise SystemExit(f"Refusing to reuse existing database: {db_path}")
+        # Settings are read at import time, so configure before importing the API.
+        os.environ.update(
+            {
+                "DB_PATH": str(db_path),
+                "API_AUTO_MIGRATE": "true",
+                "API_BACKUP_ENABLED": "false",
+                "API_LOGIN_RATE_LIMIT": "1000000",
+                "API_JWT_SECRET": os.environ.get("API_JWT_SECRET") or "bench-secret-key-which-is-at-least-32-bytes",
+                "ADMIN_BOOTSTRAP_LOGIN": ADMIN_LOGIN,
+                "ADMIN_BOOTSTRAP_PASSWORD": PASSWORD,
+                "ADMIN_BOOTSTRAP_NAME": "Bench Admin",
+            }
+        )
+        report = asyncio.run(run(args))
+
+    print_table(report["results"])
+    write_report(report, args.output)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+"""
+Bot throughput benchmark on a fake Telegram session.
+
+Builds the dispatcher exactly like `main.py` (`create_dispatcher`, SQLite FSM
+storage, message scheduler, outbox, funnel tracker) against a fresh database,
+swaps the HTTP session for an in-memory fake, and replays complete
+application flows for many simulated users:
+
+    /start camp_N -> "start_test" -> contact -> name -> age -> citizenship
+
+Each user waits for the bot to finish one update before sending the next, as
+a person would; `--concurrency` users are active at once. Reports updates/s,
+per-step handler latency, `save_application` latency and memory. No network.
+
+    python tg/benchmarks/bot_throughput.py --users 5000 --concurrency 200 --output bot.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from collections.abc import AsyncGenerator
+from pathlib import Path
+from typing import Any
+
+TG_DIR = Path(__file__).resolve().parents[1]
+if str(TG_DIR) not in sys.path:
+    sys.path.insert(0, str(TG_DIR))
+
+from aiogram import Bot  # noqa: E402
+from aiogram.client.session.base import BaseSession  # noqa: E402
+from aiogram.methods import TelegramMethod  # noqa: E402
+from aiogram.types import Chat, Message, Update  # noqa: E402
+
+from benchmarks.common import print_table, run_metadata, summarize_latencies, write_report  # noqa: E402
+
+TOKEN = "42:BENCHMARK"
+ADMIN_ID = 1
+FIRST_USER_ID = 5_000_000
+CITIZENSHIP = "Российская Федерация"
+
+STEPS = ("start", "start_test", "phone", "name", "age", "citizenship")
+
+
+class FakeSession(BaseSession):
+    """
+    In-memory stand-in for the Bot API: every call succeeds after `latency`.
+    """
+
+    def __init__(self, latency: float = 0.0) -> None:
+        super().__init__()
+        self.latency = latency
+        self.calls: defaultdict[str, int] = defaultdict(int)
+        self._message_ids = itertools.count(1)
+
+    async def close(self) -> None:
+        pass
+
+    async def make_request(self, bot: Bot, method: TelegramMethod[Any], timeout: int | None = None) -> Any:
+        self.calls[type(method).__name__] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        returning = method.__returning__
+        if returning is Message:
+            chat_id = getattr(method, "chat_id", 0)
+            return Message(
+                message_id=next(self._message_ids),
+                date=int(time.time()),
+                chat=Chat(id=int(chat_id) if isinstance(chat_id, int) else 0, type="private"),
+                text=getattr(method, "text", None),
+            )
+        return True
+
+    async def stream_content(
+        self,
+        url: str,
+        headers: dict[str, Any] | None = None,
+        timeout: int = 30,
+        chunk_size: int = 65536,
+        raise_for_status: bool = True,
+    ) -> AsyncGenerator[bytes, None]:
+        yield b""
+
+
+class _UpdateIds:
+    def __init__(self) -> None:
+        self._ids = itertools.count(1)
+
+    def next(self) -> int:
+        return next(self._ids)
+
+
+def _user(user_id: int) -> dict[str, Any]:
+    return {"id": user_id, "is_bot": False, "first_name": "Bench", "username": f"bench{user_id}"}
+
+
+def _message_update(update_id: int, user_id: int, **content: Any) -> dict[str, Any]:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": _user(user_id),
+            **content,
+        },
+    }
+
+
+def _callback_update(update_id: int, user_id: int, data: str) -> dict[str, Any]:
+    return {
+        "update_id": update_id,
+        "callback_query": {
+            "id": str(update_id),
+            "from": _user(user_id),
+            "chat_instance": str(user_id),
+            "data": data,
+            "message": {
+                "message_id": update_id,
+                "date": int(time.time()),
+                "chat": {"id": user_id, "type": "private"},
+                "text": "…",
+            },
+        },
+    }
+
+
+def flow_updates(ids: _UpdateIds, user_id: int, campaign_id: int) -> list[tuple[str, dict[str, Any]]]:
+    phone = f"+7999{user_id % 10_000_000:07d}"
+    return [
+        ("start", _message_update(ids.next(), user_id, text=f"/start camp_{campaign_id}")),
+        ("start_test", _callback_update(ids.next(), user_id, "start_test")),
+        ("phone", _message_update(
+            ids.next(), user_id,
+            contact={"phone_number": phone, "first_name": "Bench", "user_id": user_id},
+        )),
+        ("name", _message_update(ids.next(), user_id, text="Иван Петров")),
+        ("age", _message_update(ids.next(), user_id, text="25")),
+        ("citizenship", _callback_update(ids.next(), user_id, f"citizenship:{CITIZENSHIP}")),
+    ]
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    # Imported here: configuration is read from the environment at import time.
+    import handlers.test as test_handlers
+    from config import SEND_CHAT_BURST, SEND_CHAT_RATE, SEND_GLOBAL_RATE, SEND_MAX_QUEUE
+    from database.db import data_version_probe, init_db
+    from main import create_dispatcher
+    from migrations.generate import GeneratorConfig, create_database
+    from services.fsm_storage import SQLiteStorage
+    from services.funnel import FunnelTracker
+    from services.outbox import OutboxWorker
+    from services.sender import MessageScheduler
+    from telemetry.memory import rss_bytes
+
+    # main.py configures INFO logging; per-application log lines would dominate.
+    logging.getLogger().setLevel(logging.WARNING)
+
+    db_path = Path(os.environ["DB_PATH"])
+    create_database(
+        db_path,
+        GeneratorConfig(
+            investors=2,
+            campaigns_per_investor=5,
+            applications=args.existing_applications,
+            refresh_tokens_per_user=0,
+            password_hash="-",
+            seed=args.seed,
+        ),
+        analyze=True,
+    )
+    await init_db()
+
+    conn = sqlite3.connect(db_path)
+    campaign_ids = [row[0] for row in conn.execute("SELECT id FROM campaigns WHERE status = 'active'")]
+    conn.close()
+
+    session = FakeSession(latency=args.api_latency_ms / 1000)
+    bot = Bot(TOKEN, session=session)
+    sender = MessageScheduler(
+        bot,
+        global_rate=SEND_GLOBAL_RATE,
+        chat_rate=SEND_CHAT_RATE,
+        chat_burst=SEND_CHAT_BURST,
+        max_queue=SEND_MAX_QUEUE,
+    )
+    sender.start()
+    outbox = OutboxWorker(sender)
+    outbox.start()
+    storage = SQLiteStorage(ttl_seconds=86400, cache_size=args.fsm_cache_size, flush_interval=0.5)
+    await storage.start()
+    funnel = FunnelTracker()
+    funnel.start()
+    dp = create_dispatcher(storage=storage, sender=sender, outbox=outbox, funnel=funnel)
+
+    # Time the transactional write the final step performs.
+    save_latencies: list[float] = []
+    original_save = test_handlers.save_application
+
+    async def timed_save(*a: Any, **kw: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return await original_save(*a, **kw)
+        finally:
+            save_latencies.append(time.perf_counter() - started)
+
+    test_handlers.save_application = timed_save
+
+    if args.trace_memory:
+        tracemalloc.start()
+    rss_before = rss_bytes()
+
+    ids = _UpdateIds()
+    step_latencies: dict[str, list[float]] = defaultdict(list)
+    failures = 0
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def simulate(n: int) -> None:
+        nonlocal failures
+        user_id = FIRST_USER_ID + n
+        async with semaphore:
+            for step, payload in flow_updates(ids, user_id, campaign_ids[n % len(campaign_ids)]):
+                update = Update.model_validate(payload, context={"bot": bot})
+                started = time.perf_counter()
+                try:
+                    await dp.feed_update(bot, update)
+                except Exception:
+                    failures += 1
+                    return
+                step_latencies[step].append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(simulate(n) for n in range(args.users)))
+    elapsed = time.perf_counter() - started
+
+    rss_after = rss_bytes()
+    traced_peak = tracemalloc.get_traced_memory()[1] if args.trace_memory else None
+    if args.trace_memory:
+        tracemalloc.stop()
+
+    await storage.close()
+    await funnel.stop()
+    await outbox.stop()
+    await sender.stop()
+    data_version_probe.close()
+    await bot.session.close()
+    test_handlers.save_application = original_save
+
+    conn = sqlite3.connect(db_path)
+    saved = conn.execute(
+        "SELECT COUNT(*) FROM applications WHERE telegram_id >= ?", (FIRST_USER_ID,)
+    ).fetchone()[0]
+    conn.close()
+
+    everything = [value for values in step_latencies.values() for value in values]
+    results = {step: summarize_latencies(step_latencies[step], elapsed) for step in STEPS}
+    results["all_updates"] = summarize_latencies(everything, elapsed)
+    results["save_application"] = summarize_latencies(save_latencies, elapsed)
+
+    return {
+        **run_metadata(
+            {
+                "users": args.users,
+                "concurrency": args.concurrency,
+                "api_latency_ms": args.api_latency_ms,
+                "existing_applications": args.existing_applications,
+                "fsm_cache_size": args.fsm_cache_size,
+                "seed": args.seed,
+            }
+        ),
+        "elapsed_s": round(elapsed, 3),
+        "updates_per_s": round(len(everything) / elapsed, 1) if elapsed else 0.0,
+        "flows_per_s": round(args.users / elapsed, 1) if elapsed else 0.0,
+        "applications_saved": saved,
+        "failed_flows": failures,
+        "bot_api_calls": dict(session.calls),
+        "memory": {
+            "rss_before_bytes": rss_before,
+            "rss_after_bytes": rss_after,
+            "traced_peak_bytes": traced_peak,
+        },
+        "results": results,
+    }
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Bot throughput benchmark on a fake Telegram session.")
+    parser.add_argument("--users", type=int, default=2000, help="Simulated applicants.")
+    parser.add_argument("--concurrency", type=int, default=100, help="Applicants active at once.")
+    parser.add_argument("--api-latency-ms", type=float, default=0.0, help="Simulated Bot API latency.")
+    parser.add_argument("--existing-applications", type=int, default=0, help="Rows generated before the run.")
+    parser.add_argument("--fsm-cache-size", type=int, default=1024)
+    parser.add_argument("--trace-memory", action="store_true", help="Report tracemalloc peak (slower).")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> dict[str, Any]:
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix="bot-bench-") as tmp:
+        os.environ.update(
+            {
+                "DB_PATH": str(Path(tmp) / "bench.db"),
+                "BOT_TOKEN": TOKEN,
+                "ADMIN_ID": str(ADMIN_ID),
+                "BOT_MODE": "polling",
+                "BOT_METRICS_PORT": "0",
+                "BOT_MAX_IN_FLIGHT_UPDATES": str(max(args.concurrency, 1)),
+                "BOT_MAX_WAITING_UPDATES": str(args.users * len(STEPS)),
+                "DB_SLOW_QUERY_MS": os.environ.get("DB_SLOW_QUERY_MS") or "1000",
+            }
+        )
+        report = asyncio.run(run(args))
+
+    print_table(report["results"])
+    print(
+        f"{report['updates_per_s']} updates/s, {report['flows_per_s']} flows/s, "
+        f"{report['applications_saved']} applications saved, {report['failed_flows']} failed flows"
+    )
+    write_report(report, args.output)
+    return report
+
+
+if __name__ == "__main__":
+    main()
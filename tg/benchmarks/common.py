@@ -0,0 +1,87 @@
+"""Helpers shared by the benchmark scripts."""
+
+from __future__ import annotations
+
+import json
+import math
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+TG_DIR = Path(__file__).resolve().parents[1]
+if str(TG_DIR) not in sys.path:
+    sys.path.insert(0, str(TG_DIR))
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize_latencies(latencies: list[float], elapsed: float) -> dict[str, Any]:
+    """
+    Latency summary in milliseconds plus throughput over `elapsed` seconds.
+    """
+    values = sorted(latencies)
+    count = len(values)
+    return {
+        "count": count,
+        "throughput_per_s": round(count / elapsed, 2) if elapsed > 0 else 0.0,
+        "mean_ms": round(sum(values) / count * 1000, 3) if count else 0.0,
+        "p50_ms": round(percentile(values, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(values, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(values, 0.99) * 1000, 3),
+        "max_ms": round(values[-1] * 1000, 3) if count else 0.0,
+    }
+
+
+def _git_revision() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=TG_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def run_metadata(parameters: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": parameters,
+    }
+
+
+def write_report(report: dict[str, Any], output: str | None) -> None:
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if output:
+        Path(output).write_text(text + "\n", encoding="utf-8")
+        print(f"Report written to {output}")
+    else:
+        print(text)
+
+
+def print_table(rows: dict[str, dict[str, Any]]) -> None:
+    header = f"{'scenario':<22}{'count':>8}{'err':>6}{'rps':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, row in rows.items():
+        print(
+            f"{name:<22}{row['count']:>8}{row.get('errors', 0):>6}{row['throughput_per_s']:>10.1f}"
+            f"{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}{row['p99_ms']:>10.2f}{row['max_ms']:>10.2f}"
+        )
@@ -0,0 +1,267 @@
+"""
+Migration performance on large databases.
+
+For every size (default 100k, 1M and 5M applications) one database is
+generated with `migrations/generate.py`. Then, for each revision in
+`migrations/versions`, a copy is moved to the previous revision with
+`migrate_to()` (untimed), and the revision's upgrade runs in a fresh child
+process. The child records:
+
+- wall time of the upgrade;
+- peak RSS of the process doing the migration;
+- lock hold time: a probe connection tries `BEGIN IMMEDIATE` every few
+  milliseconds, exactly like the bot's writers, and accumulates the time it
+  was refused; the longest refusal is how long the bot would block;
+- WAL growth: size of the -wal file before, at its peak and after.
+
+    python tg/benchmarks/migrations_perf.py --sizes 100000,1000000 --output migrations.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+TG_DIR = Path(__file__).resolve().parents[1]
+if str(TG_DIR) not in sys.path:
+    sys.path.insert(0, str(TG_DIR))
+
+from benchmarks.common import run_metadata, write_report  # noqa: E402
+
+DEFAULT_SIZES = "100000,1000000,5000000"
+PROBE_INTERVAL = 0.005
+
+
+def _wal_size(db_path: Path) -> int:
+    try:
+        return Path(f"{db_path}-wal").stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def _peak_rss_bytes() -> int:
+    """
+    High-water RSS of this process. `ru_maxrss` survives fork+exec on Linux
+    (a child starts with the parent's peak), so prefer VmHWM, which does not.
+    """
+    try:
+        with open("/proc/self/status", encoding="ascii") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _copy_database(source: Path, target: Path) -> None:
+    # Checkpointed and closed beforehand, so the main file is complete.
+    shutil.copyfile(source, target)
+
+
+class LockProbe(threading.Thread):
+    """
+    Measures how long a concurrent writer is refused the write lock.
+    """
+
+    def __init__(self, db_path: Path) -> None:
+        super().__init__(name="lock-probe", daemon=True)
+        self.db_path = db_path
+        self.stop_event = threading.Event()
+        self.blocked_seconds = 0.0
+        self.longest_block_seconds = 0.0
+        self.peak_wal_bytes = 0
+
+    def run(self) -> None:
+        conn = sqlite3.connect(self.db_path, timeout=0, isolation_level=None, check_same_thread=False)
+        blocked_since: float | None = None
+        try:
+            while not self.stop_event.is_set():
+                self.peak_wal_bytes = max(self.peak_wal_bytes, _wal_size(self.db_path))
+                now = time.perf_counter()
+                try:
+                    conn.execute("BEGIN IMMEDIATE")
+                    conn.execute("ROLLBACK")
+                except sqlite3.OperationalError:
+                    if blocked_since is None:
+                        blocked_since = now
+                else:
+                    if blocked_since is not None:
+                        self._record(now - blocked_since)
+                        blocked_since = None
+                time.sleep(PROBE_INTERVAL)
+            if blocked_since is not None:
+                self._record(time.perf_counter() - blocked_since)
+        finally:
+            conn.close()
+
+    def _record(self, seconds: float) -> None:
+        self.blocked_seconds += seconds
+        self.longest_block_seconds = max(self.longest_block_seconds, seconds)
+
+
+def run_child(db_path: Path, revision: str) -> dict[str, Any]:
+    """
+    Apply exactly one revision (the database is at the one before it).
+    """
+    from migrations.runner import _apply_upgrade, _load_migrations
+
+    migration = next(m for m in _load_migrations() if m.revision == revision)
+    wal_before = _wal_size(db_path)
+    probe = LockProbe(db_path)
+    probe.start()
+    time.sleep(PROBE_INTERVAL * 2)
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA foreign_keys = ON")
+    started = time.perf_counter()
+    try:
+        _apply_upgrade(conn, migration)
+        elapsed = time.perf_counter() - started
+    finally:
+        probe.stop_event.set()
+        probe.join()
+    wal_after = _wal_size(db_path)
+    conn.close()
+
+    return {
+        "revision": revision,
+        "module": migration.module_name,
+        "seconds": round(elapsed, 3),
+        "peak_rss_bytes": _peak_rss_bytes(),
+        "lock_blocked_seconds": round(probe.blocked_seconds, 3),
+        "longest_lock_block_seconds": round(probe.longest_block_seconds, 3),
+        "wal_before_bytes": wal_before,
+        "wal_peak_bytes": max(probe.peak_wal_bytes, wal_after),
+        "wal_after_bytes": wal_after,
+    }
+
+
+def _generated_database(cache_dir: Path, size: int, seed: int) -> Path:
+    from migrations.generate import GeneratorConfig, create_database
+
+    path = cache_dir / f"applications-{size}-seed{seed}.db"
+    if path.exists():
+        return path
+    print(f"Generating {size} applications -> {path}", flush=True)
+    partial = path.with_suffix(".partial")
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{partial}{suffix}").unlink(missing_ok=True)
+    create_database(
+        partial,
+        GeneratorConfig(applications=size, refresh_tokens_per_user=5, password_hash="-", seed=seed),
+    )
+    _checkpoint(partial)
+    partial.rename(path)
+    return path
+
+
+def _checkpoint(db_path: Path) -> None:
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        conn.close()
+
+
+def _measure_revision(source: Path, work_dir: Path, previous: str, revision: str) -> dict[str, Any]:
+    from migrations.runner import migrate_to
+
+    db_path = work_dir / f"at-{previous}.db"
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+    _copy_database(source, db_path)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("PRAGMA foreign_keys = ON")
+        migrate_to(conn, previous)
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        conn.close()
+
+    result = subprocess.run(
+        [sys.executable, __file__, "--child", str(db_path), revision],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Revision {revision} failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run(args: argparse.Namespace) -> dict[str, Any]:
+    from migrations.runner import _load_migrations
+
+    revisions = [m.revision for m in _load_migrations()]
+    selected = [r.strip() for r in args.revisions.split(",")] if args.revisions else revisions
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+
+    cache_dir = Path(args.cache_dir) if args.cache_dir else Path(tempfile.mkdtemp(prefix="migrations-bench-"))
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    work_dir = Path(tempfile.mkdtemp(prefix="migrations-work-"))
+
+    results: dict[str, list[dict[str, Any]]] = {}
+    try:
+        for size in sizes:
+            source = _generated_database(cache_dir, size, args.seed)
+            results[str(size)] = []
+            for revision in selected:
+                index = revisions.index(revision)
+                previous = revisions[index - 1] if index else "base"
+                measured = _measure_revision(source, work_dir, previous, revision)
+                results[str(size)].append(measured)
+                print(
+                    f"{size:>9} {revision} {measured['seconds']:>9.2f}s "
+                    f"rss {measured['peak_rss_bytes'] / 2**20:>7.1f} MiB "
+                    f"blocked {measured['longest_lock_block_seconds']:>8.2f}s "
+                    f"wal peak {measured['wal_peak_bytes'] / 2**20:>8.1f} MiB",
+                    flush=True,
+                )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        if not args.cache_dir:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    return {
+        **run_metadata({"sizes": sizes, "revisions": selected, "seed": args.seed}),
+        "results": results,
+    }
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark each migration on large generated databases.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated application counts.")
+    parser.add_argument("--revisions", help="Comma-separated revisions (default: all).")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--cache-dir", help="Keep generated databases here and reuse them across runs.")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+    parser.add_argument("--child", nargs=2, metavar=("DB", "REVISION"), help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    if args.child:
+        db_path, revision = args.child
+        print(json.dumps(run_child(Path(db_path), revision)))
+        return
+    os.environ.setdefault("DB_PATH", str(Path(tempfile.gettempdir()) / "migrations-bench-unused.db"))
+    write_report(run(args), args.output)
+
+
+if __name__ == "__main__":
+    main()
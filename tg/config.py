@@ -25,6 +25,33 @@ def _require_env(name: str) -> str:
     return value
 
 
+def _int_env(name: str, default: int) -> int:
+    value = os.getenv(name, "").strip()
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError as exc:
+        raise RuntimeError(f"Environment variable '{name}' must be an integer.") from exc
+
+
+def _float_env(name: str, default: float) -> float:
+    value = os.getenv(name, "").strip()
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError as exc:
+        raise RuntimeError(f"Environment variable '{name}' must be a number.") from exc
+
+
+def _bool_env(name: str, default: bool) -> bool:
+    value = os.getenv(name, "").strip().lower()
+    if not value:
+        return default
+    return value in {"1", "true", "yes", "on"}
+
+
 def _parse_admin_id(value: str) -> int:
     try:
         return int(value)
@@ -46,3 +73,54 @@ def _default_db_path() -> Path:
 DB_PATH: Path = Path(
     os.getenv("DB_PATH", str(_default_db_path()))
 ).expanduser().resolve()
+
+# Outgoing Telegram limits: ~30 msg/s per bot, ~1 msg/s per chat.
+SEND_GLOBAL_RATE: float = _float_env("TELEGRAM_SEND_GLOBAL_RATE", 30.0)
+SEND_CHAT_RATE: float = _float_env("TELEGRAM_SEND_CHAT_RATE", 1.0)
+SEND_CHAT_BURST: int = _int_env("TELEGRAM_SEND_CHAT_BURST", 3)
+SEND_MAX_QUEUE: int = _int_env("TELEGRAM_SEND_MAX_QUEUE", 10000)
+
+# Size of the shared keep-alive connection pool to api.telegram.org.
+HTTP_POOL_SIZE: int = _int_env("TELEGRAM_HTTP_POOL_SIZE", 100)
+
+# FSM storage: abandoned conversations expire after FSM_TTL_SECONDS of inactivity.
+FSM_TTL_SECONDS: int = _int_env("FSM_TTL_SECONDS", 86400)
+FSM_CACHE_SIZE: int = _int_env("FSM_CACHE_SIZE", 1024)
+FSM_FLUSH_INTERVAL: float = _float_env("FSM_FLUSH_INTERVAL_SECONDS", 0.5)
+
+# Admission control for incoming updates (see middlewares/admission.py).
+MAX_IN_FLIGHT_UPDATES: int = _int_env("BOT_MAX_IN_FLIGHT_UPDATES", 32)
+MAX_WAITING_UPDATES: int = _int_env("BOT_MAX_WAITING_UPDATES", 1000)
+START_DEBOUNCE_SECONDS: float = _float_env("BOT_START_DEBOUNCE_SECONDS", 2.0)
+
+# Prometheus metrics exporter for the bot process (0 disables it).
+METRICS_HOST: str = os.getenv("BOT_METRICS_HOST", "127.0.0.1").strip() or "127.0.0.1"
+METRICS_PORT: int = _int_env("BOT_METRICS_PORT", 9101)
+
+# Event-loop lag monitor (telemetry/loop_monitor.py); LOOP_MONITOR_INTERVAL_MS=0
+# disables it. LOOP_CAPTURE_STACKS logs the loop thread's stack while it is blocked.
+LOOP_MONITOR_INTERVAL_MS: int = _int_env("LOOP_MONITOR_INTERVAL_MS", 250)
+LOOP_BLOCK_THRESHOLD_MS: int = _int_env("LOOP_BLOCK_THRESHOLD_MS", 100)
+LOOP_CAPTURE_STACKS: bool = _bool_env("LOOP_CAPTURE_STACKS", False)
+
+# tracemalloc frames kept per allocation once SIGUSR1 starts memory tracing.
+MEMORY_TRACE_FRAMES: int = _int_env("MEMORY_TRACE_FRAMES", 10)
+
+# Update delivery: "polling" (default) or "webhook".
+BOT_MODE: str = os.getenv("BOT_MODE", "polling").strip().lower() or "polling"
+if BOT_MODE not in {"polling", "webhook"}:
+    raise RuntimeError("Environment variable 'BOT_MODE' must be 'polling' or 'webhook'.")
+
+# Webhook mode: Telegram calls WEBHOOK_BASE_URL + WEBHOOK_PATH, which must reach
+# WEBHOOK_HOST:WEBHOOK_PORT (usually through the reverse proxy).
+WEBHOOK_BASE_URL: str = os.getenv("WEBHOOK_BASE_URL", "").strip().rstrip("/")
+WEBHOOK_PATH: str = os.getenv("WEBHOOK_PATH", "/telegram/webhook").strip() or "/telegram/webhook"
+WEBHOOK_SECRET: str = os.getenv("WEBHOOK_SECRET", "").strip()
+WEBHOOK_HOST: str = os.getenv("WEBHOOK_HOST", "127.0.0.1").strip() or "127.0.0.1"
+WEBHOOK_PORT: int = _int_env("WEBHOOK_PORT", 8081)
+WEBHOOK_MAX_CONCURRENCY: int = _int_env("WEBHOOK_MAX_CONCURRENCY", 64)
+if BOT_MODE == "webhook" and (not WEBHOOK_BASE_URL or not WEBHOOK_SECRET):
+    raise RuntimeError(
+        "Webhook mode requires 'WEBHOOK_BASE_URL' and 'WEBHOOK_SECRET' "
+        "(secret: 1-256 characters A-Z, a-z, 0-9, '_' and '-')."
+    )
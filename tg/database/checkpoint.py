@@ -0,0 +1,127 @@
+"""
+Background WAL checkpointing for the shared SQLite database.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+
+import aiosqlite
+
+from database.db import CHECKPOINT_INTERVAL_SECONDS, WAL_MAX_BYTES, connect, wal_path
+from telemetry.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+WAL_SIZE_BYTES = REGISTRY.gauge(
+    "sqlite_wal_size_bytes",
+    "Size of the SQLite write-ahead log file.",
+)
+CHECKPOINT_DURATION = REGISTRY.histogram(
+    "sqlite_checkpoint_duration_seconds",
+    "Duration of WAL checkpoints by mode.",
+    ("mode",),
+)
+CHECKPOINT_BUSY = REGISTRY.counter(
+    "sqlite_checkpoint_busy_total",
+    "Checkpoints that could not complete because of concurrent readers or writers.",
+    ("mode",),
+)
+
+
+def _wal_size() -> int:
+    try:
+        return wal_path().stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+class WalCheckpointManager:
+    """
+    Keep the WAL short without stalling the bot or the API.
+
+    A tick runs a PASSIVE checkpoint, which never waits on locks. When no other
+    connection has committed since the previous tick (low load), or when the WAL
+    outgrew `max_wal_bytes`, it runs a TRUNCATE checkpoint instead, which resets
+    the file to zero bytes. An empty WAL is skipped.
+    """
+
+    def __init__(
+        self,
+        *,
+        interval_seconds: int = CHECKPOINT_INTERVAL_SECONDS,
+        max_wal_bytes: int = WAL_MAX_BYTES,
+        busy_timeout_ms: int = 1000,
+    ) -> None:
+        self.interval_seconds = max(1, interval_seconds)
+        self.max_wal_bytes = max(0, max_wal_bytes)
+        self.busy_timeout_ms = max(0, busy_timeout_ms)
+        self._task: asyncio.Task[None] | None = None
+        self._last_data_version: int | None = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="wal-checkpoint")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def checkpoint(self, db: aiosqlite.Connection, mode: str) -> bool:
+        """Run one checkpoint; returns False when it was blocked by another connection."""
+        started = time.perf_counter()
+        cursor = await db.execute(f"PRAGMA wal_checkpoint({mode})")
+        row = await cursor.fetchone()
+        CHECKPOINT_DURATION.observe(time.perf_counter() - started, mode=mode.lower())
+
+        busy = bool(row and row[0])
+        if busy:
+            CHECKPOINT_BUSY.inc(mode=mode.lower())
+        WAL_SIZE_BYTES.set(_wal_size())
+        return not busy
+
+    async def _is_idle(self, db: aiosqlite.Connection) -> bool:
+        # data_version changes whenever another connection commits.
+        cursor = await db.execute("PRAGMA data_version")
+        row = await cursor.fetchone()
+        version = int(row[0]) if row else 0
+        idle = self._last_data_version == version
+        self._last_data_version = version
+        return idle
+
+    async def tick(self, db: aiosqlite.Connection) -> str:
+        wal_size = _wal_size()
+        WAL_SIZE_BYTES.set(wal_size)
+
+        idle = await self._is_idle(db)
+        oversized = self.max_wal_bytes > 0 and wal_size > self.max_wal_bytes
+        if wal_size == 0:
+            return "skip"
+
+        mode = "TRUNCATE" if idle or oversized else "PASSIVE"
+        completed = await self.checkpoint(db, mode)
+        if oversized and not completed:
+            logger.warning(
+                "WAL is %s bytes (limit %s) and TRUNCATE checkpoint was blocked.",
+                wal_size,
+                self.max_wal_bytes,
+            )
+        return mode.lower()
+
+    async def _run(self) -> None:
+        async with connect() as db:
+            await db.execute(f"PRAGMA busy_timeout = {self.busy_timeout_ms}")
+            while True:
+                await asyncio.sleep(self.interval_seconds)
+                try:
+                    await self.tick(db)
+                except aiosqlite.Error as exc:
+                    logger.warning("WAL checkpoint failed: %s", exc)
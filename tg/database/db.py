@@ -4,13 +4,26 @@ SQLite database operations for the bot and admin API.
 
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
 import os
+import random
+import re
+import sqlite3
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional
+from typing import NamedTuple, Optional
 
 import aiosqlite
 
+from database.instrumentation import InstrumentedConnection
+from telemetry.metrics import REGISTRY
+
 BASE_DIR = Path(__file__).resolve().parents[1]
 LEGACY_DB_PATH = BASE_DIR / "applications.db"
 DEFAULT_DB_PATH = BASE_DIR / "data" / "applications.db"
@@ -24,13 +37,197 @@ def _default_db_path() -> Path:
     return DEFAULT_DB_PATH
 
 
+def _int_env(name: str, default: int) -> int:
+    value = os.getenv(name, "").strip()
+    if not value:
+        return default
+    return int(value)
+
+
 DB_PATH = Path(os.getenv("DB_PATH", str(_default_db_path()))).expanduser().resolve()
 
+# WAL tuning. The bot and the API share one file from two processes, so readers
+# must never wait for the other process's writer.
+WAL_AUTOCHECKPOINT_PAGES = _int_env("DB_WAL_AUTOCHECKPOINT_PAGES", 1000)
+WAL_MAX_BYTES = _int_env("DB_WAL_MAX_BYTES", 64 * 1024 * 1024)
+CHECKPOINT_INTERVAL_SECONDS = _int_env("DB_CHECKPOINT_INTERVAL_SECONDS", 30)
+
+# Writer discipline: how long SQLite itself waits for a lock on each attempt,
+# and the overall deadline for acquiring the write lock with retries.
+BUSY_TIMEOUT_MS = _int_env("DB_BUSY_TIMEOUT_MS", 2000)
+WRITE_DEADLINE_MS = _int_env("DB_WRITE_DEADLINE_MS", 10000)
+WRITE_RETRY_BASE_MS = 20
+WRITE_RETRY_MAX_MS = 500
+
+# Statements slower than this are logged with their query plan.
+SLOW_QUERY_MS = _int_env("DB_SLOW_QUERY_MS", 200)
+
+# How stale the campaign cache may get before it re-checks the database.
+CAMPAIGN_CACHE_CHECK_MS = _int_env("DB_CAMPAIGN_CACHE_CHECK_MS", 1000)
+
+# A second application from the same Telegram account or phone within this
+# window is treated as a duplicate of the first one (0 disables the check).
+DEDUP_WINDOW_SECONDS = _int_env("APPLICATION_DEDUP_WINDOW_SECONDS", 24 * 3600)
+DEDUP_MEMORY_SIZE = 10000
+
+LOCK_WAIT_SECONDS = REGISTRY.histogram(
+    "sqlite_lock_wait_seconds",
+    "Time spent acquiring the SQLite write lock.",
+    ("site",),
+)
+LOCK_RETRIES = REGISTRY.counter(
+    "sqlite_lock_retries_total",
+    "BEGIN IMMEDIATE attempts that hit a busy database and were retried.",
+    ("site",),
+)
+LOCK_TIMEOUTS = REGISTRY.counter(
+    "sqlite_lock_timeouts_total",
+    "Write transactions that could not acquire the lock before the deadline.",
+    ("site",),
+)
+CAMPAIGN_CACHE_LOOKUPS = REGISTRY.counter(
+    "campaign_cache_lookups_total",
+    "Campaign lookups served by the in-process cache, by result (found, missing).",
+    ("result",),
+)
+CAMPAIGN_CACHE_RELOADS = REGISTRY.counter(
+    "campaign_cache_reloads_total",
+    "Bulk reloads of the campaign cache.",
+)
+APPLICATION_DUPLICATES = REGISTRY.counter(
+    "application_duplicates_total",
+    "Duplicate applications rejected, by where they were detected (memory, database).",
+    ("source",),
+)
+
+
+class DatabaseBusyError(Exception):
+    """Raised when the write lock cannot be acquired before the deadline."""
+
 
 def _db_path() -> str:
     return str(DB_PATH)
 
 
+def wal_path() -> Path:
+    return DB_PATH.with_name(DB_PATH.name + "-wal")
+
+
+async def configure_connection(db: aiosqlite.Connection) -> None:
+    """
+    Apply per-connection pragmas.
+
+    `journal_mode` is persistent and set once in `init_db`; the rest must be set
+    on every new connection.
+    """
+    await db.execute(f"PRAGMA busy_timeout = {int(BUSY_TIMEOUT_MS)}")
+    await db.execute("PRAGMA synchronous = NORMAL")
+    await db.execute(f"PRAGMA wal_autocheckpoint = {int(WAL_AUTOCHECKPOINT_PAGES)}")
+    await db.execute(f"PRAGMA journal_size_limit = {int(WAL_MAX_BYTES)}")
+
+
+@asynccontextmanager
+async def connect() -> AsyncIterator[aiosqlite.Connection]:
+    """
+    Open a configured connection to the shared database.
+
+    Statements are timed and counted; see `database.instrumentation`.
+    """
+    db = await aiosqlite.connect(_db_path())
+    try:
+        await configure_connection(db)
+        yield InstrumentedConnection(db, slow_query_ms=SLOW_QUERY_MS)
+    finally:
+        await db.close()
+
+
+class DataVersionProbe:
+    """
+    Cheap change detector for the shared database.
+
+    `PRAGMA data_version` on a long-lived connection changes whenever any other
+    connection (in this or another process) commits. Reading it does not touch
+    table pages, so it is safe to call on every request to validate caches.
+    """
+
+    def __init__(self) -> None:
+        self._conn: sqlite3.Connection | None = None
+
+    def current(self) -> int:
+        if self._conn is None:
+            self._conn = sqlite3.connect(
+                _db_path(),
+                isolation_level=None,
+                check_same_thread=False,
+            )
+        row = self._conn.execute("PRAGMA data_version").fetchone()
+        return int(row[0]) if row else 0
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+data_version_probe = DataVersionProbe()
+
+
+def _is_busy_error(exc: aiosqlite.OperationalError) -> bool:
+    message = str(exc).lower()
+    return "database is locked" in message or "database is busy" in message
+
+
+@asynccontextmanager
+async def write_transaction(
+    db: aiosqlite.Connection,
+    *,
+    site: str = "default",
+    deadline_ms: int | None = None,
+) -> AsyncIterator[aiosqlite.Connection]:
+    """
+    Run a block of writes inside `BEGIN IMMEDIATE ... COMMIT`.
+
+    The write lock is taken up front, so the block never fails half-way with
+    `database is locked` while upgrading a read lock. Acquisition is retried with
+    jittered exponential backoff until the deadline; the block is rolled back on
+    any exception and committed otherwise.
+    """
+    started = time.monotonic()
+    deadline = started + (deadline_ms if deadline_ms is not None else WRITE_DEADLINE_MS) / 1000.0
+    attempt = 0
+
+    while True:
+        try:
+            await db.execute("BEGIN IMMEDIATE")
+            break
+        except aiosqlite.OperationalError as exc:
+            if not _is_busy_error(exc):
+                raise
+
+            now = time.monotonic()
+            if now >= deadline:
+                LOCK_TIMEOUTS.inc(site=site)
+                LOCK_WAIT_SECONDS.observe(now - started, site=site)
+                raise DatabaseBusyError(
+                    f"Write lock not acquired within {now - started:.2f}s ({site})."
+                ) from exc
+
+            attempt += 1
+            LOCK_RETRIES.inc(site=site)
+            backoff_ms = min(WRITE_RETRY_MAX_MS, WRITE_RETRY_BASE_MS * 2 ** attempt)
+            delay = random.uniform(backoff_ms / 2, backoff_ms) / 1000.0
+            await asyncio.sleep(min(delay, max(0.0, deadline - now)))
+
+    LOCK_WAIT_SECONDS.observe(time.monotonic() - started, site=site)
+    try:
+        yield db
+    except BaseException:
+        await db.rollback()
+        raise
+    else:
+        await db.commit()
+
+
 def parse_campaign_id_from_source(source: str | None) -> int | None:
     """
     Parse campaign id from deep-link payload.
@@ -62,7 +259,12 @@ async def init_db() -> None:
     """
     DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
-    async with aiosqlite.connect(_db_path()) as db:
+    async with connect() as db:
+        cursor = await db.execute("PRAGMA journal_mode = WAL")
+        row = await cursor.fetchone()
+        if not row or str(row[0]).lower() != "wal":
+            logger.warning("Failed to enable WAL mode, journal_mode=%s", row[0] if row else None)
+
         await db.execute(
             """
             CREATE TABLE IF NOT EXISTS applications (
@@ -79,6 +281,43 @@ async def init_db() -> None:
             )
             """
         )
+        # The bot may start before the API has applied migrations, so tables it
+        # cannot work without are also created here and by their owners
+        # (services.fsm_storage, services.funnel) with the same definition as
+        # the migration that introduced them. This one is migration 0004.
+        await db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS notification_outbox (
+                id              INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind            TEXT    NOT NULL,
+                chat_id         INTEGER NOT NULL,
+                application_id  INTEGER,
+                payload         TEXT    NOT NULL,
+                status          TEXT    NOT NULL DEFAULT 'pending'
+                                        CHECK (status IN ('pending', 'sent', 'failed')),
+                attempts        INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at TEXT    NOT NULL DEFAULT (datetime('now')),
+                created_at      TEXT    NOT NULL DEFAULT (datetime('now')),
+                sent_at         TEXT,
+                last_error      TEXT
+            )
+            """
+        )
+        await db.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_notification_outbox_pending
+            ON notification_outbox(next_attempt_at)
+            WHERE status = 'pending'
+            """
+        )
+        # Duplicate detection by account; the phone index comes with the
+        # `phone_normalized` column from migration 0007.
+        await db.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_applications_telegram_submitted
+            ON applications(telegram_id, submitted_at)
+            """
+        )
         await db.commit()
 
 
@@ -88,13 +327,152 @@ async def _table_columns(db: aiosqlite.Connection, table_name: str) -> set[str]:
     return {row[1] for row in rows}
 
 
-async def save_application(data: dict) -> Optional[int]:
+def phone_key(phone: str | None) -> str | None:
+    """
+    Digits-only form of a phone number used for duplicate detection.
+    """
+    digits = re.sub(r"\D", "", phone or "")
+    return digits or None
+
+
+class SavedApplication(NamedTuple):
+    id: int
+    created: bool
+
+
+class RecentApplicants:
+    """
+    In-memory index of applications accepted within the dedup window.
+
+    Keys are `("tg", telegram_id)` and `("phone", phone_key)`. An entry expires
+    one window after the application was submitted, not after it was last
+    looked up, and the index is capped at `max_size`, so a repeat press is
+    answered without a database query.
+    """
+
+    def __init__(self, window_seconds: int = DEDUP_WINDOW_SECONDS, max_size: int = DEDUP_MEMORY_SIZE) -> None:
+        self.window_seconds = window_seconds
+        self.max_size = max_size
+        self._entries: OrderedDict[tuple[str, object], tuple[int, float]] = OrderedDict()
+
+    @staticmethod
+    def _keys(telegram_id: int | None, phone: str | None) -> list[tuple[str, object]]:
+        keys: list[tuple[str, object]] = []
+        if telegram_id is not None:
+            keys.append(("tg", telegram_id))
+        if phone:
+            keys.append(("phone", phone))
+        return keys
+
+    def _prune(self, now: float) -> None:
+        while self._entries:
+            key, (_, seen_at) = next(iter(self._entries.items()))
+            if now - seen_at < self.window_seconds and len(self._entries) <= self.max_size:
+                break
+            del self._entries[key]
+
+    def lookup(self, telegram_id: int | None, phone: str | None, now: float | None = None) -> Optional[int]:
+        now = time.time() if now is None else now
+        self._prune(now)
+        for key in self._keys(telegram_id, phone):
+            entry = self._entries.get(key)
+            # Entries remembered from the database may be older than ones
+            # behind them, so `_prune` alone does not expire them.
+            if entry is not None and now - entry[1] < self.window_seconds:
+                return entry[0]
+        return None
+
+    def remember(
+        self,
+        telegram_id: int | None,
+        phone: str | None,
+        app_id: int,
+        seen_at: float | None = None,
+    ) -> None:
+        """`seen_at` is when the application was submitted (default: now)."""
+        now = time.time()
+        for key in self._keys(telegram_id, phone):
+            self._entries[key] = (app_id, now if seen_at is None else seen_at)
+            self._entries.move_to_end(key)
+        self._prune(now)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+recent_applicants = RecentApplicants()
+
+
+def _submitted_timestamp(submitted_at: str | None) -> float:
+    """Epoch time of a `submitted_at` value (local time, as the bot writes it)."""
+    try:
+        return datetime.fromisoformat(str(submitted_at)).timestamp()
+    except ValueError:
+        return time.time()
+
+
+async def _find_recent_application(
+    db: aiosqlite.Connection,
+    telegram_id: int | None,
+    phone: str | None,
+    columns: set[str],
+) -> Optional[tuple[int, float]]:
+    """Id and submission time of the latest application within the window."""
+    since = (datetime.now() - timedelta(seconds=DEDUP_WINDOW_SECONDS)).strftime("%Y-%m-%d %H:%M:%S")
+    cursor = await db.execute(
+        """
+        SELECT id, submitted_at FROM applications
+        WHERE telegram_id = ? AND submitted_at >= ?
+        ORDER BY submitted_at DESC
+        LIMIT 1
+        """,
+        (telegram_id, since),
+    )
+    row = await cursor.fetchone()
+    if row:
+        return int(row[0]), _submitted_timestamp(row[1])
+
+    if phone and "phone_normalized" in columns:
+        cursor = await db.execute(
+            """
+            SELECT id, submitted_at FROM applications
+            WHERE phone_normalized = ? AND submitted_at >= ?
+            ORDER BY submitted_at DESC
+            LIMIT 1
+            """,
+            (phone, since),
+        )
+        row = await cursor.fetchone()
+        if row:
+            return int(row[0]), _submitted_timestamp(row[1])
+    return None
+
+
+async def save_application(data: dict, notification: Optional[dict] = None) -> SavedApplication:
     """
     Save a validated application to the database.
 
     Supports legacy and migrated schema without breaking old flow.
+
+    If the same Telegram account or phone already applied within
+    `DEDUP_WINDOW_SECONDS`, nothing is written and the existing application id
+    is returned with `created=False`. Recent applicants are checked in memory
+    first; the database check runs inside the write transaction, so two
+    concurrent presses cannot both insert.
+
+    If `notification` is given (`kind`, `chat_id`, `payload`), it is queued in
+    `notification_outbox` in the same transaction, so an application is never
+    stored without its admin alert.
     """
-    async with aiosqlite.connect(_db_path()) as db:
+    telegram_id = data.get("telegram_id")
+    normalized_phone = phone_key(data.get("phone"))
+    if DEDUP_WINDOW_SECONDS > 0:
+        existing_id = recent_applicants.lookup(telegram_id, normalized_phone)
+        if existing_id is not None:
+            APPLICATION_DUPLICATES.inc(source="memory")
+            return SavedApplication(existing_id, False)
+
+    async with connect() as db:
         columns = await _table_columns(db, "applications")
 
         fields = [
@@ -147,15 +525,49 @@ async def save_application(data: dict) -> Optional[int]:
             values.append(":revenue")
             payload["revenue"] = data.get("revenue")
 
-        cursor = await db.execute(
-            f"""
-            INSERT INTO applications ({", ".join(fields)})
-            VALUES ({", ".join(values)})
-            """,
-            payload,
-        )
-        await db.commit()
-        return cursor.lastrowid
+        if "phone_normalized" in columns:
+            fields.append("phone_normalized")
+            values.append(":phone_normalized")
+            payload["phone_normalized"] = normalized_phone
+
+        async with write_transaction(db, site="save_application"):
+            if DEDUP_WINDOW_SECONDS > 0:
+                existing = await _find_recent_application(db, telegram_id, normalized_phone, columns)
+                if existing is not None:
+                    existing_id, submitted_at = existing
+                    APPLICATION_DUPLICATES.inc(source="database")
+                    recent_applicants.remember(telegram_id, normalized_phone, existing_id, seen_at=submitted_at)
+                    return SavedApplication(existing_id, False)
+
+            cursor = await db.execute(
+                f"""
+                INSERT INTO applications ({", ".join(fields)})
+                VALUES ({", ".join(values)})
+                """,
+                payload,
+            )
+            app_id = cursor.lastrowid
+            if notification is not None:
+                await db.execute(
+                    """
+                    INSERT INTO notification_outbox (kind, chat_id, application_id, payload)
+                    VALUES (?, ?, ?, ?)
+                    """,
+                    (
+                        notification["kind"],
+                        notification["chat_id"],
+                        app_id,
+                        json.dumps(notification.get("payload") or {}, ensure_ascii=False),
+                    ),
+                )
+        if DEDUP_WINDOW_SECONDS > 0:
+            recent_applicants.remember(
+                telegram_id,
+                normalized_phone,
+                app_id,
+                seen_at=_submitted_timestamp(payload["submitted_at"]),
+            )
+        return SavedApplication(app_id, True)
 
 
 async def get_campaign_by_id(campaign_id: int) -> Optional[dict]:
@@ -163,7 +575,7 @@ async def get_campaign_by_id(campaign_id: int) -> Optional[dict]:
     Retrieve campaign by id if campaigns table exists.
     """
     try:
-        async with aiosqlite.connect(_db_path()) as db:
+        async with connect() as db:
             db.row_factory = aiosqlite.Row
             cursor = await db.execute(
                 """
@@ -180,11 +592,116 @@ async def get_campaign_by_id(campaign_id: int) -> Optional[dict]:
         return None
 
 
+async def _read_table_version(db: aiosqlite.Connection, name: str) -> Optional[int]:
+    try:
+        cursor = await db.execute("SELECT version FROM table_versions WHERE name = ?", (name,))
+    except aiosqlite.OperationalError:
+        return None
+    row = await cursor.fetchone()
+    return int(row[0]) if row else None
+
+
+async def get_table_version(name: str) -> Optional[int]:
+    """
+    Return the change counter of a table from `table_versions`.
+
+    Triggers bump it on every write to that table (migrations 0006 and 0009);
+    None when migrations have not been applied yet.
+    """
+    async with connect() as db:
+        return await _read_table_version(db, name)
+
+
+class CampaignCache:
+    """
+    In-process snapshot of all campaigns for deep-link resolution.
+
+    The whole table is loaded in one query, so unknown ids (garbage or
+    stale links) are answered from memory as well. At most once per
+    `check_interval` seconds the snapshot is revalidated:
+
+    1. `PRAGMA data_version` — no I/O; unchanged means nothing was committed;
+    2. the `campaigns` counter in `table_versions` (bumped by triggers from
+       migration 0006) — unchanged means the commit touched other tables;
+    3. otherwise the snapshot is reloaded.
+
+    Without `table_versions` (migrations not applied) step 2 is skipped.
+    """
+
+    def __init__(self, check_interval: float = CAMPAIGN_CACHE_CHECK_MS / 1000) -> None:
+        self.check_interval = check_interval
+        self._campaigns: dict[int, dict] | None = None
+        self._data_version: int | None = None
+        self._table_version: int | None = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        self._campaigns = None
+
+    async def get(self, campaign_id: int) -> Optional[dict]:
+        campaigns = self._campaigns
+        if campaigns is None or time.monotonic() - self._checked_at >= self.check_interval:
+            campaigns = await self._revalidate()
+        campaign = campaigns.get(campaign_id)
+        CAMPAIGN_CACHE_LOOKUPS.inc(result="found" if campaign else "missing")
+        return dict(campaign) if campaign else None
+
+    async def _revalidate(self) -> dict[int, dict]:
+        async with self._lock:
+            if self._campaigns is not None and time.monotonic() - self._checked_at < self.check_interval:
+                return self._campaigns
+
+            data_version = data_version_probe.current()
+            if self._campaigns is not None and data_version == self._data_version:
+                self._checked_at = time.monotonic()
+                return self._campaigns
+
+            try:
+                async with connect() as db:
+                    table_version = await _read_table_version(db, "campaigns")
+                    if (
+                        self._campaigns is None
+                        or table_version is None
+                        or table_version != self._table_version
+                    ):
+                        self._campaigns = await self._load_all(db)
+                        CAMPAIGN_CACHE_RELOADS.inc()
+                    self._table_version = table_version
+            except aiosqlite.Error as exc:
+                logger.warning("Campaign cache reload failed: %s", exc)
+                if self._campaigns is None:
+                    self._campaigns = {}
+
+            self._data_version = data_version
+            self._checked_at = time.monotonic()
+            return self._campaigns
+
+    @staticmethod
+    async def _load_all(db: aiosqlite.Connection) -> dict[int, dict]:
+        db.row_factory = aiosqlite.Row
+        try:
+            cursor = await db.execute(
+                "SELECT id, investor_id, name, budget, status, created_at FROM campaigns"
+            )
+        except aiosqlite.OperationalError as exc:
+            if "no such table" not in str(exc):
+                raise
+            return {}
+        return {int(row["id"]): dict(row) for row in await cursor.fetchall()}
+
+
+campaign_cache = CampaignCache()
+
+
 async def get_active_campaign(campaign_id: int) -> Optional[dict]:
     """
     Retrieve active campaign by id.
+
+    Served from `campaign_cache`; the database is touched only after campaigns
+    change, so /start deep links stay cheap during campaign launches.
     """
-    campaign = await get_campaign_by_id(campaign_id)
+    campaign = await campaign_cache.get(campaign_id)
     if not campaign:
         return None
     return campaign if campaign.get("status") == "active" else None
@@ -194,7 +711,7 @@ async def count_applications() -> int:
     """
     Return total amount of applications.
     """
-    async with aiosqlite.connect(_db_path()) as db:
+    async with connect() as db:
         cursor = await db.execute("SELECT COUNT(*) FROM applications")
         row = await cursor.fetchone()
         return int(row[0]) if row else 0
@@ -207,7 +724,7 @@ async def get_applications_page(limit: int = 20, offset: int = 0) -> list[dict]:
     safe_limit = max(1, min(limit, 100))
     safe_offset = max(0, offset)
 
-    async with aiosqlite.connect(_db_path()) as db:
+    async with connect() as db:
         db.row_factory = aiosqlite.Row
         cursor = await db.execute(
             """
@@ -225,7 +742,7 @@ async def get_application_by_id(app_id: int) -> Optional[dict]:
     """
     Retrieve a single application by primary key.
     """
-    async with aiosqlite.connect(_db_path()) as db:
+    async with connect() as db:
         db.row_factory = aiosqlite.Row
         cursor = await db.execute(
             "SELECT * FROM applications WHERE id = ?",
@@ -242,15 +759,112 @@ async def get_all_applications() -> list[dict]:
     return await get_applications_page(limit=1000, offset=0)
 
 
+# Partial update of one application for `executemany`: each row's flags pick
+# which of status and revenue it sets. Parameters: (set_status, status,
+# set_revenue, revenue, id). Used by bulk API updates and CSV reconciliation.
+APPLICATION_PATCH_SQL = """
+    UPDATE applications
+    SET status = CASE WHEN ? THEN ? ELSE status END,
+        revenue = CASE WHEN ? THEN ? ELSE revenue END
+    WHERE id = ?
+"""
+
+
 async def mark_contacted(app_id: int) -> bool:
     """
     Mark application as contacted once.
     """
-    async with aiosqlite.connect(_db_path()) as db:
+    async with connect() as db:
+        async with write_transaction(db, site="mark_contacted"):
+            cursor = await db.execute(
+                "UPDATE applications SET contacted = 1 WHERE id = ? AND contacted = 0",
+                (app_id,),
+            )
+        return cursor.rowcount > 0
+
+
+async def fetch_due_notifications(limit: int = 50) -> list[dict]:
+    """
+    Return pending outbox rows whose next attempt is due, oldest first.
+    """
+    async with connect() as db:
+        db.row_factory = aiosqlite.Row
         cursor = await db.execute(
-            "UPDATE applications SET contacted = 1 WHERE id = ? AND contacted = 0",
-            (app_id,),
+            """
+            SELECT id, kind, chat_id, application_id, payload, attempts, created_at
+            FROM notification_outbox
+            WHERE status = 'pending' AND next_attempt_at <= datetime('now')
+            ORDER BY next_attempt_at, id
+            LIMIT ?
+            """,
+            (max(1, limit),),
         )
-        await db.commit()
-        return cursor.rowcount > 0
+        rows = await cursor.fetchall()
+
+    notifications = []
+    for row in rows:
+        item = dict(row)
+        item["payload"] = json.loads(item["payload"] or "{}")
+        notifications.append(item)
+    return notifications
+
 
+async def mark_notifications_sent(ids: list[int]) -> None:
+    """
+    Mark delivered outbox rows as sent.
+    """
+    if not ids:
+        return
+    async with connect() as db:
+        async with write_transaction(db, site="outbox.sent"):
+            await db.executemany(
+                """
+                UPDATE notification_outbox
+                SET status = 'sent', sent_at = datetime('now'), attempts = attempts + 1
+                WHERE id = ?
+                """,
+                [(notification_id,) for notification_id in ids],
+            )
+
+
+async def reschedule_notifications(failures: list[tuple[int, int, str, bool]]) -> None:
+    """
+    Record failed delivery attempts.
+
+    Each item is `(id, delay_seconds, error, give_up)`; rows that give up are
+    marked `failed`, the rest stay pending until the delay expires.
+    """
+    if not failures:
+        return
+    async with connect() as db:
+        async with write_transaction(db, site="outbox.retry"):
+            await db.executemany(
+                """
+                UPDATE notification_outbox
+                SET attempts = attempts + 1,
+                    last_error = ?,
+                    status = CASE WHEN ? THEN 'failed' ELSE 'pending' END,
+                    next_attempt_at = datetime('now', '+' || ? || ' seconds')
+                WHERE id = ?
+                """,
+                [
+                    (error[:500], 1 if give_up else 0, int(delay), notification_id)
+                    for notification_id, delay, error, give_up in failures
+                ],
+            )
+
+
+async def outbox_backlog() -> tuple[int, Optional[str]]:
+    """
+    Return the number of pending notifications and the oldest `created_at`.
+    """
+    async with connect() as db:
+        cursor = await db.execute(
+            """
+            SELECT COUNT(*), MIN(created_at)
+            FROM notification_outbox
+            WHERE status = 'pending'
+            """
+        )
+        row = await cursor.fetchone()
+        return (int(row[0]), row[1]) if row else (0, None)
@@ -0,0 +1,230 @@
+"""
+SQL statement instrumentation shared by the bot and the admin API.
+
+`connect()` in `database.db` hands out `InstrumentedConnection` wrappers, so
+every statement is timed, statements slower than `DB_SLOW_QUERY_MS` are logged
+together with their `EXPLAIN QUERY PLAN`, and statements are counted into the
+active `QueryTracker` (one per API request; see `api.instrumentation`).
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import sqlite3
+import time
+from collections import Counter, OrderedDict
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+import aiosqlite
+
+from telemetry.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+
+EXPLAIN_CACHE_SIZE = 256
+SQL_LOG_LIMIT = 500
+
+# Transaction control and pragmas are timed elsewhere (lock waits) and do not
+# count towards query budgets.
+_CONTROL_KINDS = frozenset({"begin", "commit", "rollback", "end", "pragma", "savepoint", "release"})
+_EXPLAINABLE_KINDS = frozenset({"select", "with", "insert", "update", "delete", "replace"})
+
+STATEMENT_SECONDS = REGISTRY.histogram(
+    "sqlite_statement_duration_seconds",
+    "SQLite statement execution time by statement kind.",
+    ("kind",),
+)
+SLOW_STATEMENTS = REGISTRY.counter(
+    "sqlite_slow_statements_total",
+    "Statements slower than DB_SLOW_QUERY_MS, by statement kind.",
+    ("kind",),
+)
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Collapse whitespace so one statement always maps to one key.
+    """
+    return " ".join(sql.split())
+
+
+def statement_kind(sql: str) -> str:
+    match = re.match(r"\s*(\w+)", sql)
+    return match.group(1).lower() if match else "other"
+
+
+class QueryTracker:
+    """
+    Counts statements executed within one unit of work (usually a request).
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_seconds = 0.0
+        self.statements: Counter[str] = Counter()
+
+    def record(self, sql: str, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        self.statements[normalize_sql(sql)] += 1
+
+    def repeated(self, threshold: int = 3) -> list[tuple[str, int]]:
+        """
+        Statements executed at least `threshold` times: the N+1 suspects.
+        """
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= threshold]
+
+    def summary(self, limit: int = 3) -> str:
+        repeated = self.repeated()[:limit]
+        if not repeated:
+            return f"{self.count} statements"
+        details = "; ".join(f"{n}x {sql[:200]}" for sql, n in repeated)
+        return f"{self.count} statements, repeated: {details}"
+
+
+_current_tracker: ContextVar[QueryTracker | None] = ContextVar("query_tracker", default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryTracker]:
+    """
+    Count statements executed in the current context (and tasks spawned from it).
+    """
+    tracker = QueryTracker()
+    token = _current_tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _current_tracker.reset(token)
+
+
+@contextmanager
+def assert_max_queries(limit: int) -> Iterator[QueryTracker]:
+    """
+    Test helper: fail if the block runs more than `limit` statements.
+
+        with assert_max_queries(3):
+            await list_applications(...)
+    """
+    with track_queries() as tracker:
+        yield tracker
+    if tracker.count > limit:
+        raise AssertionError(f"Expected at most {limit} queries, got {tracker.summary()}")
+
+
+class _ExplainedStatements:
+    """Bounded memory of statements whose plan was already logged."""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._seen: OrderedDict[str, None] = OrderedDict()
+
+    def first_time(self, sql: str) -> bool:
+        if sql in self._seen:
+            self._seen.move_to_end(sql)
+            return False
+        self._seen[sql] = None
+        while len(self._seen) > self.size:
+            self._seen.popitem(last=False)
+        return True
+
+
+_explained = _ExplainedStatements(EXPLAIN_CACHE_SIZE)
+
+
+class InstrumentedConnection:
+    """
+    Thin proxy around `aiosqlite.Connection` that instruments `execute` and
+    `executemany`; everything else is forwarded untouched.
+    """
+
+    __slots__ = ("_conn", "_slow_query_ms")
+
+    def __init__(self, conn: aiosqlite.Connection, *, slow_query_ms: int) -> None:
+        object.__setattr__(self, "_conn", conn)
+        object.__setattr__(self, "_slow_query_ms", slow_query_ms)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._conn, name, value)
+
+    @property
+    def raw(self) -> aiosqlite.Connection:
+        return self._conn
+
+    async def execute(self, sql: str, parameters: Sequence[Any] | dict[str, Any] | None = None) -> aiosqlite.Cursor:
+        cursor, seconds = await self._timed(self._conn._conn.execute, sql, [] if parameters is None else parameters)
+        await self._observe(sql, parameters, seconds)
+        return aiosqlite.Cursor(self._conn, cursor)
+
+    async def executemany(self, sql: str, parameters: Iterable[Sequence[Any]]) -> aiosqlite.Cursor:
+        cursor, seconds = await self._timed(self._conn._conn.executemany, sql, parameters)
+        await self._observe(sql, None, seconds, explain=False)
+        return aiosqlite.Cursor(self._conn, cursor)
+
+    async def _timed(self, function: Callable[..., sqlite3.Cursor], *args: Any) -> tuple[sqlite3.Cursor, float]:
+        """
+        Run a sqlite3 call on the connection's worker thread and time it there.
+
+        Timed on the event loop, the result would include loop lag (a blocking
+        bcrypt hash, say) and report fast statements as slow. Goes through
+        aiosqlite's `_execute`, which its own `execute` uses the same way.
+        """
+
+        def run() -> tuple[sqlite3.Cursor, float]:
+            started = time.perf_counter()
+            result = function(*args)
+            return result, time.perf_counter() - started
+
+        return await self._conn._execute(run)
+
+    async def _observe(
+        self,
+        sql: str,
+        parameters: Sequence[Any] | dict[str, Any] | None,
+        seconds: float,
+        *,
+        explain: bool = True,
+    ) -> None:
+        kind = statement_kind(sql)
+        if kind in _CONTROL_KINDS:
+            return
+
+        STATEMENT_SECONDS.observe(seconds, kind=kind)
+        tracker = _current_tracker.get()
+        if tracker is not None:
+            tracker.record(sql, seconds)
+
+        if seconds * 1000 < self._slow_query_ms:
+            return
+        SLOW_STATEMENTS.inc(kind=kind)
+        normalized = normalize_sql(sql)
+        plan = None
+        if explain and kind in _EXPLAINABLE_KINDS and _explained.first_time(normalized):
+            plan = await self._explain(sql, parameters)
+        logger.warning(
+            "Slow query (%.1f ms): %s%s",
+            seconds * 1000,
+            normalized[:SQL_LOG_LIMIT],
+            f"\n  plan: {plan}" if plan else "",
+        )
+
+    async def _explain(
+        self,
+        sql: str,
+        parameters: Sequence[Any] | dict[str, Any] | None,
+    ) -> str | None:
+        try:
+            cursor = await self._conn.execute(f"EXPLAIN QUERY PLAN {sql}", parameters)
+            rows = await cursor.fetchall()
+        except aiosqlite.Error as exc:
+            logger.debug("EXPLAIN QUERY PLAN failed: %s", exc)
+            return None
+        return " | ".join(str(row[-1]) for row in rows)
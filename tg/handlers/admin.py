@@ -2,27 +2,37 @@
 handlers/admin.py — Admin-only handlers.
 """
 
+import html
 import logging
 import math
+from collections import OrderedDict
+from typing import NamedTuple
 
 from aiogram import F, Router
+from aiogram.exceptions import TelegramBadRequest
 from aiogram.filters import Command, CommandObject
-from aiogram.types import CallbackQuery, Message
+from aiogram.types import CallbackQuery, InlineKeyboardMarkup, Message
 
 from config import ADMIN_ID
 from database.db import (
     count_applications,
+    data_version_probe,
     get_application_by_id,
     get_applications_page,
+    get_table_version,
     mark_contacted,
 )
-from keyboards.keyboards import get_contacted_done_keyboard, get_contacted_keyboard
+from keyboards.keyboards import (
+    get_applications_page_keyboard,
+    get_contacted_done_keyboard,
+)
 
 logger = logging.getLogger(__name__)
 
 router = Router(name="admin")
 
 PAGE_SIZE = 10
+PAGE_CACHE_SIZE = 32
 
 
 def _render_application_message(app: dict) -> str:
@@ -41,11 +51,138 @@ def _render_application_message(app: dict) -> str:
     )
 
 
+def _render_application_line(app: dict) -> str:
+    status = "✅" if app["contacted"] else "🆕"
+    name = html.escape(app["first_name"] or "—")
+    username = f"@{html.escape(app['username'])}" if app["username"] else "—"
+    source = html.escape(app["source"] or "—")
+    return (
+        f"{status} <b>#{app['id']}</b> {name} · {html.escape(app['phone'])} · "
+        f"{app['age']} · {html.escape(app['citizenship'])}\n"
+        f"      {username} · {source} · {app['submitted_at']}"
+    )
+
+
+def _render_page(applications: list[dict], page: int, total_pages: int, total: int) -> str:
+    header = (
+        f"📋 <b>Заявки</b> — стр. {page}/{total_pages} "
+        f"(всего {total}, по {PAGE_SIZE} шт.)"
+    )
+    lines = [_render_application_line(app) for app in applications]
+    return header + "\n\n" + "\n\n".join(lines)
+
+
+# (`applications` counter from `table_versions`, 0), or (None, data_version)
+# while migrations have not been applied.
+PageVersion = tuple[int | None, int]
+
+
+class _RenderedPage(NamedTuple):
+    version: PageVersion
+    page: int
+    text: str
+    reply_markup: InlineKeyboardMarkup | None
+
+
+class PageCache:
+    """
+    Small LRU of rendered /app pages keyed by page number.
+
+    An entry is valid while the `applications` counter in `table_versions`
+    (bumped by migration 0009's triggers) is unchanged, so new applications
+    and contacted marks re-render on next view while FSM flushes, funnel
+    rollups and outbox updates do not. The counter is read only after
+    `PRAGMA data_version` shows that something was committed. Without
+    migrations every commit invalidates the pages.
+    """
+
+    def __init__(self, max_pages: int = PAGE_CACHE_SIZE) -> None:
+        self.max_pages = max_pages
+        self._pages: OrderedDict[int, _RenderedPage] = OrderedDict()
+        self._data_version: int | None = None
+        self._version: PageVersion | None = None
+
+    async def current_version(self) -> PageVersion:
+        data_version = data_version_probe.current()
+        if self._version is not None and data_version == self._data_version:
+            return self._version
+        # Read after data_version: a commit in between only causes one more read.
+        table_version = await get_table_version("applications")
+        self._version = (table_version, 0) if table_version is not None else (None, data_version)
+        self._data_version = data_version
+        return self._version
+
+    def get(self, page: int, version: PageVersion) -> _RenderedPage | None:
+        cached = self._pages.get(page)
+        if cached is None or cached.version != version:
+            return None
+        self._pages.move_to_end(page)
+        return cached
+
+    def put(self, requested_page: int, rendered: _RenderedPage) -> None:
+        self._pages[requested_page] = rendered
+        self._pages.move_to_end(requested_page)
+        while len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+
+
+page_cache = PageCache()
+
+
+async def _build_page(page: int) -> _RenderedPage:
+    """
+    Render a page of applications, reusing the cached render when nothing changed.
+    """
+    version = await page_cache.current_version()
+    cached = page_cache.get(page, version)
+    if cached is not None:
+        return cached
+
+    total = await count_applications()
+    if total == 0:
+        rendered = _RenderedPage(version, 1, "📭 Заявок пока нет.", None)
+        page_cache.put(page, rendered)
+        return rendered
+
+    total_pages = max(1, math.ceil(total / PAGE_SIZE))
+    current = min(max(1, page), total_pages)
+    applications = await get_applications_page(
+        limit=PAGE_SIZE,
+        offset=(current - 1) * PAGE_SIZE,
+    )
+    rendered = _RenderedPage(
+        version,
+        current,
+        _render_page(applications, current, total_pages, total),
+        get_applications_page_keyboard(applications, current, total_pages),
+    )
+    page_cache.put(page, rendered)
+    return rendered
+
+
+async def _show_page_in_place(callback: CallbackQuery, page: int) -> None:
+    rendered = await _build_page(page)
+    if not callback.message:
+        return
+    try:
+        await callback.message.edit_text(
+            text=rendered.text,
+            reply_markup=rendered.reply_markup,
+        )
+    except TelegramBadRequest as exc:
+        # Refresh of an unchanged page: Telegram rejects identical edits.
+        if "message is not modified" not in str(exc):
+            raise
+
+
 @router.message(Command("app"))
 async def cmd_app(message: Message, command: CommandObject) -> None:
     """
-    Admin command to list applications with pagination.
+    Admin command to browse applications.
     Usage: /app [page]
+
+    The page is rendered into a single message; navigation and "contacted"
+    buttons edit that message in place instead of sending new ones.
     """
     if message.from_user.id != ADMIN_ID:
         await message.answer("⛔ Эта команда доступна только администратору.")
@@ -59,39 +196,51 @@ async def cmd_app(message: Message, command: CommandObject) -> None:
             return
         page = int(raw_page)
 
-    total = await count_applications()
-    if total == 0:
-        await message.answer("📭 Заявок пока нет.")
+    rendered = await _build_page(page)
+    await message.answer(rendered.text, reply_markup=rendered.reply_markup)
+
+
+@router.callback_query(F.data.startswith("apps:page:"))
+async def cb_applications_page(callback: CallbackQuery) -> None:
+    """
+    Navigate the /app browser: re-render the requested page in place.
+    """
+    if callback.from_user.id != ADMIN_ID:
+        await callback.answer("⛔ Только для администратора.", show_alert=True)
         return
 
-    total_pages = max(1, math.ceil(total / PAGE_SIZE))
-    if page > total_pages:
-        page = total_pages
+    raw = callback.data.rsplit(":", maxsplit=1)[1]
+    if not raw.isdigit():
+        await callback.answer("❌ Некорректная страница.", show_alert=True)
+        return
 
-    offset = (page - 1) * PAGE_SIZE
-    applications = await get_applications_page(limit=PAGE_SIZE, offset=offset)
+    await _show_page_in_place(callback, int(raw))
+    await callback.answer()
 
-    await message.answer(
-        f"📋 <b>Всего заявок:</b> {total}\n"
-        f"<b>Страница:</b> {page}/{total_pages} "
-        f"(по {PAGE_SIZE} шт.)"
-    )
 
-    for app in applications:
-        keyboard = (
-            get_contacted_done_keyboard()
-            if app["contacted"]
-            else get_contacted_keyboard(app["id"])
-        )
-        await message.answer(_render_application_message(app), reply_markup=keyboard)
-
-    if total_pages > 1:
-        hints: list[str] = []
-        if page > 1:
-            hints.append(f"⬅️ <code>/app {page - 1}</code>")
-        if page < total_pages:
-            hints.append(f"➡️ <code>/app {page + 1}</code>")
-        await message.answer(" ".join(hints))
+@router.callback_query(F.data.startswith("apps:contacted:"))
+async def cb_applications_contacted(callback: CallbackQuery) -> None:
+    """
+    Mark an application from the /app browser as contacted and refresh the page.
+    """
+    if callback.from_user.id != ADMIN_ID:
+        await callback.answer("⛔ Только для администратора.", show_alert=True)
+        return
+
+    parts = callback.data.split(":")
+    if len(parts) != 4 or not parts[2].isdigit() or not parts[3].isdigit():
+        await callback.answer("❌ Некорректный ID заявки.", show_alert=True)
+        return
+
+    app_id, page = int(parts[2]), int(parts[3])
+    updated = await mark_contacted(app_id)
+    await _show_page_in_place(callback, page)
+
+    if updated:
+        logger.info("Application #%s marked as contacted.", app_id)
+        await callback.answer("✅ Статус обновлён: Связался.")
+    else:
+        await callback.answer("✅ Уже отмечено как «Связался».")
 
 
 @router.callback_query(F.data.startswith("contacted:"))
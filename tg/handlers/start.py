@@ -15,13 +15,14 @@ from aiogram.types import Message
 
 from database.db import get_active_campaign, parse_campaign_id_from_source
 from keyboards.keyboards import get_start_keyboard
+from services.funnel import STEP_START, FunnelTracker
 
 router = Router(name="start")
 logger = logging.getLogger(__name__)
 
 
 @router.message(CommandStart())
-async def cmd_start(message: Message, state: FSMContext) -> None:
+async def cmd_start(message: Message, state: FSMContext, funnel: FunnelTracker) -> None:
     """
     Handle /start command and persist deep-link payload in FSM.
 
@@ -52,6 +53,7 @@ async def cmd_start(message: Message, state: FSMContext) -> None:
             )
 
     await state.update_data(source=source, campaign_id=validated_campaign_id)
+    funnel.track(STEP_START, validated_campaign_id)
 
     await message.answer(
         "Это бот для подачи заявки на работу курьером.\n"
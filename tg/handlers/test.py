@@ -16,10 +16,21 @@ from states.application import ApplicationForm
 from keyboards.keyboards import (
     get_contact_keyboard,
     get_citizenship_keyboard,
-    get_contacted_keyboard,
 )
-from database.db import save_application
+from database.db import DatabaseBusyError, save_application
 from config import ADMIN_ID
+from services.funnel import (
+    STEP_AGE,
+    STEP_DUPLICATE,
+    STEP_NAME,
+    STEP_PHONE,
+    STEP_REJECTED_AGE,
+    STEP_REJECTED_CITIZENSHIP,
+    STEP_START_TEST,
+    STEP_SUBMITTED,
+    FunnelTracker,
+)
+from services.outbox import KIND_NEW_APPLICATION, OutboxWorker
 
 logger = logging.getLogger(__name__)
 
@@ -89,7 +100,11 @@ def is_valid_name(name: str) -> bool:
 # ── Step 0: Start the test (callback from inline button) ──────────
 
 @router.callback_query(F.data == "start_test")
-async def cb_start_test(callback: CallbackQuery, state: FSMContext) -> None:
+async def cb_start_test(
+    callback: CallbackQuery,
+    state: FSMContext,
+    funnel: FunnelTracker,
+) -> None:
     """
     Handle the 'Пройти тест' inline button press.
     Transition to the first FSM state and request the user's phone contact.
@@ -101,13 +116,18 @@ async def cb_start_test(callback: CallbackQuery, state: FSMContext) -> None:
         reply_markup=get_contact_keyboard(),
     )
     await state.set_state(ApplicationForm.waiting_for_phone)
+    funnel.track(STEP_START_TEST, (await state.get_data()).get("campaign_id"))
     await callback.answer()
 
 
 # ── Step 1: Receive phone contact ─────────────────────────────────
 
 @router.message(ApplicationForm.waiting_for_phone, F.contact)
-async def process_phone_contact(message: Message, state: FSMContext) -> None:
+async def process_phone_contact(
+    message: Message,
+    state: FSMContext,
+    funnel: FunnelTracker,
+) -> None:
     """
     Handle a valid contact message (user shared their phone number).
     Save the phone and move to the name step.
@@ -138,7 +158,8 @@ async def process_phone_contact(message: Message, state: FSMContext) -> None:
         )
         return
 
-    await state.update_data(phone=phone)
+    data = await state.update_data(phone=phone)
+    funnel.track(STEP_PHONE, data.get("campaign_id"))
 
     # Remove the reply keyboard and ask for name
     await message.answer(
@@ -165,7 +186,11 @@ async def process_phone_invalid(message: Message) -> None:
 # ── Step 2: Receive and validate name ─────────────────────────────
 
 @router.message(ApplicationForm.waiting_for_name)
-async def process_name(message: Message, state: FSMContext) -> None:
+async def process_name(
+    message: Message,
+    state: FSMContext,
+    funnel: FunnelTracker,
+) -> None:
     """
     Handle name input and move to age step.
     """
@@ -178,7 +203,8 @@ async def process_name(message: Message, state: FSMContext) -> None:
         )
         return
 
-    await state.update_data(first_name=name)
+    data = await state.update_data(first_name=name)
+    funnel.track(STEP_NAME, data.get("campaign_id"))
     await message.answer(
         "📋 <b>Шаг 3 из 4</b>\n\n"
         "Укажите ваш возраст (полных лет):"
@@ -189,7 +215,11 @@ async def process_name(message: Message, state: FSMContext) -> None:
 # ── Step 3: Receive and validate age ──────────────────────────────
 
 @router.message(ApplicationForm.waiting_for_age)
-async def process_age(message: Message, state: FSMContext) -> None:
+async def process_age(
+    message: Message,
+    state: FSMContext,
+    funnel: FunnelTracker,
+) -> None:
     """
     Handle age input. Validates:
     - Must be a positive integer
@@ -218,12 +248,14 @@ async def process_age(message: Message, state: FSMContext) -> None:
             "для подачи заявки.\n"
             "Минимальный возраст — 16 лет."
         )
+        funnel.track(STEP_REJECTED_AGE, (await state.get_data()).get("campaign_id"))
         # Clear FSM state — do NOT save to database
         await state.clear()
         return
 
     # Age is valid — save and proceed to citizenship
-    await state.update_data(age=age)
+    data = await state.update_data(age=age)
+    funnel.track(STEP_AGE, data.get("campaign_id"))
 
     await message.answer(
         "📋 <b>Шаг 4 из 4</b>\n\n"
@@ -239,7 +271,11 @@ async def process_age(message: Message, state: FSMContext) -> None:
     ApplicationForm.waiting_for_citizenship,
     F.data == "citizenship:none",
 )
-async def process_citizenship_none(callback: CallbackQuery, state: FSMContext) -> None:
+async def process_citizenship_none(
+    callback: CallbackQuery,
+    state: FSMContext,
+    funnel: FunnelTracker,
+) -> None:
     """
     Handle the 'Нет из выше перечисленных' button press.
     Reject the application immediately and clear FSM.
@@ -247,6 +283,7 @@ async def process_citizenship_none(callback: CallbackQuery, state: FSMContext) -
     await callback.message.answer(
         "❌ К сожалению продолжить тест нельзя."
     )
+    funnel.track(STEP_REJECTED_CITIZENSHIP, (await state.get_data()).get("campaign_id"))
     # Clear FSM state — do NOT save to database
     await state.clear()
     await callback.answer()
@@ -258,7 +295,12 @@ async def process_citizenship_none(callback: CallbackQuery, state: FSMContext) -
     ApplicationForm.waiting_for_citizenship,
     F.data.startswith("citizenship:"),
 )
-async def process_citizenship(callback: CallbackQuery, state: FSMContext) -> None:
+async def process_citizenship(
+    callback: CallbackQuery,
+    state: FSMContext,
+    outbox: OutboxWorker,
+    funnel: FunnelTracker,
+) -> None:
     """
     Handle citizenship selection from inline keyboard.
     Validates against the allowed list, then saves and notifies admin.
@@ -272,6 +314,7 @@ async def process_citizenship(callback: CallbackQuery, state: FSMContext) -> Non
             "❌ К сожалению, вы не подходите по гражданству "
             "для подачи заявки."
         )
+        funnel.track(STEP_REJECTED_CITIZENSHIP, (await state.get_data()).get("campaign_id"))
         await state.clear()
         await callback.answer()
         return
@@ -295,16 +338,7 @@ async def process_citizenship(callback: CallbackQuery, state: FSMContext) -> Non
         "submitted_at": now,
     }
 
-    # ── Save to SQLite ──
-    app_id = await save_application(application)
-    logger.info(
-        "Application saved (id=%s): telegram_id=%s, name=%s",
-        app_id,
-        application["telegram_id"],
-        application["first_name"],
-    )
-
-    # ── Notify the admin with "Связался" button ──
+    # ── Admin notification with "Связался" button ──
     admin_text = (
         "📋 <b>Новая заявка:</b>\n\n"
         f"<b>Имя:</b> {application['first_name']}\n"
@@ -317,15 +351,50 @@ async def process_citizenship(callback: CallbackQuery, state: FSMContext) -> Non
         f"<b>Submitted at:</b> {application['submitted_at']}"
     )
 
+    # ── Save to SQLite together with the queued admin notification ──
     try:
-        await callback.bot.send_message(
-            chat_id=ADMIN_ID,
-            text=admin_text,
-            reply_markup=get_contacted_keyboard(app_id),
+        saved = await save_application(
+            application,
+            notification={
+                "kind": KIND_NEW_APPLICATION,
+                "chat_id": ADMIN_ID,
+                "payload": {"text": admin_text},
+            },
+        )
+    except DatabaseBusyError as exc:
+        # Keep FSM state so the applicant can simply press the button again.
+        logger.error("Failed to save application for telegram_id=%s: %s", callback.from_user.id, exc)
+        await callback.message.answer(
+            "⚠️ Не удалось сохранить заявку, попробуйте выбрать гражданство ещё раз."
+        )
+        await callback.answer()
+        return
+
+    if not saved.created:
+        funnel.track(STEP_DUPLICATE, application["campaign_id"])
+        logger.info(
+            "Duplicate application from telegram_id=%s, existing id=%s",
+            application["telegram_id"],
+            saved.id,
         )
-        logger.info("Admin notified successfully (ID=%s).", ADMIN_ID)
-    except Exception as exc:
-        logger.error("Failed to notify admin (ID=%s): %s", ADMIN_ID, exc)
+        await callback.message.answer(
+            f"✅ Ваша заявка №{saved.id} уже принята.\n"
+            "Мы свяжемся с вами в ближайшее время."
+        )
+        await state.clear()
+        await callback.answer()
+        return
+
+    logger.info(
+        "Application saved (id=%s): telegram_id=%s, name=%s",
+        saved.id,
+        application["telegram_id"],
+        application["first_name"],
+    )
+
+    # Delivery happens in the outbox worker; the applicant never waits on it.
+    outbox.wake()
+    funnel.track(STEP_SUBMITTED, application["campaign_id"])
 
     # ── Confirm to the applicant ──
     await callback.message.answer(
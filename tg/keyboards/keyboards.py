@@ -124,3 +124,44 @@ def get_contacted_done_keyboard() -> InlineKeyboardMarkup:
             ],
         ]
     )
+
+
+def get_applications_page_keyboard(
+    applications: list[dict],
+    page: int,
+    total_pages: int,
+) -> InlineKeyboardMarkup:
+    """
+    Build the inline keyboard for the single-message /app browser:
+    - one 'Связался' button per not-yet-contacted application on the page;
+    - a navigation row with previous/next page and a refresh button.
+
+    Args:
+        applications: Applications shown on the page.
+        page: Current page number (1-based).
+        total_pages: Total amount of pages.
+    """
+    contact_buttons = [
+        InlineKeyboardButton(
+            text=f"📞 #{app['id']}",
+            callback_data=f"apps:contacted:{app['id']}:{page}",
+        )
+        for app in applications
+        if not app["contacted"]
+    ]
+    rows = [contact_buttons[i:i + 5] for i in range(0, len(contact_buttons), 5)]
+
+    navigation = []
+    if page > 1:
+        navigation.append(
+            InlineKeyboardButton(text="⬅️", callback_data=f"apps:page:{page - 1}")
+        )
+    navigation.append(
+        InlineKeyboardButton(text=f"🔄 {page}/{total_pages}", callback_data=f"apps:page:{page}")
+    )
+    if page < total_pages:
+        navigation.append(
+            InlineKeyboardButton(text="➡️", callback_data=f"apps:page:{page + 1}")
+        )
+    rows.append(navigation)
+    return InlineKeyboardMarkup(inline_keyboard=rows)
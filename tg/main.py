@@ -1,6 +1,7 @@
 """
 main.py — Entry point of the Courier Application Bot.
-Initializes the bot, dispatcher, registers routers, and starts polling.
+Initializes the bot, dispatcher, registers routers, and receives updates
+by long polling or, with BOT_MODE=webhook, through a webhook endpoint.
 """
 
 import asyncio
@@ -9,13 +10,52 @@ import logging
 from aiogram import Bot, Dispatcher
 from aiogram.enums import ParseMode
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
+import uvicorn
 
 try:
-    from config import BOT_TOKEN
+    from config import (
+        BOT_MODE,
+        BOT_TOKEN,
+        FSM_CACHE_SIZE,
+        FSM_FLUSH_INTERVAL,
+        FSM_TTL_SECONDS,
+        HTTP_POOL_SIZE,
+        LOOP_BLOCK_THRESHOLD_MS,
+        LOOP_CAPTURE_STACKS,
+        LOOP_MONITOR_INTERVAL_MS,
+        MAX_IN_FLIGHT_UPDATES,
+        MAX_WAITING_UPDATES,
+        MEMORY_TRACE_FRAMES,
+        METRICS_HOST,
+        METRICS_PORT,
+        SEND_CHAT_BURST,
+        SEND_CHAT_RATE,
+        SEND_GLOBAL_RATE,
+        SEND_MAX_QUEUE,
+        START_DEBOUNCE_SECONDS,
+        WEBHOOK_BASE_URL,
+        WEBHOOK_HOST,
+        WEBHOOK_MAX_CONCURRENCY,
+        WEBHOOK_PATH,
+        WEBHOOK_PORT,
+        WEBHOOK_SECRET,
+    )
 except RuntimeError as exc:
     raise SystemExit(f"Configuration error: {exc}") from exc
-from database.db import init_db
+from database.checkpoint import WalCheckpointManager
+from database.db import data_version_probe, init_db
 from handlers import start, test, admin
+from middlewares.admission import AdmissionMiddleware
+from middlewares.metrics import HandlerMetricsMiddleware
+from services.fsm_storage import SQLiteStorage
+from services.funnel import FunnelTracker
+from services.outbox import OutboxWorker
+from services.sender import MessageScheduler
+from services.webhook import UpdateProcessor, create_webhook_app
+from telemetry.exporter import MetricsExporter
+from telemetry.loop_monitor import LoopLagMonitor
+from telemetry.memory import MemoryTracker, install_signal_handlers, register_process_metrics
 
 # Configure logging to see bot activity in the console
 logging.basicConfig(
@@ -25,31 +65,165 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def create_dispatcher(*, webhook: bool = False, **workflow_data: object) -> Dispatcher:
+    """
+    Build the dispatcher with all routers; `workflow_data` (storage, sender,
+    outbox, ...) is passed through to `Dispatcher` and injected into handlers.
+
+    With `webhook=True` the `UpdateProcessor` of `run_webhook` owns per-user
+    ordering and admission, and the middleware only debounces /start.
+    """
+    dp = Dispatcher(**workflow_data)
+
+    # /start debounce; in polling mode also per-user ordering and a cap on
+    # concurrent handlers
+    dp.update.outer_middleware(
+        AdmissionMiddleware(
+            max_in_flight=MAX_IN_FLIGHT_UPDATES,
+            max_waiting=MAX_WAITING_UPDATES,
+            debounce_seconds=START_DEBOUNCE_SECONDS,
+            sequence=not webhook,
+        )
+    )
+    # Latency per matched handler
+    dp.message.middleware(HandlerMetricsMiddleware())
+    dp.callback_query.middleware(HandlerMetricsMiddleware())
+
+    # Register handler routers
+    dp.include_router(start.router)   # /start command handler
+    dp.include_router(test.router)    # FSM test flow handlers
+    dp.include_router(admin.router)   # /app admin command + contacted callbacks
+    return dp
+
+
+async def run_webhook(dp: Dispatcher, bot: Bot) -> None:
+    """
+    Register the webhook with Telegram and serve it until interrupted.
+    """
+    # Sole admission layer in webhook mode (see `create_dispatcher`): updates
+    # beyond BOT_MAX_WAITING_UPDATES get 503 and Telegram redelivers them.
+    processor = UpdateProcessor(
+        dp,
+        bot,
+        max_concurrency=WEBHOOK_MAX_CONCURRENCY,
+        max_pending=MAX_WAITING_UPDATES,
+    )
+    app = create_webhook_app(processor, path=WEBHOOK_PATH, secret_token=WEBHOOK_SECRET)
+    server = uvicorn.Server(
+        uvicorn.Config(app, host=WEBHOOK_HOST, port=WEBHOOK_PORT, log_level="warning")
+    )
+
+    await dp.emit_startup(bot=bot)
+    await bot.set_webhook(
+        url=WEBHOOK_BASE_URL + WEBHOOK_PATH,
+        secret_token=WEBHOOK_SECRET,
+        allowed_updates=dp.resolve_used_update_types(),
+        max_connections=min(100, max(1, WEBHOOK_MAX_CONCURRENCY)),
+    )
+    logger.info("Webhook set, listening on %s:%s%s", WEBHOOK_HOST, WEBHOOK_PORT, WEBHOOK_PATH)
+    try:
+        await server.serve()
+    finally:
+        # The webhook stays registered: Telegram queues updates until we are back.
+        await processor.stop()
+        await dp.emit_shutdown(bot=bot)
+
+
 async def main() -> None:
     """Main async function: init DB, create bot, register handlers, start polling."""
 
+    # Measure event-loop lag from the start, including startup work
+    loop_monitor = None
+    if LOOP_MONITOR_INTERVAL_MS:
+        loop_monitor = LoopLagMonitor(
+            interval=LOOP_MONITOR_INTERVAL_MS / 1000,
+            block_threshold=LOOP_BLOCK_THRESHOLD_MS / 1000,
+            capture_stacks=LOOP_CAPTURE_STACKS,
+        )
+        loop_monitor.start()
+
     # Initialize the SQLite database (create tables if they don't exist)
     await init_db()
     logger.info("Database initialized successfully.")
 
-    # Create the Bot instance with default HTML parse mode
+    # Create the Bot instance with default HTML parse mode on one shared
+    # keep-alive HTTP session (used by polling and outgoing messages alike)
     bot = Bot(
         token=BOT_TOKEN,
+        session=AiohttpSession(limit=HTTP_POOL_SIZE),
         default=DefaultBotProperties(parse_mode=ParseMode.HTML),
     )
 
-    # Create the Dispatcher (manages updates and routers)
-    dp = Dispatcher()
+    # Outgoing message scheduler: handlers enqueue and return immediately
+    sender = MessageScheduler(
+        bot,
+        global_rate=SEND_GLOBAL_RATE,
+        chat_rate=SEND_CHAT_RATE,
+        chat_burst=SEND_CHAT_BURST,
+        max_queue=SEND_MAX_QUEUE,
+    )
+    sender.start()
 
-    # Register handler routers
-    dp.include_router(start.router)   # /start command handler
-    dp.include_router(test.router)    # FSM test flow handlers
-    dp.include_router(admin.router)   # /app admin command + contacted callbacks
+    # Durable admin notifications: drains `notification_outbox` via the sender
+    outbox = OutboxWorker(sender)
+    outbox.start()
+
+    # FSM state lives in SQLite so in-progress applications survive restarts
+    storage = SQLiteStorage(
+        ttl_seconds=FSM_TTL_SECONDS,
+        cache_size=FSM_CACHE_SIZE,
+        flush_interval=FSM_FLUSH_INTERVAL,
+    )
+    await storage.start()
+
+    # Funnel events are counted in memory and flushed as per-minute rollups
+    funnel = FunnelTracker()
+    funnel.start()
+
+    # Create the Dispatcher (manages updates and routers);
+    # `sender`, `outbox` and `funnel` are injected into handlers that declare them
+    dp = create_dispatcher(
+        webhook=BOT_MODE == "webhook",
+        storage=storage,
+        sender=sender,
+        outbox=outbox,
+        funnel=funnel,
+    )
+
+    # Keep the shared WAL file short while the bot is running
+    checkpoint_manager = WalCheckpointManager()
+    checkpoint_manager.start()
+
+    # RSS/allocator gauges; `kill -USR1 <pid>` logs tracemalloc top sites and growth
+    register_process_metrics()
+    install_signal_handlers(MemoryTracker(frames=MEMORY_TRACE_FRAMES))
 
-    logger.info("Bot is starting polling...")
+    # /metrics for Prometheus on a separate local port
+    exporter = MetricsExporter(METRICS_HOST, METRICS_PORT) if METRICS_PORT else None
+    if exporter is not None:
+        await exporter.start()
 
-    # Start long-polling (blocks until stopped)
-    await dp.start_polling(bot)
+    # Receive updates (blocks until stopped)
+    try:
+        if BOT_MODE == "webhook":
+            await run_webhook(dp, bot)
+        else:
+            logger.info("Bot is starting polling...")
+            # getUpdates is refused while a webhook is registered
+            await bot.delete_webhook(drop_pending_updates=False)
+            await dp.start_polling(bot)
+    finally:
+        await storage.close()
+        await funnel.stop()
+        await outbox.stop()
+        await sender.stop()
+        await checkpoint_manager.stop()
+        data_version_probe.close()
+        if exporter is not None:
+            await exporter.stop()
+        if loop_monitor is not None:
+            await loop_monitor.stop()
+        await bot.session.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1 @@
+"""middlewares package — Dispatcher-level aiogram middlewares."""
@@ -0,0 +1,161 @@
+"""
+middlewares/admission.py — Per-user sequencing and admission control.
+
+Registered as an outer middleware on `dp.update`, i.e. before any filter or
+handler runs:
+
+- repeated `/start` / "Пройти тест" presses from one user inside
+  `debounce_seconds` are dropped (the callback is still answered);
+- updates of one user run one at a time, in arrival order;
+- at most `max_in_flight` handlers run at once; the rest wait, and once
+  `max_waiting` updates are queued new ones are shed instead of piling
+  up on FSM storage and SQLite.
+
+With `sequence=False` only the debounce applies. Webhook mode uses that:
+`services.webhook.UpdateProcessor` already orders each user's updates and
+bounds concurrency, and a second layer of locks and limits would only make
+the effective limits harder to reason about.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+
+from telemetry.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+UPDATES = REGISTRY.counter(
+    "bot_updates_total",
+    "Incoming updates by admission result (handled, debounced, shed).",
+    ("result",),
+)
+IN_FLIGHT = REGISTRY.gauge(
+    "bot_handlers_in_flight",
+    "Updates currently being handled.",
+)
+WAITING = REGISTRY.gauge(
+    "bot_handlers_waiting",
+    "Updates waiting for their user's turn or a free handler slot.",
+)
+ADMISSION_WAIT = REGISTRY.histogram(
+    "bot_admission_wait_seconds",
+    "Time an update waited before its handler started.",
+)
+
+Handler = Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]]
+
+
+def debounce_key(update: Update) -> str | None:
+    """
+    Return a key for updates that are safe to collapse, else None.
+    """
+    if update.message is not None:
+        text = (update.message.text or "").strip()
+        if text == "/start" or text.startswith("/start "):
+            return text
+    if update.callback_query is not None and update.callback_query.data == "start_test":
+        return "start_test"
+    return None
+
+
+class AdmissionMiddleware(BaseMiddleware):
+    """
+    Outer update middleware; register with `dp.update.outer_middleware(...)`.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_in_flight: int = 32,
+        max_waiting: int = 1000,
+        debounce_seconds: float = 2.0,
+        sequence: bool = True,
+    ) -> None:
+        self.max_waiting = max_waiting
+        self.debounce_seconds = debounce_seconds
+        self.sequence = sequence
+
+        self._slots = asyncio.Semaphore(max(1, max_in_flight))
+        # user_id -> [lock, number of updates holding or waiting for it]
+        self._user_locks: dict[int, list[Any]] = {}
+        self._recent: OrderedDict[tuple[int, str], float] = OrderedDict()
+        self._waiting = 0
+        self._in_flight = 0
+
+    def _is_repeat(self, user_id: int, key: str, now: float) -> bool:
+        while self._recent:
+            oldest_key, seen_at = next(iter(self._recent.items()))
+            if now - seen_at < self.debounce_seconds:
+                break
+            del self._recent[oldest_key]
+
+        recent_key = (user_id, key)
+        if recent_key in self._recent:
+            return True
+        self._recent[recent_key] = now
+        return False
+
+    async def __call__(
+        self,
+        handler: Handler,
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        user = data.get("event_from_user")
+        if user is None or not isinstance(event, Update):
+            return await handler(event, data)
+
+        key = debounce_key(event)
+        if key is not None and self._is_repeat(user.id, key, time.monotonic()):
+            UPDATES.inc(result="debounced")
+            if event.callback_query is not None:
+                try:
+                    await event.callback_query.answer()
+                except Exception:
+                    logger.debug("Could not answer debounced callback.", exc_info=True)
+            return None
+
+        if not self.sequence:
+            UPDATES.inc(result="handled")
+            return await handler(event, data)
+
+        if self._waiting >= self.max_waiting:
+            UPDATES.inc(result="shed")
+            logger.warning("Shedding update %s from user %s: queue full.", event.update_id, user.id)
+            return None
+
+        entry = self._user_locks.setdefault(user.id, [asyncio.Lock(), 0])
+        entry[1] += 1
+        self._waiting += 1
+        WAITING.set(self._waiting)
+        queued_at = time.monotonic()
+        admitted = False
+        try:
+            async with entry[0], self._slots:
+                admitted = True
+                self._waiting -= 1
+                self._in_flight += 1
+                WAITING.set(self._waiting)
+                IN_FLIGHT.set(self._in_flight)
+                ADMISSION_WAIT.observe(time.monotonic() - queued_at)
+                UPDATES.inc(result="handled")
+                try:
+                    return await handler(event, data)
+                finally:
+                    self._in_flight -= 1
+                    IN_FLIGHT.set(self._in_flight)
+        finally:
+            if not admitted:
+                self._waiting -= 1
+                WAITING.set(self._waiting)
+            entry[1] -= 1
+            if entry[1] == 0:
+                self._user_locks.pop(user.id, None)
@@ -0,0 +1,54 @@
+"""
+middlewares/metrics.py — Handler latency metrics.
+
+Registered as an inner middleware on each event observer, so it runs only
+after filters matched and `data["handler"]` names the handler that runs.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from telemetry.metrics import REGISTRY
+
+HANDLER_LATENCY = REGISTRY.histogram(
+    "bot_handler_duration_seconds",
+    "Bot handler latency by handler and result (ok, error).",
+    ("handler", "result"),
+)
+
+Handler = Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]]
+
+
+def handler_name(data: dict[str, Any]) -> str:
+    handler_object = data.get("handler")
+    callback = getattr(handler_object, "callback", None)
+    if callback is None:
+        return "unknown"
+    module = getattr(callback, "__module__", "") or ""
+    return f"{module.rsplit('.', 1)[-1]}.{getattr(callback, '__name__', 'handler')}"
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    async def __call__(
+        self,
+        handler: Handler,
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        started = time.perf_counter()
+        result = "error"
+        try:
+            response = await handler(event, data)
+            result = "ok"
+            return response
+        finally:
+            HANDLER_LATENCY.observe(
+                time.perf_counter() - started,
+                handler=handler_name(data),
+                result=result,
+            )
@@ -0,0 +1,444 @@
+"""
+Synthetic data generator for performance work.
+
+Creates a fresh database at the latest schema and bulk-fills it with
+investors, campaigns, applications and refresh tokens whose shapes resemble
+production: campaign popularity is skewed, traffic grows over the period and
+peaks during the day, statuses depend on application age, revenue is
+log-normal, and some applicants apply more than once. Output is fully
+determined by `--seed` and `--end`.
+
+    python tg/migrations/generate.py --db /tmp/big.db --applications 2000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import sqlite3
+import sys
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from itertools import accumulate, islice
+from pathlib import Path
+
+TG_DIR = Path(__file__).resolve().parents[1]
+if str(TG_DIR) not in sys.path:
+    sys.path.insert(0, str(TG_DIR))
+
+from migrations.runner import migrate_to_latest  # noqa: E402
+
+CITIZENSHIPS = (
+    ("Российская Федерация", 80),
+    ("Республика Казахстан", 7),
+    ("Республика Беларусь", 5),
+    ("Кыргызская Республика", 5),
+    ("Республика Армения", 3),
+)
+# Relative applications per hour of day (Moscow time, rough production shape).
+HOURLY_WEIGHTS = (1, 1, 1, 1, 1, 1, 2, 4, 6, 8, 9, 9, 9, 9, 8, 8, 8, 9, 10, 10, 9, 7, 4, 2)
+# Status mix for applications older than FRESH_DAYS / younger ones.
+SETTLED_STATUSES = (("new", 8), ("in_progress", 12), ("approved", 45), ("rejected", 35))
+FRESH_STATUSES = (("new", 70), ("in_progress", 25), ("approved", 3), ("rejected", 2))
+FRESH_DAYS = 2
+ORGANIC_SHARE = 0.05  # applications without a campaign (plain /start)
+REPEAT_APPLICANT_SHARE = 0.1
+
+
+@dataclass(frozen=True)
+class GeneratorConfig:
+    investors: int = 50
+    campaigns_per_investor: int = 8
+    applications: int = 1_000_000
+    refresh_tokens_per_user: int = 20
+    days: int = 180
+    growth: float = 2.0  # traffic at the end of the period relative to the start
+    password_hash: str = ""
+    seed: int = 42
+    batch_size: int = 50_000
+    commit_every: int = 500_000
+    defer_indexes: bool = True
+    end: datetime = field(default_factory=lambda: datetime.now().replace(microsecond=0))
+
+
+@dataclass
+class GenerationStats:
+    users: int = 0
+    campaigns: int = 0
+    applications: int = 0
+    refresh_tokens: int = 0
+    seconds: float = 0.0
+
+
+def configure_bulk_pragmas(
+    conn: sqlite3.Connection,
+    *,
+    journal_mode: str = "off",
+    synchronous: str = "off",
+    cache_size_mb: int = 256,
+) -> None:
+    """
+    Trade durability for speed while the file is being generated.
+    """
+    conn.execute(f"PRAGMA journal_mode = {journal_mode}")
+    conn.execute(f"PRAGMA synchronous = {synchronous}")
+    conn.execute(f"PRAGMA cache_size = {-cache_size_mb * 1024}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute("PRAGMA locking_mode = EXCLUSIVE")
+
+
+def _weighted(pairs: tuple[tuple[str, int], ...]) -> tuple[list[str], list[int]]:
+    """Values and cumulative weights for `random.Random.choices(cum_weights=...)`."""
+    return [value for value, _ in pairs], list(accumulate(weight for _, weight in pairs))
+
+
+def _chunks(rows: Iterator[tuple], size: int) -> Iterator[list[tuple]]:
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def _bulk_insert(
+    conn: sqlite3.Connection,
+    sql: str,
+    rows: Iterator[tuple],
+    config: GeneratorConfig,
+) -> int:
+    """
+    executemany in `batch_size` chunks, committing every `commit_every` rows.
+    """
+    total = 0
+    in_transaction = 0
+    conn.execute("BEGIN")
+    for chunk in _chunks(rows, config.batch_size):
+        conn.executemany(sql, chunk)
+        total += len(chunk)
+        in_transaction += len(chunk)
+        if in_transaction >= config.commit_every:
+            conn.execute("COMMIT")
+            conn.execute("BEGIN")
+            in_transaction = 0
+    conn.execute("COMMIT")
+    return total
+
+
+def _insert_users(conn: sqlite3.Connection, rng: random.Random, config: GeneratorConfig) -> list[int]:
+    start = config.end - timedelta(days=config.days)
+    rows = [
+        (
+            f"investor{n:04d}",
+            config.password_hash,
+            f"Investor {n:04d}",
+            rng.choice((30.0, 40.0, 50.0, 60.0)),
+            int(rng.random() < 0.95),
+            (start + timedelta(days=rng.uniform(0, config.days / 2))).strftime("%Y-%m-%d %H:%M:%S"),
+        )
+        for n in range(1, config.investors + 1)
+    ]
+    conn.execute("BEGIN")
+    conn.executemany(
+        """
+        INSERT INTO users (login, password_hash, name, role, percent, is_active, created_at)
+        VALUES (?, ?, ?, 'investor', ?, ?, ?)
+        """,
+        rows,
+    )
+    conn.execute("COMMIT")
+    return [row[0] for row in conn.execute("SELECT id FROM users WHERE role = 'investor' ORDER BY id")]
+
+
+def _insert_campaigns(
+    conn: sqlite3.Connection,
+    rng: random.Random,
+    config: GeneratorConfig,
+    investor_ids: list[int],
+) -> list[int]:
+    start = config.end - timedelta(days=config.days)
+    rows = []
+    for investor_id in investor_ids:
+        count = max(1, round(rng.gauss(config.campaigns_per_investor, config.campaigns_per_investor / 3)))
+        for n in range(1, count + 1):
+            rows.append(
+                (
+                    investor_id,
+                    f"Campaign {investor_id}-{n}",
+                    round(rng.lognormvariate(math.log(100_000), 0.6), -3),
+                    "active" if rng.random() < 0.85 else "paused",
+                    (start + timedelta(days=rng.uniform(0, config.days * 0.8))).strftime("%Y-%m-%d %H:%M:%S"),
+                )
+            )
+    conn.execute("BEGIN")
+    conn.executemany(
+        "INSERT INTO campaigns (investor_id, name, budget, status, created_at) VALUES (?, ?, ?, ?, ?)",
+        rows,
+    )
+    conn.execute("COMMIT")
+    return [row[0] for row in conn.execute("SELECT id FROM campaigns ORDER BY id")]
+
+
+def _application_rows(rng: random.Random, config: GeneratorConfig, campaign_ids: list[int]) -> Iterator[tuple]:
+    # Zipf-like popularity: a few campaigns bring most of the traffic.
+    popularity = campaign_ids[:]
+    rng.shuffle(popularity)
+    campaign_weights = [1 / (rank ** 1.1) for rank in range(1, len(popularity) + 1)]
+    # Cumulative weights are computed once; choices() then bisects them per draw.
+    cumulative_campaigns = list(accumulate(campaign_weights))
+    hours = range(len(HOURLY_WEIGHTS))
+    cumulative_hours = list(accumulate(HOURLY_WEIGHTS))
+    settled_statuses, settled_weights = _weighted(SETTLED_STATUSES)
+    fresh_statuses, fresh_weights = _weighted(FRESH_STATUSES)
+    citizenships, citizenship_weights = _weighted(CITIZENSHIPS)
+
+    start = config.end - timedelta(days=config.days)
+    # Linear growth from 1 to `growth`: density a + b*t, sampled by inverse CDF.
+    a, b = 1.0, config.growth - 1.0
+    first_telegram_id = 10_000_000
+    next_telegram_id = first_telegram_id
+
+    # A fresh database: the version counter (migration 0009) starts at zero.
+    for row_version in range(1, config.applications + 1):
+        u = rng.random()
+        if b:
+            t = (-a + math.sqrt(a * a + b * (2 * a + b) * u)) / b
+        else:
+            t = u
+        day = int(t * config.days)
+        hour = rng.choices(hours, cum_weights=cumulative_hours)[0]
+        submitted = start + timedelta(days=day, hours=hour, seconds=rng.randrange(3600))
+        if submitted > config.end:
+            submitted = config.end
+        age_days = (config.end - submitted).days
+
+        if age_days < FRESH_DAYS:
+            status = rng.choices(fresh_statuses, cum_weights=fresh_weights)[0]
+        else:
+            status = rng.choices(settled_statuses, cum_weights=settled_weights)[0]
+        revenue = round(rng.lognormvariate(math.log(2500), 0.5), 2) if status == "approved" else None
+
+        if popularity and rng.random() >= ORGANIC_SHARE:
+            campaign_id: int | None = rng.choices(popularity, cum_weights=cumulative_campaigns)[0]
+            source = f"camp_{campaign_id}"
+        else:
+            campaign_id, source = None, ""
+
+        if next_telegram_id > first_telegram_id and rng.random() < REPEAT_APPLICANT_SHARE:
+            telegram_id = rng.randrange(first_telegram_id, next_telegram_id)
+        else:
+            telegram_id = next_telegram_id
+            next_telegram_id += 1
+        phone_digits = f"79{telegram_id % 1_000_000_000:09d}"
+        submitted_at = submitted.strftime("%Y-%m-%d %H:%M:%S")
+        yield (
+            telegram_id,
+            f"user{telegram_id}" if rng.random() < 0.7 else None,
+            f"Name{telegram_id % 100_000}",
+            f"+{phone_digits}",
+            phone_digits,
+            int(rng.triangular(18, 55, 24)),
+            rng.choices(citizenships, cum_weights=citizenship_weights)[0],
+            source,
+            int(status != "new"),
+            submitted_at,
+            campaign_id,
+            revenue,
+            status,
+            row_version,
+            submitted_at,
+        )
+
+
+def _refresh_token_rows(rng: random.Random, config: GeneratorConfig, user_ids: list[int]) -> Iterator[tuple]:
+    for user_id in user_ids:
+        for _ in range(config.refresh_tokens_per_user):
+            created = config.end - timedelta(seconds=rng.randrange(config.days * 86400))
+            expires = created + timedelta(days=30)
+            # Most tokens were rotated away; the newest ones may still be live.
+            revoked = created + timedelta(minutes=15) if rng.random() < 0.85 else None
+            yield (
+                user_id,
+                rng.randbytes(32).hex(),
+                expires.strftime("%Y-%m-%d %H:%M:%S"),
+                created.strftime("%Y-%m-%d %H:%M:%S"),
+                revoked.strftime("%Y-%m-%d %H:%M:%S") if revoked else None,
+                f"10.0.{rng.randrange(256)}.{rng.randrange(256)}",
+                "Mozilla/5.0 (synthetic)",
+            )
+
+
+def _drop_indexes(conn: sqlite3.Connection, table: str) -> list[str]:
+    rows = conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+        (table,),
+    ).fetchall()
+    for name, _ in rows:
+        conn.execute(f'DROP INDEX "{name}"')
+    return [sql for _, sql in rows]
+
+
+def _drop_triggers(conn: sqlite3.Connection, table: str) -> list[str]:
+    rows = conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = ?",
+        (table,),
+    ).fetchall()
+    for name, _ in rows:
+        conn.execute(f'DROP TRIGGER "{name}"')
+    return [sql for _, sql in rows]
+
+
+def generate(conn: sqlite3.Connection, config: GeneratorConfig) -> GenerationStats:
+    """
+    Fill a migrated, empty database. `conn` must use isolation_level=None.
+    """
+    started = time.perf_counter()
+    rng = random.Random(config.seed)
+    stats = GenerationStats()
+
+    investor_ids = _insert_users(conn, rng, config)
+    stats.users = len(investor_ids)
+    campaign_ids = _insert_campaigns(conn, rng, config, investor_ids)
+    stats.campaigns = len(campaign_ids)
+
+    # Building indexes once after the load is much cheaper than maintaining them per row.
+    deferred = _drop_indexes(conn, "applications") if config.defer_indexes else []
+    # Row versions are written directly, as the triggers would have set them.
+    triggers = _drop_triggers(conn, "applications")
+    stats.applications = _bulk_insert(
+        conn,
+        """
+        INSERT INTO applications (
+            telegram_id, username, first_name, phone, phone_normalized, age,
+            citizenship, source, contacted, submitted_at, campaign_id, revenue, status,
+            row_version, updated_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        _application_rows(rng, config, campaign_ids),
+        config,
+    )
+    conn.execute(
+        "UPDATE table_versions SET version = ? WHERE name = 'applications'",
+        (stats.applications,),
+    )
+    for sql in deferred + triggers:
+        conn.execute(sql)
+
+    user_ids = [row[0] for row in conn.execute("SELECT id FROM users ORDER BY id")]
+    stats.refresh_tokens = _bulk_insert(
+        conn,
+        """
+        INSERT INTO refresh_tokens (user_id, token_hash, expires_at, created_at, revoked_at, ip, user_agent)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        _refresh_token_rows(rng, config, user_ids),
+        config,
+    )
+    stats.seconds = time.perf_counter() - started
+    return stats
+
+
+def create_database(
+    db_path: Path,
+    config: GeneratorConfig,
+    *,
+    journal_mode: str = "off",
+    synchronous: str = "off",
+    cache_size_mb: int = 256,
+    analyze: bool = True,
+) -> GenerationStats:
+    """
+    Migrate a new file to the latest schema and fill it; leaves it in WAL mode.
+    """
+    if not config.password_hash:
+        from api.security import hash_password
+
+        config = GeneratorConfig(**{**config.__dict__, "password_hash": hash_password("investor_password")})
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        migrate_to_latest(conn)
+        configure_bulk_pragmas(
+            conn,
+            journal_mode=journal_mode,
+            synchronous=synchronous,
+            cache_size_mb=cache_size_mb,
+        )
+        stats = generate(conn, config)
+        if analyze:
+            conn.execute("ANALYZE")
+        conn.execute("PRAGMA locking_mode = NORMAL")
+        conn.execute("PRAGMA journal_mode = WAL")
+    finally:
+        conn.close()
+    return stats
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate a large synthetic database.")
+    parser.add_argument("--db", required=True, help="Path of the database file to create.")
+    parser.add_argument("--force", action="store_true", help="Overwrite an existing file.")
+    parser.add_argument("--investors", type=int, default=50)
+    parser.add_argument("--campaigns", type=int, default=8, help="Average campaigns per investor.")
+    parser.add_argument("--applications", type=int, default=1_000_000)
+    parser.add_argument("--refresh-tokens", type=int, default=20, help="Refresh tokens per user.")
+    parser.add_argument("--days", type=int, default=180, help="Period covered by the data.")
+    parser.add_argument(
+        "--end",
+        type=datetime.fromisoformat,
+        default=None,
+        help="Last timestamp of the period, e.g. 2026-01-31T23:59:59 (default: now).",
+    )
+    parser.add_argument("--growth", type=float, default=2.0, help="Traffic at the end vs. the start.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=50_000, help="Rows per executemany.")
+    parser.add_argument("--commit-every", type=int, default=500_000, help="Rows per transaction.")
+    parser.add_argument("--journal-mode", default="off", help="journal_mode during generation.")
+    parser.add_argument("--synchronous", default="off", help="synchronous during generation.")
+    parser.add_argument("--cache-size-mb", type=int, default=256)
+    parser.add_argument("--keep-indexes", action="store_true", help="Maintain indexes during the load.")
+    parser.add_argument("--no-analyze", action="store_true", help="Skip ANALYZE at the end.")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    db_path = Path(args.db).expanduser().resolve()
+    if db_path.exists():
+        if not args.force:
+            raise SystemExit(f"{db_path} already exists (use --force to overwrite).")
+        for suffix in ("", "-wal", "-shm", "-journal"):
+            Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+
+    config = GeneratorConfig(
+        investors=args.investors,
+        campaigns_per_investor=args.campaigns,
+        applications=args.applications,
+        refresh_tokens_per_user=args.refresh_tokens,
+        days=args.days,
+        growth=args.growth,
+        seed=args.seed,
+        **({"end": args.end} if args.end else {}),
+        batch_size=args.batch_size,
+        commit_every=args.commit_every,
+        defer_indexes=not args.keep_indexes,
+    )
+    stats = create_database(
+        db_path,
+        config,
+        journal_mode=args.journal_mode,
+        synchronous=args.synchronous,
+        cache_size_mb=args.cache_size_mb,
+        analyze=not args.no_analyze,
+    )
+    rate = stats.applications / stats.seconds if stats.seconds else 0.0
+    print(
+        f"Generated {stats.users} investors, {stats.campaigns} campaigns, "
+        f"{stats.applications} applications, {stats.refresh_tokens} refresh tokens "
+        f"in {stats.seconds:.1f}s ({rate:,.0f} applications/s) -> {db_path}"
+    )
+    print("Investor logins: investor0001..; password: investor_password")
+
+
+if __name__ == "__main__":
+    main()
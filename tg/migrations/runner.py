@@ -172,6 +172,35 @@ def rollback(conn: sqlite3.Connection, steps: int = 1) -> list[str]:
     return rolled_back
 
 
+def migrate_to(conn: sqlite3.Connection, revision: str) -> list[str]:
+    """
+    Upgrade or downgrade until `revision` is the latest applied revision.
+
+    `revision="base"` rolls back everything.
+    """
+    migrations = _load_migrations()
+    revisions = [m.revision for m in migrations]
+    if revision != "base" and revision not in revisions:
+        raise ValueError(f"Unknown revision: {revision}")
+
+    target_index = revisions.index(revision) if revision != "base" else -1
+    applied = set(_get_applied_revisions(conn))
+    changed: list[str] = []
+
+    for index in range(len(migrations) - 1, target_index, -1):
+        migration = migrations[index]
+        if migration.revision in applied:
+            _apply_downgrade(conn, migration)
+            changed.append(migration.revision)
+
+    for migration in migrations[: target_index + 1]:
+        if migration.revision not in applied:
+            _apply_upgrade(conn, migration)
+            changed.append(migration.revision)
+
+    return changed
+
+
 def print_status(conn: sqlite3.Connection) -> None:
     migrations = _load_migrations()
     applied = set(_get_applied_revisions(conn))
@@ -207,6 +236,11 @@ def parse_args() -> argparse.Namespace:
         help="How many latest revisions to rollback.",
     )
 
+    to_parser = subparsers.add_parser(
+        "to", help="Upgrade or downgrade to a revision ('base' = none)."
+    )
+    to_parser.add_argument("revision", type=str)
+
     subparsers.add_parser("status", help="Show migration status.")
     return parser.parse_args()
 
@@ -233,6 +267,12 @@ def main() -> None:
                 print(f"Rolled back: {', '.join(rolled_back)}")
             else:
                 print("Nothing to rollback.")
+        elif args.command == "to":
+            changed = migrate_to(conn, args.revision)
+            if changed:
+                print(f"Changed: {', '.join(changed)}")
+            else:
+                print(f"Already at {args.revision}.")
         elif args.command == "status":
             print_status(conn)
     finally:
@@ -0,0 +1,40 @@
+"""Durable outbox for admin notifications sent by the bot."""
+
+from __future__ import annotations
+
+import sqlite3
+
+revision = "0004"
+
+
+def upgrade(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS notification_outbox (
+            id              INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind            TEXT    NOT NULL,
+            chat_id         INTEGER NOT NULL,
+            application_id  INTEGER,
+            payload         TEXT    NOT NULL,
+            status          TEXT    NOT NULL DEFAULT 'pending'
+                                    CHECK (status IN ('pending', 'sent', 'failed')),
+            attempts        INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at TEXT    NOT NULL DEFAULT (datetime('now')),
+            created_at      TEXT    NOT NULL DEFAULT (datetime('now')),
+            sent_at         TEXT,
+            last_error      TEXT
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_notification_outbox_pending
+        ON notification_outbox(next_attempt_at)
+        WHERE status = 'pending'
+        """
+    )
+
+
+def downgrade(conn: sqlite3.Connection) -> None:
+    conn.execute("DROP INDEX IF EXISTS idx_notification_outbox_pending")
+    conn.execute("DROP TABLE IF EXISTS notification_outbox")
@@ -0,0 +1,31 @@
+"""Persistent FSM storage for in-progress bot conversations."""
+
+from __future__ import annotations
+
+import sqlite3
+
+revision = "0005"
+
+
+def upgrade(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS fsm_storage (
+            key        TEXT PRIMARY KEY,
+            state      TEXT,
+            data       TEXT NOT NULL DEFAULT '{}',
+            updated_at REAL NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_fsm_storage_updated_at
+        ON fsm_storage(updated_at)
+        """
+    )
+
+
+def downgrade(conn: sqlite3.Connection) -> None:
+    conn.execute("DROP INDEX IF EXISTS idx_fsm_storage_updated_at")
+    conn.execute("DROP TABLE IF EXISTS fsm_storage")
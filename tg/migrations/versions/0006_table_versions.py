@@ -0,0 +1,37 @@
+"""Per-table change counters maintained by triggers (cache invalidation)."""
+
+from __future__ import annotations
+
+import sqlite3
+
+revision = "0006"
+
+_OPERATIONS = ("insert", "update", "delete")
+
+
+def upgrade(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS table_versions (
+            name    TEXT    PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+    conn.execute("INSERT OR IGNORE INTO table_versions (name, version) VALUES ('campaigns', 0)")
+    for operation in _OPERATIONS:
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_campaigns_version_{operation}
+            AFTER {operation.upper()} ON campaigns
+            BEGIN
+                UPDATE table_versions SET version = version + 1 WHERE name = 'campaigns';
+            END
+            """
+        )
+
+
+def downgrade(conn: sqlite3.Connection) -> None:
+    for operation in _OPERATIONS:
+        conn.execute(f"DROP TRIGGER IF EXISTS trg_campaigns_version_{operation}")
+    conn.execute("DROP TABLE IF EXISTS table_versions")
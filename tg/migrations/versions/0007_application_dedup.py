@@ -0,0 +1,50 @@
+"""Normalized phone column and lookup indexes for duplicate application detection."""
+
+from __future__ import annotations
+
+import re
+import sqlite3
+
+revision = "0007"
+
+
+def _column_exists(conn: sqlite3.Connection, table: str, column: str) -> bool:
+    cursor = conn.execute(f"PRAGMA table_info({table})")
+    return any(row[1] == column for row in cursor.fetchall())
+
+
+def _phone_key(phone: str | None) -> str | None:
+    digits = re.sub(r"\D", "", phone or "")
+    return digits or None
+
+
+def upgrade(conn: sqlite3.Connection) -> None:
+    if not _column_exists(conn, "applications", "phone_normalized"):
+        conn.execute("ALTER TABLE applications ADD COLUMN phone_normalized TEXT")
+
+    # One UPDATE with a SQL function instead of fetching every row into Python:
+    # memory stays flat however large the table is.
+    conn.create_function("phone_key", 1, _phone_key, deterministic=True)
+    conn.execute(
+        "UPDATE applications SET phone_normalized = phone_key(phone) WHERE phone_normalized IS NULL"
+    )
+
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_applications_telegram_submitted
+        ON applications(telegram_id, submitted_at)
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_applications_phone_submitted
+        ON applications(phone_normalized, submitted_at)
+        """
+    )
+
+
+def downgrade(conn: sqlite3.Connection) -> None:
+    conn.execute("DROP INDEX IF EXISTS idx_applications_phone_submitted")
+    conn.execute("DROP INDEX IF EXISTS idx_applications_telegram_submitted")
+    if _column_exists(conn, "applications", "phone_normalized"):
+        conn.execute("ALTER TABLE applications DROP COLUMN phone_normalized")
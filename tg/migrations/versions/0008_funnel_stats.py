@@ -0,0 +1,25 @@
+"""Per-minute rollups of bot application funnel events."""
+
+from __future__ import annotations
+
+import sqlite3
+
+revision = "0008"
+
+
+def upgrade(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS funnel_stats (
+            campaign_id INTEGER NOT NULL,
+            step        TEXT    NOT NULL,
+            bucket      TEXT    NOT NULL,
+            count       INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (campaign_id, step, bucket)
+        ) WITHOUT ROWID
+        """
+    )
+
+
+def downgrade(conn: sqlite3.Connection) -> None:
+    conn.execute("DROP TABLE IF EXISTS funnel_stats")
@@ -0,0 +1,83 @@
+"""Row versions on applications for incremental sync (`/api/applications/changes`)."""
+
+from __future__ import annotations
+
+import sqlite3
+
+revision = "0009"
+
+# Same counter table as 0006; every insert or update of an application takes
+# the next value, so versions are unique and increase in commit order.
+_NEXT_VERSION = """
+    UPDATE table_versions SET version = version + 1 WHERE name = 'applications';
+"""
+_CURRENT_VERSION = "(SELECT version FROM table_versions WHERE name = 'applications')"
+
+
+def _column_exists(conn: sqlite3.Connection, table: str, column: str) -> bool:
+    cursor = conn.execute(f"PRAGMA table_info({table})")
+    return any(row[1] == column for row in cursor.fetchall())
+
+
+def upgrade(conn: sqlite3.Connection) -> None:
+    if not _column_exists(conn, "applications", "row_version"):
+        conn.execute("ALTER TABLE applications ADD COLUMN row_version INTEGER NOT NULL DEFAULT 0")
+    if not _column_exists(conn, "applications", "updated_at"):
+        conn.execute("ALTER TABLE applications ADD COLUMN updated_at TEXT")
+
+    # Existing rows: version = id keeps their order; untouched since submission.
+    conn.execute("UPDATE applications SET row_version = id, updated_at = submitted_at")
+    conn.execute(
+        """
+        INSERT INTO table_versions (name, version)
+        VALUES ('applications', (SELECT COALESCE(MAX(id), 0) FROM applications))
+        ON CONFLICT(name) DO UPDATE SET version = excluded.version
+        """
+    )
+    conn.execute(
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_applications_row_version
+        ON applications(row_version)
+        """
+    )
+
+    # submitted_at is written in server local time, so updated_at is as well.
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_applications_row_version_insert
+        AFTER INSERT ON applications
+        BEGIN
+            {_NEXT_VERSION}
+            UPDATE applications
+            SET row_version = {_CURRENT_VERSION},
+                updated_at = NEW.submitted_at
+            WHERE id = NEW.id;
+        END
+        """
+    )
+    # The WHEN guard skips the trigger's own UPDATE and explicit version writes.
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_applications_row_version_update
+        AFTER UPDATE ON applications
+        WHEN NEW.row_version = OLD.row_version
+        BEGIN
+            {_NEXT_VERSION}
+            UPDATE applications
+            SET row_version = {_CURRENT_VERSION},
+                updated_at = datetime('now', 'localtime')
+            WHERE id = NEW.id;
+        END
+        """
+    )
+
+
+def downgrade(conn: sqlite3.Connection) -> None:
+    conn.execute("DROP TRIGGER IF EXISTS trg_applications_row_version_update")
+    conn.execute("DROP TRIGGER IF EXISTS trg_applications_row_version_insert")
+    conn.execute("DROP INDEX IF EXISTS idx_applications_row_version")
+    conn.execute("DELETE FROM table_versions WHERE name = 'applications'")
+    if _column_exists(conn, "applications", "updated_at"):
+        conn.execute("ALTER TABLE applications DROP COLUMN updated_at")
+    if _column_exists(conn, "applications", "row_version"):
+        conn.execute("ALTER TABLE applications DROP COLUMN row_version")
@@ -0,0 +1 @@
+"""Revenue reconciliation from partner payout CSV files."""
@@ -0,0 +1,258 @@
+"""
+Streaming CSV import of application statuses and revenue.
+
+The file needs an `id` (or `application_id`) column and at least one of
+`status` and `revenue`; empty cells leave the value unchanged. Delimiter
+(`,`, `;` or tab) is taken from the header, a UTF-8 BOM is ignored and
+revenue may use a decimal comma (`2500,50`), as Excel exports do.
+
+Rows are read `batch_size` at a time in a worker thread, so memory does not
+depend on the file size and CSV parsing stays off the event loop. Each batch
+costs one ownership query and one `executemany` in its own short write
+transaction; the bot's writers get the lock between batches. Invalid rows are
+reported with their line number and do not stop the import.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import csv
+import io
+import math
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, get_args
+
+import aiosqlite
+
+from api.schemas import ApplicationStatusType
+from database.db import APPLICATION_PATCH_SQL, connect, write_transaction
+from telemetry.metrics import REGISTRY
+
+APPLICATION_STATUSES = get_args(ApplicationStatusType)
+ID_COLUMNS = ("id", "application_id")
+DELIMITERS = (",", ";", "\t")
+
+IMPORT_ROWS = REGISTRY.counter(
+    "reconciliation_import_rows_total",
+    "CSV reconciliation rows by result (applied, failed).",
+    ("result",),
+)
+
+
+class ImportFormatError(Exception):
+    """The file cannot be imported at all (unreadable or missing columns)."""
+
+
+@dataclass(frozen=True)
+class RowError:
+    line: int
+    id: str
+    error: str
+
+
+@dataclass
+class ImportProgress:
+    total_bytes: int = 0
+    bytes_read: int = 0
+    rows_read: int = 0
+    rows_applied: int = 0
+    rows_failed: int = 0
+    errors: list[RowError] = field(default_factory=list)
+    max_errors: int = 100
+    # Called for every failed row; the CLI streams them all to a file.
+    on_error: Callable[[RowError], None] | None = None
+
+    @property
+    def errors_truncated(self) -> bool:
+        return self.rows_failed > len(self.errors)
+
+    @property
+    def percent(self) -> float:
+        if not self.total_bytes:
+            return 0.0
+        return round(min(100.0, self.bytes_read * 100 / self.total_bytes), 1)
+
+    def fail(self, line: int, raw_id: str, error: str) -> None:
+        self.rows_failed += 1
+        IMPORT_ROWS.inc(result="failed")
+        row_error = RowError(line=line, id=raw_id, error=error)
+        if len(self.errors) < self.max_errors:
+            self.errors.append(row_error)
+        if self.on_error is not None:
+            self.on_error(row_error)
+
+
+class CsvBatches:
+    """Reads a CSV file in batches of (line number, row) pairs."""
+
+    def __init__(self, path: Path) -> None:
+        self._raw = path.open("rb")
+        try:
+            self._text = io.TextIOWrapper(self._raw, encoding="utf-8-sig", newline="")
+            header = self._text.readline()
+            if not header.strip():
+                raise ImportFormatError("The file is empty.")
+            delimiter = max(DELIMITERS, key=header.count)
+            columns = [name.strip().lower() for name in next(csv.reader([header], delimiter=delimiter))]
+        except UnicodeDecodeError as exc:
+            self.close()
+            raise ImportFormatError("The file is not UTF-8 text.") from exc
+        except ImportFormatError:
+            self.close()
+            raise
+
+        self.id_column = next((name for name in ID_COLUMNS if name in columns), None)
+        if self.id_column is None:
+            self.close()
+            raise ImportFormatError("Missing column: id.")
+        if "status" not in columns and "revenue" not in columns:
+            self.close()
+            raise ImportFormatError("Nothing to import: add a status or revenue column.")
+        self._reader = csv.DictReader(self._text, fieldnames=columns, delimiter=delimiter)
+
+    @property
+    def bytes_read(self) -> int:
+        # Position of the buffered binary reader; close enough for progress.
+        return self._raw.tell() if not self._raw.closed else 0
+
+    def next_batch(self, size: int) -> list[tuple[int, dict[str, Any]]]:
+        batch: list[tuple[int, dict[str, Any]]] = []
+        try:
+            for row in self._reader:
+                if not any((value or "").strip() for value in row.values() if isinstance(value, str)):
+                    continue
+                # The header was read before the reader started counting.
+                batch.append((self._reader.line_num + 1, row))
+                if len(batch) >= size:
+                    break
+        except (UnicodeDecodeError, csv.Error) as exc:
+            raise ImportFormatError(f"Unreadable CSV after line {self._reader.line_num + 1}: {exc}") from exc
+        return batch
+
+    def close(self) -> None:
+        self._raw.close()
+
+
+def parse_row(row: dict[str, Any], id_column: str) -> tuple[int, dict[str, Any]]:
+    """Validate one row; returns (application id, changes) or raises ValueError."""
+    raw_id = (row.get(id_column) or "").strip()
+    if not raw_id.isdigit():
+        raise ValueError("Invalid id.")
+
+    changes: dict[str, Any] = {}
+    status = (row.get("status") or "").strip().lower()
+    if status:
+        if status not in APPLICATION_STATUSES:
+            raise ValueError(
+                f"Unknown status '{status}'; expected one of: {', '.join(APPLICATION_STATUSES)}."
+            )
+        changes["status"] = status
+
+    raw_revenue = (row.get("revenue") or "").strip().replace(" ", "").replace("\xa0", "")
+    if raw_revenue:
+        try:
+            revenue = float(raw_revenue.replace(",", "."))
+        except ValueError:
+            raise ValueError(f"Invalid revenue '{raw_revenue}'.") from None
+        if not math.isfinite(revenue) or revenue < 0:
+            raise ValueError("Revenue must be a non-negative number.")
+        changes["revenue"] = round(revenue, 2)
+
+    if not changes:
+        raise ValueError("No fields to update.")
+    return int(raw_id), changes
+
+
+async def _owners(db: aiosqlite.Connection, ids: list[int]) -> dict[int, int | None]:
+    placeholders = ", ".join("?" for _ in ids)
+    cursor = await db.execute(
+        f"""
+        SELECT a.id, c.investor_id
+        FROM applications a
+        LEFT JOIN campaigns c ON c.id = a.campaign_id
+        WHERE a.id IN ({placeholders})
+        """,
+        ids,
+    )
+    return {int(row[0]): row[1] for row in await cursor.fetchall()}
+
+
+async def import_csv(
+    path: Path,
+    *,
+    investor_id: int | None = None,
+    dry_run: bool = False,
+    batch_size: int = 1000,
+    batch_pause: float = 0.01,
+    progress: ImportProgress | None = None,
+) -> ImportProgress:
+    """
+    Apply a reconciliation file. `investor_id` limits the import to that
+    investor's applications (other rows fail); `dry_run` validates and checks
+    ids without writing.
+    """
+    progress = progress or ImportProgress()
+    progress.total_bytes = path.stat().st_size
+    batches = await asyncio.to_thread(CsvBatches, path)
+    seen: set[int] = set()
+
+    try:
+        async with connect() as db:
+            while batch := await asyncio.to_thread(batches.next_batch, max(1, batch_size)):
+                progress.rows_read += len(batch)
+                progress.bytes_read = batches.bytes_read
+
+                # Collected per batch so errors come out in file order.
+                rejected: list[tuple[int, str, str]] = []
+                parsed: list[tuple[int, str, int, dict[str, Any]]] = []
+                for line, row in batch:
+                    raw_id = (row.get(batches.id_column) or "").strip()
+                    try:
+                        application_id, changes = parse_row(row, batches.id_column)
+                    except ValueError as exc:
+                        rejected.append((line, raw_id, str(exc)))
+                        continue
+                    if application_id in seen:
+                        rejected.append((line, raw_id, "Duplicate id in file."))
+                        continue
+                    seen.add(application_id)
+                    parsed.append((line, raw_id, application_id, changes))
+
+                owners = (
+                    await _owners(db, [application_id for _, _, application_id, _ in parsed])
+                    if parsed
+                    else {}
+                )
+                params: list[tuple[Any, ...]] = []
+                for line, raw_id, application_id, changes in parsed:
+                    if application_id not in owners:
+                        rejected.append((line, raw_id, "Application not found."))
+                    elif investor_id is not None and owners[application_id] != investor_id:
+                        rejected.append((line, raw_id, "You cannot update this application."))
+                    else:
+                        params.append(
+                            (
+                                "status" in changes,
+                                changes.get("status"),
+                                "revenue" in changes,
+                                changes.get("revenue"),
+                                application_id,
+                            )
+                        )
+                for line, raw_id, error in sorted(rejected):
+                    progress.fail(line, raw_id, error)
+
+                if params and not dry_run:
+                    async with write_transaction(db, site="reconciliation.import"):
+                        await db.executemany(APPLICATION_PATCH_SQL, params)
+                progress.rows_applied += len(params)
+                IMPORT_ROWS.inc(len(params), result="applied")
+                if batch_pause:
+                    await asyncio.sleep(batch_pause)
+    finally:
+        batches.close()
+
+    progress.bytes_read = progress.total_bytes
+    return progress
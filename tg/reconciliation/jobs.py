@@ -0,0 +1,175 @@
+"""Background reconciliation imports for the API process."""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import secrets
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from reconciliation.importer import ImportFormatError, ImportProgress, import_csv
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+@dataclass
+class ImportJob:
+    id: str
+    path: Path
+    owner_id: int
+    investor_id: int | None
+    dry_run: bool
+    progress: ImportProgress
+    status: str = QUEUED
+    detail: str | None = None
+    created_at: str = field(default_factory=_now)
+    started_at: str | None = None
+    finished_at: str | None = None
+    task: asyncio.Task[None] | None = field(default=None, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED, CANCELLED)
+
+    def to_dict(self) -> dict[str, Any]:
+        progress = self.progress
+        return {
+            "id": self.id,
+            "status": self.status,
+            "dry_run": self.dry_run,
+            "detail": self.detail,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "total_bytes": progress.total_bytes,
+            "bytes_read": progress.bytes_read,
+            "percent": progress.percent,
+            "rows_read": progress.rows_read,
+            "rows_applied": progress.rows_applied,
+            "rows_failed": progress.rows_failed,
+            "errors": [
+                {"line": error.line, "id": error.id, "error": error.error}
+                for error in progress.errors
+            ],
+            "errors_truncated": progress.errors_truncated,
+        }
+
+
+class ImportJobManager:
+    """
+    Runs uploaded files through `import_csv` one at a time (SQLite has a single
+    writer; parallel imports would only take turns on the lock) and keeps the
+    `keep_finished` most recent results for polling.
+    """
+
+    def __init__(
+        self,
+        *,
+        batch_size: int = 1000,
+        batch_pause: float = 0.01,
+        max_errors: int = 100,
+        keep_finished: int = 50,
+    ) -> None:
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+        self.max_errors = max_errors
+        self.keep_finished = max(1, keep_finished)
+        self._jobs: OrderedDict[str, ImportJob] = OrderedDict()
+        self._lock = asyncio.Lock()
+
+    def submit(
+        self,
+        path: Path,
+        *,
+        owner_id: int,
+        investor_id: int | None,
+        dry_run: bool = False,
+    ) -> ImportJob:
+        """Take ownership of `path` (deleted when the job ends) and queue it."""
+        job = ImportJob(
+            id=secrets.token_hex(8),
+            path=path,
+            owner_id=owner_id,
+            investor_id=investor_id,
+            dry_run=dry_run,
+            progress=ImportProgress(max_errors=self.max_errors),
+        )
+        self._jobs[job.id] = job
+        self._forget_old()
+        # A fresh context: the job outlives the request that submitted it and
+        # must not count its statements against that request's query tracker.
+        job.task = asyncio.create_task(
+            self._run(job),
+            name=f"import-{job.id}",
+            context=contextvars.Context(),
+        )
+        return job
+
+    def get(self, job_id: str) -> ImportJob | None:
+        return self._jobs.get(job_id)
+
+    def cancel(self, job: ImportJob) -> None:
+        if job.task is not None and not job.task.done():
+            job.task.cancel()
+
+    async def stop(self) -> None:
+        tasks = [job.task for job in self._jobs.values() if job.task is not None and not job.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _forget_old(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[: max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job_id]
+
+    async def _run(self, job: ImportJob) -> None:
+        try:
+            async with self._lock:
+                job.status = RUNNING
+                job.started_at = _now()
+                await import_csv(
+                    job.path,
+                    investor_id=job.investor_id,
+                    dry_run=job.dry_run,
+                    batch_size=self.batch_size,
+                    batch_pause=self.batch_pause,
+                    progress=job.progress,
+                )
+                job.status = DONE
+        except asyncio.CancelledError:
+            job.status = CANCELLED
+            raise
+        except ImportFormatError as exc:
+            job.status = FAILED
+            job.detail = str(exc)
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("Reconciliation import %s failed.", job.id)
+            job.status = FAILED
+            job.detail = f"Import failed: {exc}"
+        finally:
+            job.finished_at = _now()
+            job.path.unlink(missing_ok=True)
+            logger.info(
+                "Reconciliation import %s %s: %s applied, %s failed of %s rows.",
+                job.id,
+                job.status,
+                job.progress.rows_applied,
+                job.progress.rows_failed,
+                job.progress.rows_read,
+            )
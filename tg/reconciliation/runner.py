@@ -0,0 +1,107 @@
+"""
+Command line entry point for reconciliation imports.
+
+    python tg/reconciliation/runner.py payouts.csv --errors payouts-errors.csv
+    python tg/reconciliation/runner.py payouts.csv --dry-run
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import os
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+TG_DIR = Path(__file__).resolve().parents[1]
+REPO_DIR = TG_DIR.parent
+
+if str(TG_DIR) not in sys.path:
+    sys.path.insert(0, str(TG_DIR))
+
+load_dotenv(REPO_DIR / ".env")
+load_dotenv(TG_DIR / ".env")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Apply application statuses and revenue from a partner CSV file."
+    )
+    parser.add_argument("path", type=str, help="CSV with id and status and/or revenue columns.")
+    parser.add_argument("--db", type=str, help="Path to sqlite database file (default: DB_PATH).")
+    parser.add_argument("--dry-run", action="store_true", help="Validate and check ids without writing.")
+    parser.add_argument("--investor-id", type=int, help="Only update this investor's applications.")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows per write transaction.")
+    parser.add_argument("--errors", type=str, help="Write every rejected row (line, id, error) to this CSV.")
+    return parser.parse_args()
+
+
+async def _report_progress(progress) -> None:
+    while True:
+        await asyncio.sleep(1)
+        print(
+            f"\r{progress.percent:5.1f}%  {progress.rows_read} rows, "
+            f"{progress.rows_applied} applied, {progress.rows_failed} failed",
+            end="",
+            file=sys.stderr,
+            flush=True,
+        )
+
+
+async def run(args: argparse.Namespace) -> None:
+    # Imported after --db is applied: database.db reads DB_PATH at import time.
+    from reconciliation.importer import ImportProgress, import_csv
+
+    errors_file = open(args.errors, "w", encoding="utf-8", newline="") if args.errors else None
+    progress = ImportProgress()
+    if errors_file is not None:
+        writer = csv.writer(errors_file)
+        writer.writerow(["line", "id", "error"])
+        progress.on_error = lambda error: writer.writerow([error.line, error.id, error.error])
+
+    reporter = asyncio.create_task(_report_progress(progress))
+    try:
+        await import_csv(
+            Path(args.path).expanduser(),
+            investor_id=args.investor_id,
+            dry_run=args.dry_run,
+            batch_size=args.batch_size,
+            batch_pause=0.0,
+            progress=progress,
+        )
+    finally:
+        reporter.cancel()
+        if errors_file is not None:
+            errors_file.close()
+
+    verb = "would be applied" if args.dry_run else "applied"
+    print(
+        f"\r{progress.rows_read} rows read, {progress.rows_applied} {verb}, "
+        f"{progress.rows_failed} rejected.",
+        file=sys.stderr,
+    )
+    if not args.errors:
+        for error in progress.errors:
+            print(f"line {error.line} (id {error.id or '-'}): {error.error}")
+        if progress.errors_truncated:
+            print(f"... {progress.rows_failed - len(progress.errors)} more; use --errors FILE for all.")
+
+
+def main() -> None:
+    args = parse_args()
+    if args.db:
+        os.environ["DB_PATH"] = str(Path(args.db).expanduser().resolve())
+
+    from reconciliation.importer import ImportFormatError
+
+    try:
+        asyncio.run(run(args))
+    except (ImportFormatError, FileNotFoundError) as exc:
+        raise SystemExit(f"Import failed: {exc}") from exc
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""services package — Long-running bot services (outgoing delivery, background workers)."""
@@ -0,0 +1,329 @@
+"""
+services/fsm_storage.py — Persistent FSM storage on the shared SQLite database.
+
+Replaces aiogram's in-memory storage so that in-progress applications survive
+bot restarts and abandoned sessions are expired instead of living in RAM forever.
+
+- Reads are served from a bounded LRU of hot keys; misses go to SQLite.
+- Writes only mark the key dirty. A background task flushes all dirty keys in
+  one transaction every `flush_interval` seconds, so a burst of
+  `set_state` + `update_data` for one step costs a single row write.
+- Rows untouched for `ttl_seconds` are treated as empty and periodically
+  deleted by the sweeper.
+
+A crash loses at most the last `flush_interval` of FSM updates.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+from typing import Any, Mapping
+
+import aiosqlite
+from aiogram.exceptions import DataNotDictLikeError
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, DefaultKeyBuilder, StateType, StorageKey
+
+from database.db import connect, write_transaction
+from telemetry.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+CACHE_LOOKUPS = REGISTRY.counter(
+    "fsm_storage_cache_total",
+    "FSM storage lookups by result (hit, miss).",
+    ("result",),
+)
+FLUSHED_KEYS = REGISTRY.counter(
+    "fsm_storage_flushed_keys_total",
+    "FSM keys written to SQLite by the coalescing flusher.",
+)
+EXPIRED_KEYS = REGISTRY.counter(
+    "fsm_storage_expired_total",
+    "Abandoned FSM sessions deleted by the TTL sweeper.",
+)
+DIRTY_KEYS = REGISTRY.gauge(
+    "fsm_storage_dirty_keys",
+    "FSM keys waiting to be flushed to SQLite.",
+)
+CACHED_KEYS = REGISTRY.gauge(
+    "fsm_storage_cached_keys",
+    "FSM records held in the in-memory LRU cache.",
+)
+
+# Migration 0005; created here too, see database.db.init_db.
+CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS fsm_storage (
+    key        TEXT PRIMARY KEY,
+    state      TEXT,
+    data       TEXT NOT NULL DEFAULT '{}',
+    updated_at REAL NOT NULL
+)
+"""
+CREATE_INDEX_SQL = """
+CREATE INDEX IF NOT EXISTS idx_fsm_storage_updated_at
+ON fsm_storage(updated_at)
+"""
+
+
+@dataclass
+class _Record:
+    state: str | None = None
+    data: dict[str, Any] = field(default_factory=dict)
+    updated_at: float = 0.0
+
+    @property
+    def empty(self) -> bool:
+        return self.state is None and not self.data
+
+
+class SQLiteStorage(BaseStorage):
+    """
+    aiogram FSM storage backed by the `fsm_storage` table.
+
+    Call `start()` once the event loop is running and `close()` on shutdown;
+    `close()` flushes pending writes before releasing the connection.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float = 86400,
+        cache_size: int = 1024,
+        flush_interval: float = 0.5,
+        sweep_interval: float = 600,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.cache_size = max(1, cache_size)
+        self.flush_interval = flush_interval
+        self.sweep_interval = sweep_interval
+        self.key_builder = DefaultKeyBuilder(
+            with_bot_id=True,
+            with_business_connection_id=True,
+            with_destiny=True,
+        )
+
+        self._cache: OrderedDict[str, _Record] = OrderedDict()
+        self._dirty: dict[str, _Record] = {}
+        self._db: aiosqlite.Connection | None = None
+        self._exit_stack: AsyncExitStack | None = None
+        self._db_lock = asyncio.Lock()
+        self._connect_lock = asyncio.Lock()
+        self._flush_task: asyncio.Task | None = None
+        self._sweep_task: asyncio.Task | None = None
+        self._stopping = False
+        CACHED_KEYS.set_function(lambda: len(self._cache))
+
+    # ── Lifecycle ──────────────────────────────────────────────────────────
+
+    async def start(self) -> None:
+        await self._connection()
+        if self._flush_task is None:
+            self._stopping = False
+            self._flush_task = asyncio.create_task(self._flush_loop(), name="fsm-storage-flush")
+            self._sweep_task = asyncio.create_task(self._sweep_loop(), name="fsm-storage-sweep")
+
+    async def close(self) -> None:
+        self._stopping = True
+        for task in (self._flush_task, self._sweep_task):
+            if task is None:
+                continue
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._flush_task = None
+        self._sweep_task = None
+
+        await self.flush()
+        if self._exit_stack is not None:
+            await self._exit_stack.aclose()
+        self._exit_stack = None
+        self._db = None
+
+    async def _connection(self) -> aiosqlite.Connection:
+        if self._db is not None:
+            return self._db
+        async with self._connect_lock:
+            if self._db is None:
+                stack = AsyncExitStack()
+                db = await stack.enter_async_context(connect())
+                await db.execute(CREATE_TABLE_SQL)
+                await db.execute(CREATE_INDEX_SQL)
+                await db.commit()
+                self._exit_stack, self._db = stack, db
+        return self._db
+
+    # ── BaseStorage API ────────────────────────────────────────────────────
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        record = await self._load(key)
+        record.state = state.state if isinstance(state, State) else state
+        self._mark_dirty(key, record)
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        return (await self._load(key)).state
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        if not isinstance(data, dict):
+            msg = f"Data must be a dict or dict-like object, got {type(data).__name__}"
+            raise DataNotDictLikeError(msg)
+        record = await self._load(key)
+        record.data = data.copy()
+        self._mark_dirty(key, record)
+
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        return (await self._load(key)).data.copy()
+
+    # ── Cache ──────────────────────────────────────────────────────────────
+
+    def _expired(self, record: _Record, now: float) -> bool:
+        return bool(record.updated_at) and now - record.updated_at > self.ttl_seconds
+
+    def _remember(self, storage_key: str, record: _Record) -> None:
+        self._cache[storage_key] = record
+        self._cache.move_to_end(storage_key)
+        while len(self._cache) > self.cache_size:
+            # Dirty records stay reachable through `_dirty` until flushed.
+            self._cache.popitem(last=False)
+
+    async def _load(self, key: StorageKey) -> _Record:
+        storage_key = self.key_builder.build(key)
+        now = time.time()
+
+        record = self._dirty.get(storage_key) or self._cache.get(storage_key)
+        if record is not None:
+            CACHE_LOOKUPS.inc(result="hit")
+        else:
+            CACHE_LOOKUPS.inc(result="miss")
+            fetched = await self._fetch(storage_key)
+            # A concurrent writer may have populated the key while we were reading.
+            record = self._dirty.get(storage_key) or self._cache.get(storage_key) or fetched
+
+        if self._expired(record, now):
+            record = _Record()
+        self._remember(storage_key, record)
+        return record
+
+    def _mark_dirty(self, key: StorageKey, record: _Record) -> None:
+        storage_key = self.key_builder.build(key)
+        record.updated_at = time.time()
+        self._dirty[storage_key] = record
+        self._remember(storage_key, record)
+        DIRTY_KEYS.set(len(self._dirty))
+
+    async def _fetch(self, storage_key: str) -> _Record:
+        db = await self._connection()
+        async with self._db_lock:
+            cursor = await db.execute(
+                "SELECT state, data, updated_at FROM fsm_storage WHERE key = ?",
+                (storage_key,),
+            )
+            row = await cursor.fetchone()
+        if not row:
+            return _Record()
+        try:
+            data = json.loads(row[1]) if row[1] else {}
+        except ValueError:
+            logger.warning("Dropping unreadable FSM data for key %s", storage_key)
+            data = {}
+        return _Record(state=row[0], data=data, updated_at=float(row[2]))
+
+    # ── Background work ────────────────────────────────────────────────────
+
+    async def flush(self) -> int:
+        """
+        Write all dirty keys in one transaction. Returns the number of keys written.
+        """
+        if not self._dirty:
+            return 0
+        batch, self._dirty = self._dirty, {}
+
+        upserts = []
+        deletes = []
+        for storage_key, record in batch.items():
+            if record.empty:
+                deletes.append((storage_key,))
+            else:
+                upserts.append(
+                    (
+                        storage_key,
+                        record.state,
+                        json.dumps(record.data, ensure_ascii=False),
+                        record.updated_at,
+                    )
+                )
+
+        db = await self._connection()
+        try:
+            async with self._db_lock:
+                async with write_transaction(db, site="fsm.flush"):
+                    if upserts:
+                        await db.executemany(
+                            """
+                            INSERT INTO fsm_storage (key, state, data, updated_at)
+                            VALUES (?, ?, ?, ?)
+                            ON CONFLICT(key) DO UPDATE SET
+                                state = excluded.state,
+                                data = excluded.data,
+                                updated_at = excluded.updated_at
+                            """,
+                            upserts,
+                        )
+                    if deletes:
+                        await db.executemany("DELETE FROM fsm_storage WHERE key = ?", deletes)
+        except Exception:
+            # Keep newer writes that arrived while flushing; retry the rest later.
+            for storage_key, record in batch.items():
+                self._dirty.setdefault(storage_key, record)
+            DIRTY_KEYS.set(len(self._dirty))
+            raise
+
+        FLUSHED_KEYS.inc(len(batch))
+        DIRTY_KEYS.set(len(self._dirty))
+        return len(batch)
+
+    async def sweep(self, now: float | None = None) -> int:
+        """
+        Delete sessions untouched for longer than the TTL. Returns deleted rows.
+        """
+        cutoff = (now if now is not None else time.time()) - self.ttl_seconds
+        db = await self._connection()
+        async with self._db_lock:
+            async with write_transaction(db, site="fsm.sweep"):
+                cursor = await db.execute(
+                    "DELETE FROM fsm_storage WHERE updated_at < ?",
+                    (cutoff,),
+                )
+                deleted = max(0, cursor.rowcount)
+
+        for storage_key in [k for k, r in self._cache.items() if 0 < r.updated_at < cutoff]:
+            if storage_key not in self._dirty:
+                del self._cache[storage_key]
+        if deleted:
+            EXPIRED_KEYS.inc(deleted)
+            logger.info("Expired %s abandoned FSM sessions.", deleted)
+        return deleted
+
+    async def _flush_loop(self) -> None:
+        while not self._stopping:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("FSM storage flush failed; will retry.")
+
+    async def _sweep_loop(self) -> None:
+        while not self._stopping:
+            try:
+                await self.sweep()
+            except Exception:
+                logger.exception("FSM storage sweep failed; will retry.")
+            await asyncio.sleep(self.sweep_interval)
@@ -0,0 +1,144 @@
+"""
+services/funnel.py — Application funnel tracking.
+
+Handlers call `FunnelTracker.track(step, campaign_id)` at each transition of
+the application flow. `track` only bumps an in-memory counter keyed by
+(minute, campaign, step); a background task upserts the accumulated
+per-minute rollups into `funnel_stats` in one transaction. The API reads
+nothing but those rollups.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from database.db import connect, write_transaction
+from telemetry.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+STEP_START = "start"
+STEP_START_TEST = "start_test"
+STEP_PHONE = "phone"
+STEP_NAME = "name"
+STEP_AGE = "age"
+STEP_SUBMITTED = "submitted"
+STEP_REJECTED_AGE = "rejected_age"
+STEP_REJECTED_CITIZENSHIP = "rejected_citizenship"
+STEP_DUPLICATE = "duplicate"
+
+# Happy-path order used for conversion rates.
+FUNNEL_STEPS = (STEP_START, STEP_START_TEST, STEP_PHONE, STEP_NAME, STEP_AGE, STEP_SUBMITTED)
+
+# Events without a campaign are stored under campaign_id 0.
+NO_CAMPAIGN = 0
+
+FUNNEL_EVENTS = REGISTRY.counter(
+    "funnel_events_total",
+    "Application funnel events recorded by the bot.",
+    ("step",),
+)
+FUNNEL_FLUSH_SECONDS = REGISTRY.histogram(
+    "funnel_flush_seconds",
+    "Time to write buffered funnel rollups to SQLite.",
+)
+
+# Migration 0008; created here too, see database.db.init_db.
+CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS funnel_stats (
+    campaign_id INTEGER NOT NULL,
+    step        TEXT    NOT NULL,
+    bucket      TEXT    NOT NULL,
+    count       INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (campaign_id, step, bucket)
+) WITHOUT ROWID
+"""
+
+
+def minute_bucket(minute: int) -> str:
+    """
+    Render a Unix minute as the `funnel_stats.bucket` value (UTC).
+    """
+    return datetime.fromtimestamp(minute * 60, tz=timezone.utc).strftime("%Y-%m-%d %H:%M")
+
+
+class FunnelTracker:
+    def __init__(self, *, flush_interval: float = 5.0) -> None:
+        self.flush_interval = flush_interval
+        self._pending: Counter[tuple[int, int, str]] = Counter()
+        self._task: asyncio.Task | None = None
+        self._table_ready = False
+
+    def track(self, step: str, campaign_id: int | None = None) -> None:
+        """
+        Record one funnel event. Never blocks and never touches the database.
+        """
+        minute = int(time.time() // 60)
+        self._pending[(minute, campaign_id or NO_CAMPAIGN, step)] += 1
+        FUNNEL_EVENTS.inc(step=step)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="funnel-flush")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def flush(self) -> int:
+        """
+        Upsert buffered rollups. Returns the number of rows written.
+        """
+        if not self._pending:
+            return 0
+        batch, self._pending = self._pending, Counter()
+        rows = [
+            (campaign_id, step, minute_bucket(minute), count)
+            for (minute, campaign_id, step), count in batch.items()
+        ]
+
+        started = time.monotonic()
+        try:
+            async with connect() as db:
+                if not self._table_ready:
+                    await db.execute(CREATE_TABLE_SQL)
+                    await db.commit()
+                    self._table_ready = True
+                async with write_transaction(db, site="funnel.flush"):
+                    await db.executemany(
+                        """
+                        INSERT INTO funnel_stats (campaign_id, step, bucket, count)
+                        VALUES (?, ?, ?, ?)
+                        ON CONFLICT(campaign_id, step, bucket)
+                        DO UPDATE SET count = count + excluded.count
+                        """,
+                        rows,
+                    )
+        except Exception:
+            # Put the counts back so the next flush retries them.
+            self._pending.update(batch)
+            raise
+        FUNNEL_FLUSH_SECONDS.observe(time.monotonic() - started)
+        return len(rows)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Funnel flush failed; will retry.")
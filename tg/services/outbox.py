@@ -0,0 +1,207 @@
+"""
+services/outbox.py — Delivery worker for the `notification_outbox` table.
+
+Rows are written together with the application they describe, so a crash or
+a Telegram outage never loses an admin alert: the worker drains due rows in
+batches through the send scheduler and reschedules failures with backoff.
+Delivery is at-least-once; a crash between sending and marking a row as sent
+repeats that single alert after restart.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any
+
+import aiosqlite
+from aiogram.methods import SendMessage, TelegramMethod
+
+from database.db import (
+    fetch_due_notifications,
+    mark_notifications_sent,
+    outbox_backlog,
+    reschedule_notifications,
+)
+from keyboards.keyboards import get_contacted_keyboard
+from services.sender import MessageScheduler
+from telemetry.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_PENDING = REGISTRY.gauge(
+    "outbox_pending",
+    "Notifications waiting in the outbox.",
+)
+OUTBOX_OLDEST_AGE = REGISTRY.gauge(
+    "outbox_oldest_pending_age_seconds",
+    "Age of the oldest undelivered notification.",
+)
+OUTBOX_DELIVERY_LAG = REGISTRY.histogram(
+    "outbox_delivery_lag_seconds",
+    "Time from outbox insert to confirmed delivery.",
+    buckets=(0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0),
+)
+OUTBOX_DELIVERIES = REGISTRY.counter(
+    "outbox_deliveries_total",
+    "Outbox delivery attempts by result.",
+    ("result",),
+)
+
+KIND_NEW_APPLICATION = "new_application"
+
+
+def _parse_utc(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+def _age_seconds(value: str | None) -> float:
+    created_at = _parse_utc(value)
+    if created_at is None:
+        return 0.0
+    return max(0.0, (datetime.now(timezone.utc) - created_at).total_seconds())
+
+
+def build_method(notification: dict[str, Any]) -> TelegramMethod[Any]:
+    """Turn an outbox row into the Telegram call that delivers it."""
+    payload = notification["payload"]
+    reply_markup = None
+    if notification["kind"] == KIND_NEW_APPLICATION and notification["application_id"]:
+        reply_markup = get_contacted_keyboard(int(notification["application_id"]))
+    return SendMessage(
+        chat_id=notification["chat_id"],
+        text=payload.get("text", ""),
+        reply_markup=reply_markup,
+    )
+
+
+class OutboxWorker:
+    """
+    Drains due outbox rows through the send scheduler.
+
+    Runs a batch on every `wake()` (a row was just committed) and at least
+    every `poll_interval` seconds for retries whose backoff expired.
+    """
+
+    def __init__(
+        self,
+        sender: MessageScheduler,
+        *,
+        batch_size: int = 50,
+        poll_interval: float = 2.0,
+        max_attempts: int = 10,
+        base_backoff: int = 5,
+        max_backoff: int = 900,
+    ) -> None:
+        self.sender = sender
+        self.batch_size = max(1, batch_size)
+        self.poll_interval = max(0.1, poll_interval)
+        self.max_attempts = max(1, max_attempts)
+        self.base_backoff = max(1, base_backoff)
+        self.max_backoff = max(self.base_backoff, max_backoff)
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        self._stopping = False
+
+    def wake(self) -> None:
+        """Ask the worker to drain now instead of waiting for the next poll."""
+        self._wakeup.set()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._stopping = False
+            self._task = asyncio.create_task(self._run(), name="outbox-worker")
+
+    async def stop(self, drain_timeout: float = 5.0) -> None:
+        """
+        Let the batch in progress finish, then stop.
+
+        Cancelling mid-batch would leave delivered rows unmarked and send them
+        again after restart; the worker is cancelled only if the batch does not
+        finish within `drain_timeout` seconds.
+        """
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        done, _ = await asyncio.wait({self._task}, timeout=drain_timeout)
+        if not done:
+            self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def _backoff(self, attempts: int) -> int:
+        return min(self.max_backoff, self.base_backoff * 2 ** max(0, attempts - 1))
+
+    async def drain_once(self) -> int:
+        """Deliver one batch of due notifications; returns the batch size."""
+        batch = await fetch_due_notifications(self.batch_size)
+        if batch:
+            futures = [self.sender.submit(build_method(item)) for item in batch]
+            results = await asyncio.gather(*futures, return_exceptions=True)
+
+            sent: list[int] = []
+            failures: list[tuple[int, int, str, bool]] = []
+            for item, result in zip(batch, results):
+                if isinstance(result, BaseException):
+                    attempts = int(item["attempts"]) + 1
+                    give_up = attempts >= self.max_attempts
+                    failures.append(
+                        (int(item["id"]), self._backoff(attempts), str(result), give_up)
+                    )
+                    OUTBOX_DELIVERIES.inc(result="failed" if give_up else "retry")
+                    if give_up:
+                        logger.error(
+                            "Outbox notification #%s dropped after %s attempts: %s",
+                            item["id"],
+                            attempts,
+                            result,
+                        )
+                    continue
+
+                sent.append(int(item["id"]))
+                OUTBOX_DELIVERIES.inc(result="sent")
+                OUTBOX_DELIVERY_LAG.observe(_age_seconds(item["created_at"]))
+
+            await mark_notifications_sent(sent)
+            await reschedule_notifications(failures)
+
+        pending, oldest = await outbox_backlog()
+        OUTBOX_PENDING.set(pending)
+        OUTBOX_OLDEST_AGE.set(_age_seconds(oldest) if pending else 0.0)
+        return len(batch)
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            started = time.monotonic()
+            # Cleared before the drain, so a wake() for a row committed while
+            # draining is not lost until the next poll.
+            self._wakeup.clear()
+            try:
+                drained = await self.drain_once()
+            except aiosqlite.Error as exc:
+                logger.warning("Outbox drain failed: %s", exc)
+                drained = 0
+            except Exception:  # noqa: BLE001
+                logger.exception("Outbox drain failed.")
+                drained = 0
+
+            # A full batch means there is more work right away.
+            if drained >= self.batch_size:
+                continue
+
+            timeout = max(0.0, self.poll_interval - (time.monotonic() - started))
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
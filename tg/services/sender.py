@@ -0,0 +1,323 @@
+"""
+services/sender.py — Rate-aware outgoing message scheduler.
+
+Telegram allows roughly 30 messages per second per bot and about one message
+per second per chat. Handlers hand messages to the scheduler and return at
+once; the scheduler delivers them in per-chat FIFO order within both limits
+and honours `RetryAfter` replies: a single one pauses its chat, and
+`RetryAfter` for `flood_chats` different chats within `flood_window` seconds
+means the bot as a whole is flood-limited, so every chat pauses.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError, TelegramNetworkError, TelegramRetryAfter
+from aiogram.methods import TelegramMethod
+
+from telemetry.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+SEND_TOTAL = REGISTRY.counter(
+    "telegram_send_total",
+    "Outgoing Telegram API calls by method and result.",
+    ("method", "result"),
+)
+SEND_LATENCY = REGISTRY.histogram(
+    "telegram_send_latency_seconds",
+    "Time from enqueue to successful delivery.",
+    ("method",),
+)
+RETRY_AFTER_TOTAL = REGISTRY.counter(
+    "telegram_retry_after_total",
+    "RetryAfter (flood control) responses received from Telegram.",
+)
+GLOBAL_PAUSES = REGISTRY.counter(
+    "telegram_send_global_pauses_total",
+    "Times all sending was paused because several chats got RetryAfter.",
+)
+QUEUE_DEPTH = REGISTRY.gauge(
+    "telegram_send_queue_depth",
+    "Messages waiting in the outgoing scheduler.",
+)
+
+
+IDLE_SWEEP_THRESHOLD = 1000
+
+
+class SendQueueFull(Exception):
+    """Raised when the outgoing queue is at capacity."""
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, at most `capacity` stored."""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = max(rate, 0.001)
+        self.capacity = max(capacity, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self._updated)
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def delay(self, now: float | None = None) -> float:
+        """Seconds until one token is available (0 when available now)."""
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        if self._tokens >= 1.0:
+            return 0.0
+        return (1.0 - self._tokens) / self.rate
+
+    def consume(self, now: float | None = None) -> None:
+        self._refill(time.monotonic() if now is None else now)
+        self._tokens -= 1.0
+
+    def is_full(self, now: float | None = None) -> bool:
+        self._refill(time.monotonic() if now is None else now)
+        return self._tokens >= self.capacity
+
+
+@dataclass
+class _Outgoing:
+    method: TelegramMethod[Any]
+    future: asyncio.Future[Any]
+    enqueued_at: float = field(default_factory=time.monotonic)
+    attempts: int = 0
+
+
+@dataclass
+class _ChatQueue:
+    bucket: TokenBucket
+    items: deque[_Outgoing] = field(default_factory=deque)
+    blocked_until: float = 0.0
+    scheduled: bool = False
+
+
+def _fail(future: asyncio.Future[Any], exc: BaseException) -> None:
+    if not future.done():
+        future.set_exception(exc)
+
+
+def _log_failure(future: asyncio.Future[Any]) -> None:
+    if future.cancelled():
+        return
+    exc = future.exception()
+    if exc is not None:
+        logger.error("Outgoing Telegram message was not delivered: %s", exc)
+
+
+class MessageScheduler:
+    """
+    Deliver Telegram API calls without blocking the caller.
+
+    Each chat has its own queue and token bucket; a chat is dispatched again only
+    after its previous message finished, so per-chat order is preserved.
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        *,
+        global_rate: float = 30.0,
+        chat_rate: float = 1.0,
+        chat_burst: int = 3,
+        max_queue: int = 10000,
+        max_attempts: int = 5,
+        max_in_flight: int = 30,
+        flood_chats: int = 2,
+        flood_window: float = 5.0,
+    ) -> None:
+        self.bot = bot
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_queue = max(1, max_queue)
+        self.max_attempts = max(1, max_attempts)
+        self._global = TokenBucket(global_rate, global_rate)
+        self.flood_chats = max(1, flood_chats)
+        self.flood_window = flood_window
+        # (monotonic time, chat key) of recent RetryAfter replies.
+        self._retry_afters: deque[tuple[float, int | str]] = deque()
+        self._global_blocked_until = 0.0
+        self._chats: dict[int | str, _ChatQueue] = {}
+        self._ready: asyncio.Queue[int | str] = asyncio.Queue()
+        self._in_flight = asyncio.Semaphore(max(1, max_in_flight))
+        self._pending = 0
+        self._task: asyncio.Task[None] | None = None
+        self._deliveries: set[asyncio.Task[None]] = set()
+        QUEUE_DEPTH.set_function(lambda: float(self._pending))
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def submit(self, method: TelegramMethod[Any]) -> asyncio.Future[Any]:
+        """
+        Queue a Telegram method call and return immediately.
+
+        The returned future resolves with the API result; callers may ignore it,
+        delivery failures are logged either way.
+        """
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[Any] = loop.create_future()
+        future.add_done_callback(_log_failure)
+
+        if self._pending >= self.max_queue:
+            SEND_TOTAL.inc(method=type(method).__name__, result="dropped")
+            future.set_exception(SendQueueFull(f"Outgoing queue is full ({self.max_queue})."))
+            return future
+
+        chat_id = getattr(method, "chat_id", None)
+        key: int | str = chat_id if chat_id is not None else "_"
+        chat = self._chats.get(key)
+        if chat is None:
+            if len(self._chats) >= IDLE_SWEEP_THRESHOLD:
+                self._sweep_idle_chats()
+            chat = _ChatQueue(bucket=TokenBucket(self.chat_rate, self.chat_burst))
+            self._chats[key] = chat
+
+        chat.items.append(_Outgoing(method=method, future=future))
+        self._pending += 1
+        self._schedule(key, chat)
+        return future
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._dispatch(), name="message-scheduler")
+
+    async def stop(self, drain_timeout: float = 5.0) -> None:
+        deadline = time.monotonic() + drain_timeout
+        while self._pending and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        for task in list(self._deliveries):
+            task.cancel()
+        if self._deliveries:
+            await asyncio.gather(*self._deliveries, return_exceptions=True)
+
+        for chat in self._chats.values():
+            while chat.items:
+                item = chat.items.popleft()
+                if not item.future.done():
+                    item.future.cancel()
+        self._chats.clear()
+        self._pending = 0
+
+    def _sweep_idle_chats(self) -> None:
+        idle = [
+            key
+            for key, chat in self._chats.items()
+            if not chat.items and not chat.scheduled and chat.bucket.is_full()
+        ]
+        for key in idle:
+            self._chats.pop(key, None)
+
+    def _note_retry_after(self, key: int | str, retry_after: float) -> None:
+        now = time.monotonic()
+        self._retry_afters.append((now, key))
+        while self._retry_afters and now - self._retry_afters[0][0] > self.flood_window:
+            self._retry_afters.popleft()
+        if len({chat_key for _, chat_key in self._retry_afters}) < self.flood_chats:
+            return
+        if now + retry_after > self._global_blocked_until:
+            GLOBAL_PAUSES.inc()
+            logger.warning("RetryAfter from several chats: pausing all sending for %.0fs.", retry_after)
+            self._global_blocked_until = now + retry_after
+
+    def _schedule(self, key: int | str, chat: _ChatQueue, delay: float = 0.0) -> None:
+        if chat.scheduled or not chat.items:
+            return
+        chat.scheduled = True
+        if delay > 0:
+            asyncio.get_running_loop().call_later(delay, self._ready.put_nowait, key)
+        else:
+            self._ready.put_nowait(key)
+
+    async def _dispatch(self) -> None:
+        while True:
+            key = await self._ready.get()
+            chat = self._chats.get(key)
+            if chat is None or not chat.items:
+                if chat is not None:
+                    chat.scheduled = False
+                continue
+
+            now = time.monotonic()
+            wait = max(chat.blocked_until - now, chat.bucket.delay(now))
+            if wait > 0:
+                chat.scheduled = False
+                self._schedule(key, chat, wait)
+                continue
+
+            # Re-checked after sleeping: a flood pause may start meanwhile.
+            while (global_wait := max(self._global_blocked_until - time.monotonic(), self._global.delay())) > 0:
+                await asyncio.sleep(global_wait)
+
+            await self._in_flight.acquire()
+            self._global.consume()
+            chat.bucket.consume()
+            item = chat.items.popleft()
+            task = asyncio.create_task(self._deliver(key, chat, item))
+            self._deliveries.add(task)
+            task.add_done_callback(self._deliveries.discard)
+
+    async def _deliver(self, key: int | str, chat: _ChatQueue, item: _Outgoing) -> None:
+        method_name = type(item.method).__name__
+        requeue = False
+        try:
+            item.attempts += 1
+            result = await self.bot(item.method)
+        except TelegramRetryAfter as exc:
+            RETRY_AFTER_TOTAL.inc()
+            SEND_TOTAL.inc(method=method_name, result="retry_after")
+            chat.blocked_until = time.monotonic() + float(exc.retry_after)
+            self._note_retry_after(key, float(exc.retry_after))
+            requeue = item.attempts < self.max_attempts
+            if not requeue:
+                _fail(item.future, exc)
+        except TelegramNetworkError as exc:
+            SEND_TOTAL.inc(method=method_name, result="network_error")
+            chat.blocked_until = time.monotonic() + min(30.0, 2.0 ** item.attempts)
+            requeue = item.attempts < self.max_attempts
+            if not requeue:
+                _fail(item.future, exc)
+        except TelegramAPIError as exc:
+            SEND_TOTAL.inc(method=method_name, result="error")
+            _fail(item.future, exc)
+        except Exception as exc:  # noqa: BLE001
+            SEND_TOTAL.inc(method=method_name, result="error")
+            _fail(item.future, exc)
+        else:
+            SEND_TOTAL.inc(method=method_name, result="ok")
+            SEND_LATENCY.observe(time.monotonic() - item.enqueued_at, method=method_name)
+            if not item.future.done():
+                item.future.set_result(result)
+        finally:
+            self._in_flight.release()
+            if requeue:
+                chat.items.appendleft(item)
+            else:
+                self._pending -= 1
+            chat.scheduled = False
+            if chat.items:
+                self._schedule(key, chat, max(0.0, chat.blocked_until - time.monotonic()))
+            elif chat.bucket.is_full():
+                self._chats.pop(key, None)
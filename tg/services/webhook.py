@@ -0,0 +1,204 @@
+"""
+services/webhook.py — Webhook intake for the bot.
+
+Telegram POSTs each update to the webhook endpoint. The endpoint checks the
+secret token, drops updates it has already accepted (Telegram redelivers on
+timeouts and non-2xx responses) and hands the update to `UpdateProcessor`,
+then answers 200 right away; handlers never run inside the HTTP request.
+
+`UpdateProcessor` runs updates concurrently, at most `max_concurrency` at a
+time, while keeping updates from the same user strictly in arrival order so
+FSM steps of one applicant never race each other.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hmac
+import logging
+import time
+from collections import OrderedDict, deque
+from typing import Any, Hashable
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from telemetry.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+WEBHOOK_UPDATES = REGISTRY.counter(
+    "telegram_webhook_updates_total",
+    "Webhook updates by result (accepted, duplicate, rejected, invalid, overloaded).",
+    ("result",),
+)
+UPDATE_LATENCY = REGISTRY.histogram(
+    "telegram_update_processing_seconds",
+    "Time from webhook intake to handler completion.",
+)
+UPDATES_PENDING = REGISTRY.gauge(
+    "telegram_updates_pending",
+    "Accepted webhook updates not yet processed.",
+)
+
+
+def ordering_key(update: Update) -> Hashable:
+    """
+    Updates sharing a key are processed one at a time, in order.
+
+    The key is the sender's user id when the update has one, else the chat id;
+    updates with neither (e.g. polls) are independent.
+    """
+    event = update.event
+    user = getattr(event, "from_user", None)
+    if user is not None:
+        return ("user", user.id)
+    chat = getattr(event, "chat", None)
+    if chat is not None:
+        return ("chat", chat.id)
+    return ("update", update.update_id)
+
+
+class UpdateProcessor:
+    """
+    Bounded-concurrency executor for incoming updates with per-user ordering.
+    """
+
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        bot: Bot,
+        *,
+        max_concurrency: int = 64,
+        max_pending: int = 10000,
+        dedup_size: int = 10000,
+    ) -> None:
+        self.dispatcher = dispatcher
+        self.bot = bot
+        self.max_pending = max_pending
+        self.dedup_size = max(1, dedup_size)
+
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._queues: dict[Hashable, deque[tuple[Update, float]]] = {}
+        self._workers: dict[Hashable, asyncio.Task] = {}
+        self._seen: OrderedDict[int, None] = OrderedDict()
+        self._pending = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def is_duplicate(self, update_id: int) -> bool:
+        return update_id in self._seen
+
+    def submit(self, update: Update) -> bool:
+        """
+        Queue an update. Returns False if it was already accepted before.
+
+        Raises OverflowError when `max_pending` updates are already queued.
+        """
+        if self.is_duplicate(update.update_id):
+            return False
+        if self._pending >= self.max_pending:
+            raise OverflowError("Update queue is full.")
+
+        self._seen[update.update_id] = None
+        while len(self._seen) > self.dedup_size:
+            self._seen.popitem(last=False)
+
+        key = ordering_key(update)
+        self._queues.setdefault(key, deque()).append((update, time.monotonic()))
+        self._pending += 1
+        self._idle.clear()
+        UPDATES_PENDING.set(self._pending)
+        if key not in self._workers:
+            self._workers[key] = asyncio.create_task(self._drain(key))
+        return True
+
+    async def _drain(self, key: Hashable) -> None:
+        queue = self._queues[key]
+        try:
+            while queue:
+                update, received_at = queue[0]
+                async with self._semaphore:
+                    try:
+                        await self.dispatcher.feed_update(self.bot, update)
+                    except Exception:
+                        logger.exception("Failed to process update %s", update.update_id)
+                queue.popleft()
+                self._pending -= 1
+                UPDATES_PENDING.set(self._pending)
+                UPDATE_LATENCY.observe(time.monotonic() - received_at)
+        finally:
+            self._queues.pop(key, None)
+            self._workers.pop(key, None)
+            if not self._workers:
+                self._idle.set()
+
+    async def join(self) -> None:
+        """
+        Wait until every accepted update has been processed.
+        """
+        await self._idle.wait()
+
+    async def stop(self, drain_timeout: float = 10.0) -> None:
+        try:
+            await asyncio.wait_for(self.join(), timeout=drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Dropping %s unprocessed updates on shutdown.", self._pending)
+            for task in list(self._workers.values()):
+                task.cancel()
+            await asyncio.gather(*self._workers.values(), return_exceptions=True)
+
+
+def create_webhook_app(processor: UpdateProcessor, *, path: str, secret_token: str) -> Starlette:
+    """
+    Build the ASGI app that receives Telegram webhook calls on `path`.
+    """
+
+    async def receive_update(request: Request) -> Response:
+        # Header values are decoded as latin-1; compare the raw bytes, since
+        # compare_digest rejects non-ASCII str with TypeError.
+        supplied = request.headers.get(SECRET_HEADER, "").encode("latin-1")
+        if not hmac.compare_digest(supplied, secret_token.encode()):
+            WEBHOOK_UPDATES.inc(result="rejected")
+            return JSONResponse({"detail": "Invalid secret token."}, status_code=403)
+
+        try:
+            payload: Any = await request.json()
+            update = Update.model_validate(payload, context={"bot": processor.bot})
+        except ValueError:
+            WEBHOOK_UPDATES.inc(result="invalid")
+            # 2xx so Telegram does not keep redelivering an update we cannot parse.
+            return JSONResponse({"ok": False, "detail": "Malformed update."})
+
+        try:
+            accepted = processor.submit(update)
+        except OverflowError:
+            WEBHOOK_UPDATES.inc(result="overloaded")
+            return JSONResponse(
+                {"detail": "Overloaded."},
+                status_code=503,
+                headers={"Retry-After": "1"},
+            )
+
+        WEBHOOK_UPDATES.inc(result="accepted" if accepted else "duplicate")
+        return JSONResponse({"ok": True})
+
+    async def health(_: Request) -> Response:
+        return JSONResponse({"status": "ok", "pending": processor.pending})
+
+    return Starlette(
+        routes=[
+            Route(path, receive_update, methods=["POST"]),
+            Route("/health", health, methods=["GET"]),
+        ]
+    )
@@ -0,0 +1 @@
+"""Process-local metrics shared by the bot and the admin API."""
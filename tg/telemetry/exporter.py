@@ -0,0 +1,48 @@
+"""Standalone HTTP exporter serving the metrics registry (used by the bot)."""
+
+from __future__ import annotations
+
+import logging
+
+from aiohttp import web
+
+from telemetry.metrics import CONTENT_TYPE, REGISTRY, Registry
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsExporter:
+    """
+    Serve `GET /metrics` from a small aiohttp app on its own port.
+
+    The API exposes `/metrics` itself; the bot has no HTTP server in polling
+    mode, so it runs one of these next to the dispatcher.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 9101, registry: Registry = REGISTRY) -> None:
+        self.host = host
+        self.port = port
+        self.registry = registry
+        self._runner: web.AppRunner | None = None
+
+    async def _metrics(self, _: web.Request) -> web.Response:
+        return web.Response(
+            body=self.registry.render().encode("utf-8"),
+            headers={"Content-Type": CONTENT_TYPE},
+        )
+
+    async def start(self) -> None:
+        if self._runner is not None:
+            return
+        app = web.Application()
+        app.router.add_get("/metrics", self._metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        logger.info("Metrics exporter listening on %s:%s", self.host, self.port)
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
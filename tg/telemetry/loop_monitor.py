@@ -0,0 +1,130 @@
+"""
+Event-loop lag monitor and blocking-call detector.
+
+A small task sleeps for `interval` seconds in a loop and records how late it
+wakes up: that delay is the time every other coroutine had to wait for the
+loop. With `capture_stacks` a watchdog thread also watches the task's
+heartbeat and, when the loop has been stuck longer than `block_threshold`,
+logs the stack of the event-loop thread while it is still blocked, which
+names the offending call (bcrypt, sync sqlite3, a heavy regex...).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+
+from telemetry.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+LOOP_LAG_SECONDS = REGISTRY.histogram(
+    "event_loop_lag_seconds",
+    "Delay between a scheduled event-loop wakeup and when it actually ran.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+LOOP_LAG_LAST = REGISTRY.gauge(
+    "event_loop_lag_last_seconds",
+    "Most recent event-loop lag measurement.",
+)
+LOOP_BLOCKED = REGISTRY.counter(
+    "event_loop_blocked_total",
+    "Times the event loop was blocked longer than the configured threshold.",
+)
+LOOP_STACK_CAPTURES = REGISTRY.counter(
+    "event_loop_stack_captures_total",
+    "Stacks captured by the watchdog while the event loop was blocked.",
+)
+
+STACK_LIMIT = 30
+
+
+class LoopLagMonitor:
+    def __init__(
+        self,
+        *,
+        interval: float = 0.25,
+        block_threshold: float = 0.1,
+        capture_stacks: bool = False,
+    ) -> None:
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self.capture_stacks = capture_stacks
+        self.last_stack: str | None = None
+        self._task: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopping = threading.Event()
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: int | None = None
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._run(), name="loop-lag-monitor")
+        if self.capture_stacks:
+            self._watchdog = threading.Thread(
+                target=self._watch,
+                name="loop-watchdog",
+                daemon=True,
+            )
+            self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join, self.interval + self.block_threshold)
+            self._watchdog = None
+
+    async def _run(self) -> None:
+        while True:
+            scheduled = time.monotonic()
+            self._heartbeat = scheduled
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - scheduled - self.interval)
+            LOOP_LAG_SECONDS.observe(lag)
+            LOOP_LAG_LAST.set(lag)
+            if lag >= self.block_threshold:
+                LOOP_BLOCKED.inc()
+                logger.warning("Event loop was blocked for %.0f ms.", lag * 1000)
+
+    def _watch(self) -> None:
+        # The heartbeat is refreshed every `interval`; anything past
+        # interval + threshold means the loop thread is stuck right now.
+        poll = max(0.01, min(self.interval, self.block_threshold) / 2)
+        captured_for: float | None = None
+        while not self._stopping.wait(poll):
+            heartbeat = self._heartbeat
+            stalled = time.monotonic() - heartbeat - self.interval
+            if stalled < self.block_threshold or captured_for == heartbeat:
+                continue
+            captured_for = heartbeat
+            stack = self._loop_stack()
+            if stack is None:
+                continue
+            self.last_stack = stack
+            LOOP_STACK_CAPTURES.inc()
+            logger.warning(
+                "Event loop blocked for over %.0f ms, loop thread stack:\n%s",
+                stalled * 1000,
+                stack,
+            )
+
+    def _loop_stack(self) -> str | None:
+        frame = sys._current_frames().get(self._loop_thread_id)  # noqa: SLF001
+        if frame is None:
+            return None
+        return "".join(traceback.format_stack(frame, limit=STACK_LIMIT))
@@ -0,0 +1,216 @@
+"""
+Memory metrics and tracemalloc-based leak hunting for long-running processes.
+
+`register_process_metrics()` exports RSS and allocator counters on every
+scrape. `MemoryTracker` is the on-demand part: the first `capture()` starts
+tracemalloc (it has a cost, so it is off until asked for), every following
+call reports the top allocation sites and the growth since the previous
+capture. Growth that keeps showing up at the same line across captures is
+the leak.
+
+The API exposes this at `/api/debug/memory`; the bot on SIGUSR1.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gc
+import linecache
+import logging
+import os
+import signal
+import sys
+import time
+import tracemalloc
+from typing import Any
+
+from telemetry.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+PROCESS_RSS = REGISTRY.gauge(
+    "process_resident_memory_bytes",
+    "Resident set size of the process.",
+)
+ALLOCATED_BLOCKS = REGISTRY.gauge(
+    "python_allocated_blocks",
+    "Memory blocks currently allocated by the Python allocator.",
+)
+GC_TRACKED_OBJECTS = REGISTRY.gauge(
+    "python_gc_generation_objects",
+    "Objects waiting in each garbage collector generation.",
+    ("generation",),
+)
+TRACED_BYTES = REGISTRY.gauge(
+    "python_tracemalloc_traced_bytes",
+    "Memory traced by tracemalloc (0 while tracing is off).",
+)
+
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, linecache.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def rss_bytes() -> int:
+    """
+    Current RSS from /proc; peak RSS from getrusage where /proc is missing;
+    0 where neither exists (Windows).
+    """
+    try:
+        with open("/proc/self/statm", "rb") as statm:
+            pages = int(statm.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def register_process_metrics() -> None:
+    PROCESS_RSS.set_function(rss_bytes)
+    ALLOCATED_BLOCKS.set_function(sys.getallocatedblocks)
+    for generation in range(3):
+        GC_TRACKED_OBJECTS.set_function(
+            lambda generation=generation: gc.get_count()[generation],
+            generation=str(generation),
+        )
+    TRACED_BYTES.set_function(
+        lambda: tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+    )
+
+
+def _site(frame: tracemalloc.Frame) -> str:
+    return f"{frame.filename}:{frame.lineno}"
+
+
+class MemoryTracker:
+    def __init__(self, *, frames: int = 10) -> None:
+        self.frames = frames
+        self._previous: tracemalloc.Snapshot | None = None
+        self._previous_at: float | None = None
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def stop(self) -> None:
+        self._previous = None
+        self._previous_at = None
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def capture(self, limit: int = 20) -> dict[str, Any]:
+        """
+        Take a snapshot and report top sites and growth since the last capture.
+
+        CPU-heavy on large heaps; call through `capture_async` from a loop.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._previous = None
+
+        snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        now = time.time()
+        current, peak = tracemalloc.get_traced_memory()
+
+        report: dict[str, Any] = {
+            "rss_bytes": rss_bytes(),
+            "traced_bytes": current,
+            "traced_peak_bytes": peak,
+            "allocated_blocks": sys.getallocatedblocks(),
+            "top": [
+                {
+                    "site": _site(stat.traceback[0]),
+                    "size_bytes": stat.size,
+                    "count": stat.count,
+                    "traceback": [_site(frame) for frame in stat.traceback],
+                }
+                for stat in snapshot.statistics("traceback")[:limit]
+            ],
+            "growth": [],
+            "interval_seconds": None,
+        }
+        if self._previous is not None and self._previous_at is not None:
+            report["interval_seconds"] = round(now - self._previous_at, 3)
+            report["growth"] = [
+                {
+                    "site": _site(stat.traceback[0]),
+                    "size_diff_bytes": stat.size_diff,
+                    "count_diff": stat.count_diff,
+                    "size_bytes": stat.size,
+                }
+                for stat in snapshot.compare_to(self._previous, "lineno")[:limit]
+                if stat.size_diff > 0
+            ]
+
+        self._previous = snapshot
+        self._previous_at = now
+        return report
+
+    async def capture_async(self, limit: int = 20) -> dict[str, Any]:
+        return await asyncio.to_thread(self.capture, limit)
+
+
+def format_report(report: dict[str, Any], limit: int = 10) -> str:
+    """
+    Render a capture for the log.
+    """
+    lines = [
+        f"RSS {report['rss_bytes'] / 2**20:.1f} MiB, traced {report['traced_bytes'] / 2**20:.1f} MiB "
+        f"(peak {report['traced_peak_bytes'] / 2**20:.1f} MiB), blocks {report['allocated_blocks']}",
+    ]
+    if report["interval_seconds"] is None:
+        lines.append("Baseline captured; the next capture reports growth.")
+    else:
+        lines.append(f"Growth over {report['interval_seconds']:.0f}s:")
+        lines.extend(
+            f"  +{item['size_diff_bytes'] / 1024:.1f} KiB ({item['count_diff']:+d} blocks) {item['site']}"
+            for item in report["growth"][:limit]
+        )
+    lines.append("Top allocation sites:")
+    lines.extend(
+        f"  {item['size_bytes'] / 1024:.1f} KiB in {item['count']} blocks {item['site']}"
+        for item in report["top"][:limit]
+    )
+    return "\n".join(lines)
+
+
+def install_signal_handlers(tracker: MemoryTracker, *, limit: int = 20) -> bool:
+    """
+    SIGUSR1 logs a capture (the first one starts tracing), SIGUSR2 stops
+    tracing. Returns False where the loop cannot handle signals (Windows).
+    """
+    loop = asyncio.get_running_loop()
+    tasks: set[asyncio.Task] = set()
+
+    async def _capture() -> None:
+        try:
+            report = await tracker.capture_async(limit)
+        except Exception:
+            logger.exception("Memory capture failed.")
+            return
+        logger.warning("Memory capture:\n%s", format_report(report, limit))
+
+    def _on_capture() -> None:
+        task = loop.create_task(_capture(), name="memory-capture")
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    def _on_stop() -> None:
+        tracker.stop()
+        logger.warning("tracemalloc stopped.")
+
+    try:
+        loop.add_signal_handler(signal.SIGUSR1, _on_capture)
+        loop.add_signal_handler(signal.SIGUSR2, _on_stop)
+    except (NotImplementedError, AttributeError):
+        return False
+    return True
@@ -0,0 +1,134 @@
+"""
+On-demand CPU profiling of a running process.
+
+Two session kinds, both observing the event-loop thread across live traffic:
+
+- `profile_cprofile`: deterministic cProfile; result is a marshalled stats
+  dump loadable with `pstats.Stats(path)` or snakeviz. Adds overhead to every
+  call while it runs.
+- `profile_sampled`: a helper thread samples the loop thread's stack every
+  `interval` seconds; result is speedscope JSON (https://www.speedscope.app).
+  Cheap enough for production.
+
+`ProfileSessions` caps how many sessions run at once; cProfile sessions are
+always exclusive because one thread can only have one profile hook.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import marshal
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+KIND_CPROFILE = "cprofile"
+KIND_SAMPLED = "sampled"
+
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+_FrameKey = tuple[str, str, int]
+
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when the session cap is reached."""
+
+
+class ProfileSessions:
+    def __init__(self, max_concurrent: int = 1) -> None:
+        self.max_concurrent = max(1, max_concurrent)
+        self._active: Counter[str] = Counter()
+
+    @property
+    def active(self) -> int:
+        return sum(self._active.values())
+
+    @contextmanager
+    def session(self, kind: str) -> Iterator[None]:
+        # Only called from the event loop, so plain counters are race-free.
+        if self.active >= self.max_concurrent:
+            raise ProfilerBusyError("Too many profiling sessions are running.")
+        if kind == KIND_CPROFILE and self._active[KIND_CPROFILE]:
+            raise ProfilerBusyError("A cProfile session is already running.")
+        self._active[kind] += 1
+        try:
+            yield
+        finally:
+            self._active[kind] -= 1
+
+
+async def profile_cprofile(seconds: float) -> bytes:
+    """
+    Profile the calling (event-loop) thread for `seconds`; returns pstats data.
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profiler.disable()
+    profiler.create_stats()
+    return marshal.dumps(profiler.stats)  # same format as Profile.dump_stats()
+
+
+def _sample(thread_id: int, seconds: float, interval: float) -> tuple[Counter[tuple[_FrameKey, ...]], float]:
+    stacks: Counter[tuple[_FrameKey, ...]] = Counter()
+    started = time.perf_counter()
+    deadline = started + seconds
+    while time.perf_counter() < deadline:
+        frame = sys._current_frames().get(thread_id)  # noqa: SLF001
+        stack: list[_FrameKey] = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+            frame = frame.f_back
+        if stack:
+            stacks[tuple(reversed(stack))] += 1
+        time.sleep(interval)
+    return stacks, time.perf_counter() - started
+
+
+async def profile_sampled(seconds: float, interval: float = 0.005, *, name: str = "profile") -> dict[str, Any]:
+    """
+    Sample the calling (event-loop) thread for `seconds`; returns speedscope JSON.
+    """
+    thread_id = threading.get_ident()
+    stacks, elapsed = await asyncio.to_thread(_sample, thread_id, seconds, interval)
+
+    frame_index: dict[_FrameKey, int] = {}
+    frames: list[dict[str, Any]] = []
+    samples: list[list[int]] = []
+    weights: list[float] = []
+    for stack, count in stacks.items():
+        indices = []
+        for key in stack:
+            index = frame_index.get(key)
+            if index is None:
+                index = frame_index[key] = len(frames)
+                frames.append({"name": key[0], "file": key[1], "line": key[2]})
+            indices.append(index)
+        samples.append(indices)
+        weights.append(count * interval)
+
+    return {
+        "$schema": SPEEDSCOPE_SCHEMA,
+        "name": name,
+        "exporter": "courier-platform",
+        "shared": {"frames": frames},
+        "profiles": [
+            {
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": round(elapsed, 6),
+                "samples": samples,
+                "weights": weights,
+            }
+        ],
+    }
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+TG_DIR = Path(__file__).resolve().parents[1]
+
+if str(TG_DIR) not in sys.path:
+    sys.path.insert(0, str(TG_DIR))
+
+# Packages that read DB_PATH and other settings at import time; they are
+# imported again by every test that points them at a fresh database.
+RELOADED_PACKAGES = ("database", "api", "migrations", "reconciliation", "services", "handlers")
+
+
+def forget_project_modules() -> None:
+    for module_name in list(sys.modules):
+        if module_name.split(".", 1)[0] in RELOADED_PACKAGES:
+            sys.modules.pop(module_name, None)
+
+
+@pytest.fixture()
+def db_env() -> dict[str, str]:
+    """Extra environment for the modules under test; override in a test module."""
+    return {}
+
+
+@pytest.fixture()
+def db_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, db_env: dict[str, str]) -> Path:
+    path = tmp_path / "applications.db"
+    monkeypatch.setenv("DB_PATH", str(path))
+    for name, value in db_env.items():
+        monkeypatch.setenv(name, value)
+    forget_project_modules()
+    return path
+
+
+@pytest.fixture()
+def db_module(db_path: Path):
+    """`database.db` bound to an empty database created by `init_db`, as the bot starts."""
+    db = importlib.import_module("database.db")
+    asyncio.run(db.init_db())
+    yield db
+    db.data_version_probe.close()
+
+
+@pytest.fixture()
+def migrated_db(db_path: Path) -> Path:
+    """An empty database with every migration applied, as the API starts."""
+    from migrations.runner import migrate_to_latest
+
+    with sqlite3.connect(db_path) as conn:
+        migrate_to_latest(conn)
+    return db_path
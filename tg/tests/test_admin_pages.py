@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+import sqlite3
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.methods import EditMessageText
+
+
+@pytest.fixture()
+def db_env() -> dict[str, str]:
+    return {"BOT_TOKEN": "123456:test-token", "ADMIN_ID": "1"}
+
+
+@pytest.fixture()
+def admin(migrated_db: Path, db_module, db_path: Path):
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany(
+            """
+            INSERT INTO applications (telegram_id, first_name, phone, age, citizenship, submitted_at)
+            VALUES (?, 'Ivan', '+79990000000', 25, 'RU', datetime('now'))
+            """,
+            [(index,) for index in range(1, 24)],
+        )
+    return importlib.import_module("handlers.admin")
+
+
+class FakeMessage:
+    def __init__(self, fail_with: str | None = None) -> None:
+        self.edits: list[tuple[str, object]] = []
+        self.fail_with = fail_with
+
+    async def edit_text(self, text: str, reply_markup=None) -> None:
+        if self.fail_with:
+            raise TelegramBadRequest(method=EditMessageText(text=text), message=self.fail_with)
+        self.edits.append((text, reply_markup))
+
+
+class FakeCallback:
+    def __init__(self, user_id: int, data: str, message: FakeMessage) -> None:
+        self.from_user = SimpleNamespace(id=user_id)
+        self.data = data
+        self.message = message
+        self.answers: list[str | None] = []
+
+    async def answer(self, text: str | None = None, show_alert: bool = False) -> None:
+        self.answers.append(text)
+
+
+def _callbacks(markup) -> list[list[str]]:
+    return [[button.callback_data for button in row] for row in markup.inline_keyboard]
+
+
+def test_pages_are_clamped_and_navigation_stops_at_the_ends(admin) -> None:
+    async def scenario() -> tuple:
+        return await admin._build_page(1), await admin._build_page(3), await admin._build_page(99)
+
+    first, last, beyond = asyncio.run(scenario())
+
+    assert first.page == 1 and "стр. 1/3" in first.text and "(всего 23" in first.text
+    assert first.text.count("<b>#") == admin.PAGE_SIZE and "<b>#23</b>" in first.text
+    assert _callbacks(first.reply_markup)[-1] == ["apps:page:1", "apps:page:2"]
+
+    assert last.page == 3 and last.text.count("<b>#") == 3 and "<b>#1</b>" in last.text
+    assert _callbacks(last.reply_markup)[-1] == ["apps:page:2", "apps:page:3"]
+    contact_rows = _callbacks(last.reply_markup)[:-1]
+    assert contact_rows == [["apps:contacted:3:3", "apps:contacted:2:3", "apps:contacted:1:3"]]
+
+    assert beyond.page == 3 and beyond.text == last.text
+
+
+def test_page_cache_is_reused_until_applications_change(admin, db_path: Path) -> None:
+    async def scenario() -> None:
+        first = await admin._build_page(2)
+        assert await admin._build_page(2) is first
+
+        # Commits to other tables, like the FSM storage flush, keep the page.
+        with sqlite3.connect(db_path) as conn:
+            conn.execute(
+                "INSERT INTO fsm_storage (key, state, data, updated_at) VALUES ('k', 'Form:phone', '{}', 0)"
+            )
+        assert await admin._build_page(2) is first
+
+        # Committed by another connection, as the bot's or API's writers do.
+        with sqlite3.connect(db_path) as conn:
+            conn.execute(
+                """
+                INSERT INTO applications (telegram_id, phone, age, citizenship, submitted_at)
+                VALUES (24, '+79990000000', 25, 'RU', datetime('now'))
+                """
+            )
+        refreshed = await admin._build_page(2)
+        assert refreshed is not first
+        assert refreshed.version != first.version
+        assert "(всего 24" in refreshed.text
+
+    asyncio.run(scenario())
+
+    cache = admin.PageCache(max_pages=2)
+    for page in (1, 2, 3):
+        cache.put(page, admin._RenderedPage((7, 0), page, str(page), None))
+    assert cache.get(1, (7, 0)) is None and cache.get(3, (7, 0)).text == "3"
+    assert cache.get(3, (8, 0)) is None
+
+
+def test_callbacks_edit_the_page_message_in_place(admin, db_path: Path) -> None:
+    async def scenario() -> None:
+        message = FakeMessage()
+        navigate = FakeCallback(admin.ADMIN_ID, "apps:page:2", message)
+        await admin.cb_applications_page(navigate)
+        assert len(message.edits) == 1 and "стр. 2/3" in message.edits[0][0]
+        assert navigate.answers == [None]
+
+        contacted = FakeCallback(admin.ADMIN_ID, "apps:contacted:13:2", message)
+        await admin.cb_applications_contacted(contacted)
+        text, markup = message.edits[-1]
+        assert "✅ <b>#13</b>" in text and "apps:contacted:13:2" not in sum(_callbacks(markup), [])
+        assert contacted.answers == ["✅ Статус обновлён: Связался."]
+
+        # Refreshing an unchanged page is not an error.
+        unchanged = FakeMessage(fail_with="Bad Request: message is not modified")
+        refresh = FakeCallback(admin.ADMIN_ID, "apps:page:2", unchanged)
+        await admin.cb_applications_page(refresh)
+        assert refresh.answers == [None]
+
+        stranger = FakeCallback(admin.ADMIN_ID + 1, "apps:page:1", message)
+        await admin.cb_applications_page(stranger)
+        assert len(message.edits) == 2 and stranger.answers == ["⛔ Только для администратора."]
+
+    asyncio.run(scenario())
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT contacted FROM applications WHERE id = 13").fetchone() == (1,)
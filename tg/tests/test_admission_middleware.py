@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+
+from aiogram.types import Update, User
+
+TG_DIR = Path(__file__).resolve().parents[1]
+if str(TG_DIR) not in sys.path:
+    sys.path.insert(0, str(TG_DIR))
+
+from middlewares.admission import AdmissionMiddleware  # noqa: E402
+
+
+def _message_update(update_id: int, user_id: int, text: str) -> Update:
+    return Update.model_validate(
+        {
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id,
+                "date": 0,
+                "chat": {"id": user_id, "type": "private"},
+                "from": {"id": user_id, "is_bot": False, "first_name": "U"},
+                "text": text,
+            },
+        }
+    )
+
+
+def _user(user_id: int) -> User:
+    return User(id=user_id, is_bot=False, first_name="U")
+
+
+def test_admission_debounces_start_and_serializes_per_user() -> None:
+    async def scenario() -> tuple[list[str], int]:
+        middleware = AdmissionMiddleware(max_in_flight=2, debounce_seconds=60)
+        handled: list[str] = []
+        running = 0
+        peak = 0
+
+        async def handler(event: Update, data: dict) -> None:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02 if event.message.text == "first" else 0)
+            handled.append(f"{event.message.chat.id}:{event.message.text}")
+            running -= 1
+
+        updates = [
+            _message_update(1, 7, "/start camp_1"),
+            _message_update(2, 7, "/start camp_1"),
+            _message_update(3, 7, "first"),
+            _message_update(4, 7, "second"),
+            _message_update(5, 8, "a"),
+            _message_update(6, 9, "b"),
+        ]
+        await asyncio.gather(
+            *(
+                middleware(handler, update, {"event_from_user": _user(update.message.chat.id)})
+                for update in updates
+            )
+        )
+        return handled, peak
+
+    handled, peak = asyncio.run(scenario())
+    assert handled.count("7:/start camp_1") == 1
+    user_7 = [item for item in handled if item.startswith("7:")]
+    assert user_7 == ["7:/start camp_1", "7:first", "7:second"]
+    assert sorted(handled) == sorted(user_7 + ["8:a", "9:b"])
+    assert peak <= 2
+
+
+def test_admission_without_sequencing_only_debounces() -> None:
+    async def scenario() -> tuple[list[str], int]:
+        # Webhook mode: UpdateProcessor orders and bounds updates upstream.
+        middleware = AdmissionMiddleware(max_in_flight=1, debounce_seconds=60, sequence=False)
+        handled: list[str] = []
+        running = 0
+        peak = 0
+
+        async def handler(event: Update, data: dict) -> None:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            handled.append(event.message.text)
+            running -= 1
+
+        updates = [
+            _message_update(1, 7, "/start"),
+            _message_update(2, 7, "/start"),
+            _message_update(3, 8, "a"),
+            _message_update(4, 9, "b"),
+        ]
+        await asyncio.gather(
+            *(
+                middleware(handler, update, {"event_from_user": _user(update.message.chat.id)})
+                for update in updates
+            )
+        )
+        return handled, peak
+
+    handled, peak = asyncio.run(scenario())
+    assert sorted(handled) == ["/start", "a", "b"]
+    assert peak == 3
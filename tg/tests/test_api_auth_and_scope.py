@@ -1,7 +1,10 @@
 ﻿from __future__ import annotations
 
+import asyncio
+import marshal
 import sqlite3
-import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
@@ -10,25 +13,14 @@ from fastapi.testclient import TestClient
 
 
 @pytest.fixture()
-def client(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
-    db_path = tmp_path / "applications.db"
-
-    monkeypatch.setenv("DB_PATH", str(db_path))
+def client(db_path: Path, monkeypatch: pytest.MonkeyPatch):
     monkeypatch.setenv("API_AUTO_MIGRATE", "true")
     monkeypatch.setenv("API_JWT_SECRET", "test-secret-key-which-is-at-least-32-bytes")
     monkeypatch.setenv("API_JWT_ALGORITHM", "HS256")
     monkeypatch.setenv("ADMIN_BOOTSTRAP_LOGIN", "admin")
     monkeypatch.setenv("ADMIN_BOOTSTRAP_PASSWORD", "admin_pass_123")
     monkeypatch.setenv("ADMIN_BOOTSTRAP_NAME", "Admin User")
-
-    tg_dir = Path(__file__).resolve().parents[1]
-    tg_dir_str = str(tg_dir)
-    if tg_dir_str not in sys.path:
-        sys.path.insert(0, tg_dir_str)
-
-    for module_name in list(sys.modules):
-        if module_name == "database.db" or module_name.startswith("api.") or module_name.startswith("migrations."):
-            sys.modules.pop(module_name, None)
+    monkeypatch.setenv("API_QUERY_COUNT_HEADER", "true")
 
     from api.app import create_app
 
@@ -168,3 +160,395 @@ def test_investor_ownership_scope(client):
         json={"status": "rejected", "revenue": 100},
     )
     assert forbidden_update.status_code in {403, 404}
+
+
+def test_funnel_stats_reads_rollups_with_scope(client):
+    test_client, db_path = client
+
+    admin_headers = auth_headers(login(test_client, "admin", "admin_pass_123")["access_token"])
+    investor = test_client.post(
+        "/api/users",
+        headers=admin_headers,
+        json={
+            "login": "investor1",
+            "password": "investor_pass_1",
+            "name": "Investor One",
+            "role": "investor",
+            "percent": 30,
+        },
+    )
+    assert investor.status_code == 201, investor.text
+    campaign = test_client.post(
+        "/api/campaigns",
+        headers=admin_headers,
+        json={"investor_id": investor.json()["id"], "name": "Spring", "budget": 1000},
+    )
+    assert campaign.status_code == 201, campaign.text
+    campaign_id = campaign.json()["id"]
+
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany(
+            "INSERT INTO funnel_stats (campaign_id, step, bucket, count) VALUES (?, ?, ?, ?)",
+            [
+                (campaign_id, "start", "2026-03-01 10:00", 8),
+                (campaign_id, "start", "2026-03-01 10:01", 2),
+                (campaign_id, "start_test", "2026-03-01 10:01", 5),
+                (campaign_id, "submitted", "2026-03-02 09:00", 1),
+                (campaign_id, "rejected_age", "2026-03-01 10:05", 1),
+                (0, "start", "2026-03-01 10:00", 100),
+            ],
+        )
+
+    investor_headers = auth_headers(login(test_client, "investor1", "investor_pass_1")["access_token"])
+    response = test_client.get("/api/stats/funnel", headers=investor_headers)
+    assert response.status_code == 200, response.text
+    body = response.json()
+    steps = {item["step"]: item for item in body["steps"]}
+    assert steps["start"]["count"] == 10
+    assert steps["start_test"]["conversion"] == 50.0
+    assert body["rejections"] == {"rejected_age": 1}
+
+    day = test_client.get(
+        "/api/stats/funnel",
+        headers=admin_headers,
+        params={"campaign_id": campaign_id, "date_from": "2026-03-01", "date_to": "2026-03-01"},
+    )
+    assert day.status_code == 200, day.text
+    assert {item["step"]: item["count"] for item in day.json()["steps"]}["submitted"] == 0
+
+    all_traffic = test_client.get("/api/stats/funnel", headers=admin_headers)
+    assert all_traffic.json()["steps"][0]["count"] == 110
+
+
+@pytest.mark.parametrize("db_env", [{"API_METRICS_TOKEN": "metrics-token"}])
+def test_metrics_token_is_required_and_odd_headers_are_rejected(client):
+    test_client, _ = client
+
+    assert test_client.get("/metrics").status_code == 401
+    assert test_client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    non_ascii = {"Authorization": "Bearer токен".encode()}
+    assert test_client.get("/metrics", headers=non_ascii).status_code == 401
+    assert test_client.get("/metrics", headers={"Authorization": "Bearer metrics-token"}).status_code == 200
+
+
+def test_metrics_endpoint_labels_requests_by_route_template(client):
+    test_client, _ = client
+
+    headers = auth_headers(login(test_client, "admin", "admin_pass_123")["access_token"])
+    assert test_client.get("/api/stats/campaign/999999", headers=headers).status_code == 404
+
+    response = test_client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'http_requests_total{method="GET",route="/api/stats/campaign/{campaign_id}",status="404"}' in body
+    assert "http_request_duration_seconds_bucket" in body
+    assert "api_db_query_duration_seconds_count" in body
+    assert "/api/stats/campaign/999999" not in body
+
+
+def test_query_count_header_reports_statements_per_request(client):
+    test_client, _ = client
+
+    auth = login(test_client, "admin", "admin_pass_123")
+    response = test_client.get("/api/auth/me", headers=auth_headers(auth["access_token"]))
+
+    assert response.status_code == 200
+    count = int(response.headers["X-DB-Query-Count"])
+    assert 0 < count <= 5
+
+
+def test_profile_endpoint_is_admin_only_and_capped(client):
+    test_client, _ = client
+
+    assert test_client.post("/api/debug/profile?seconds=0.1").status_code == 401
+
+    headers = auth_headers(login(test_client, "admin", "admin_pass_123")["access_token"])
+    too_long = test_client.post("/api/debug/profile?seconds=3600", headers=headers)
+    assert too_long.status_code == 400
+
+    sampled = test_client.post("/api/debug/profile?seconds=0.2&interval_ms=2", headers=headers)
+    assert sampled.status_code == 200, sampled.text
+    report = sampled.json()
+    assert report["profiles"][0]["type"] == "sampled"
+    assert report["profiles"][0]["samples"]
+    assert report["shared"]["frames"]
+
+    stats = test_client.post("/api/debug/profile?seconds=0.1&format=pstats", headers=headers)
+    assert stats.status_code == 200
+    assert stats.headers["content-disposition"].endswith('.pstats"')
+    assert isinstance(marshal.loads(stats.content), dict)
+
+    # No database connection is held while the session runs.
+    from api.database import DB_SESSIONS_OPEN
+
+    idle = DB_SESSIONS_OPEN.value()
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        running = pool.submit(test_client.post, "/api/debug/profile?seconds=0.5", headers=headers)
+        time.sleep(0.25)
+        during = DB_SESSIONS_OPEN.value()
+        assert running.result().status_code == 200
+    assert during == idle
+
+
+def test_memory_capture_reports_growth_between_snapshots(client):
+    test_client, _ = client
+    headers = auth_headers(login(test_client, "admin", "admin_pass_123")["access_token"])
+
+    try:
+        baseline = test_client.post("/api/debug/memory", headers=headers)
+        assert baseline.status_code == 200, baseline.text
+        assert baseline.json()["interval_seconds"] is None
+
+        leak = [bytearray(1024) for _ in range(2000)]
+        second = test_client.post("/api/debug/memory?limit=50", headers=headers).json()
+        assert second["interval_seconds"] is not None
+        assert second["traced_bytes"] >= 2000 * 1024
+        assert any("test_api_auth_and_scope.py" in item["site"] for item in second["growth"])
+        del leak
+    finally:
+        assert test_client.delete("/api/debug/memory", headers=headers).status_code == 204
+
+    metrics = test_client.get("/metrics").text
+    assert "process_resident_memory_bytes" in metrics
+    assert "python_tracemalloc_traced_bytes 0" in metrics
+
+
+def _insert_applications(db_path: Path, campaign_ids: list[int | None]) -> list[int]:
+    with sqlite3.connect(db_path) as conn:
+        return [
+            conn.execute(
+                """
+                INSERT INTO applications (telegram_id, phone, age, citizenship, submitted_at, campaign_id)
+                VALUES (?, '+79990000000', 25, 'RU', datetime('now'), ?)
+                """,
+                (index + 1, campaign_id),
+            ).lastrowid
+            for index, campaign_id in enumerate(campaign_ids)
+        ]
+
+
+def test_application_changes_are_published_to_stream_subscribers(client):
+    test_client, db_path = client
+    from api.events import application_events
+
+    assert test_client.get("/api/applications/stream").status_code == 401
+
+    headers = auth_headers(login(test_client, "admin", "admin_pass_123")["access_token"])
+    subscription = application_events.subscribe(None)
+
+    def next_event():
+        # Published by the watcher running on the app's event loop.
+        deadline = time.monotonic() + 5
+        while subscription.queue.empty() and time.monotonic() < deadline:
+            time.sleep(0.02)
+        return subscription.queue.get_nowait()
+
+    try:
+        # Inserted by another connection, as the bot does.
+        (application_id,) = _insert_applications(db_path, [None])
+        created = next_event()
+        response = test_client.put(
+            f"/api/applications/{application_id}",
+            headers=headers,
+            json={"status": "approved"},
+        )
+        assert response.status_code == 200, response.text
+        updated = next_event()
+    finally:
+        application_events.unsubscribe(subscription)
+
+    assert (created.kind, created.data["id"]) == ("application.created", application_id)
+    assert updated.kind == "application.updated"
+    assert updated.event_id == response.json()["row_version"] > created.event_id
+    assert updated.data["status"] == "approved"
+
+
+def test_stream_url_takes_single_use_ticket_not_access_token(client):
+    test_client, _ = client
+    from api.config import settings
+    from api.events import application_events
+    from api.stream_tickets import stream_tickets
+
+    access_token = login(test_client, "admin", "admin_pass_123")["access_token"]
+    assert test_client.get(f"/api/applications/stream?access_token={access_token}").status_code == 401
+    assert test_client.post("/api/applications/stream/tickets").status_code == 401
+
+    response = test_client.post("/api/applications/stream/tickets", headers=auth_headers(access_token))
+    assert response.status_code == 200, response.text
+    ticket = response.json()["ticket"]
+    assert response.json()["expires_in"] == settings.stream_ticket_ttl_seconds
+
+    # A client turned away for capacity keeps its ticket.
+    held = [application_events.subscribe(None) for _ in range(settings.stream_max_clients)]
+    try:
+        assert test_client.get(f"/api/applications/stream?ticket={ticket}").status_code == 503
+        assert test_client.get(f"/api/applications/stream?ticket={ticket}").status_code == 503
+    finally:
+        for subscription in held:
+            application_events.unsubscribe(subscription)
+    # Redeemed directly: opening the stream in the test client never returns.
+    assert stream_tickets.redeem(ticket) is not None
+    assert stream_tickets.redeem(ticket) is None
+
+
+def test_stream_route_reserves_its_slot_before_returning(client):
+    test_client, _ = client
+    from fastapi import HTTPException
+
+    from api.config import settings
+    from api.events import application_events
+    from api.routers.applications import stream_applications
+
+    user = {"id": 1, "role": "admin", "token_expires_at": time.time() + 60}
+    held = [application_events.subscribe(None) for _ in range(settings.stream_max_clients - 1)]
+
+    async def open_twice() -> None:
+        # Both opens pass authentication before either stream starts iterating.
+        await stream_applications(current_user=user)
+        assert application_events.subscriber_count == settings.stream_max_clients
+        with pytest.raises(HTTPException) as rejected:
+            await stream_applications(current_user=user)
+        assert rejected.value.status_code == 503
+
+    try:
+        asyncio.run(open_twice())
+    finally:
+        for subscription in tuple(application_events._subscribers):
+            application_events.unsubscribe(subscription)
+
+
+def test_changes_feed_pages_by_row_version_within_scope(client):
+    test_client, db_path = client
+    admin_headers = auth_headers(login(test_client, "admin", "admin_pass_123")["access_token"])
+
+    investor = test_client.post(
+        "/api/users",
+        headers=admin_headers,
+        json={"login": "investor1", "password": "investor_pass_1", "name": "Investor One", "role": "investor", "percent": 30},
+    ).json()
+    campaign = test_client.post(
+        "/api/campaigns",
+        headers=admin_headers,
+        json={"investor_id": investor["id"], "name": "Campaign A", "budget": 1000, "status": "active"},
+    ).json()
+    first, _, third = _insert_applications(db_path, [campaign["id"], None, campaign["id"]])
+
+    page = test_client.get("/api/applications/changes?since=0&limit=2", headers=admin_headers).json()
+    assert [item["id"] for item in page["items"]] == [1, 2]
+    assert page["has_more"] is True
+    page = test_client.get(f"/api/applications/changes?since={page['next_since']}", headers=admin_headers).json()
+    assert [item["id"] for item in page["items"]] == [third]
+    assert page["has_more"] is False
+    synced = page["next_since"]
+
+    updated = test_client.put(f"/api/applications/{first}", headers=admin_headers, json={"revenue": 100})
+    assert updated.json()["row_version"] > synced
+    assert updated.json()["updated_at"]
+
+    page = test_client.get(f"/api/applications/changes?since={synced}", headers=admin_headers).json()
+    assert [(item["id"], item["revenue"]) for item in page["items"]] == [(first, 100.0)]
+
+    investor_headers = auth_headers(login(test_client, "investor1", "investor_pass_1")["access_token"])
+    page = test_client.get("/api/applications/changes", headers=investor_headers).json()
+    assert [item["id"] for item in page["items"]] == [third, first]
+    assert page["next_since"] == updated.json()["row_version"]
+
+
+def test_bulk_update_checks_scope_per_item_in_constant_queries(client):
+    test_client, db_path = client
+    admin_headers = auth_headers(login(test_client, "admin", "admin_pass_123")["access_token"])
+
+    investor = test_client.post(
+        "/api/users",
+        headers=admin_headers,
+        json={"login": "investor1", "password": "investor_pass_1", "name": "Investor One", "role": "investor", "percent": 30},
+    ).json()
+    campaign = test_client.post(
+        "/api/campaigns",
+        headers=admin_headers,
+        json={"investor_id": investor["id"], "name": "Campaign A", "budget": 1000, "status": "active"},
+    ).json()
+    own_first, own_second, foreign, untouched = _insert_applications(
+        db_path, [campaign["id"], campaign["id"], None, campaign["id"]]
+    )
+
+    investor_headers = auth_headers(login(test_client, "investor1", "investor_pass_1")["access_token"])
+    response = test_client.patch(
+        "/api/applications",
+        headers=investor_headers,
+        json={
+            "items": [
+                {"id": own_first, "status": "approved", "revenue": 2500},
+                {"id": own_second, "revenue": 100},
+                {"id": foreign, "status": "rejected"},
+                {"id": 999999, "status": "rejected"},
+                {"id": own_first, "status": "rejected"},
+                {"id": untouched},
+            ]
+        },
+    )
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert (body["updated"], body["failed"]) == (2, 4)
+    assert [(r["id"], r["ok"], r["error"]) for r in body["results"]] == [
+        (own_first, True, None),
+        (own_second, True, None),
+        (foreign, False, "You cannot update this application."),
+        (999999, False, "Application not found."),
+        (own_first, False, "Duplicate id in request."),
+        (untouched, False, "No fields to update."),
+    ]
+    first, second = (r["application"] for r in body["results"][:2])
+    assert (first["status"], first["revenue"]) == ("approved", 2500.0)
+    assert (second["status"], second["revenue"]) == ("new", 100.0)
+
+    with sqlite3.connect(db_path) as conn:
+        row = conn.execute("SELECT COALESCE(status, 'new') FROM applications WHERE id = ?", (foreign,))
+        assert row.fetchone()[0] == "new"
+
+    many = _insert_applications(db_path, [None] * 50)
+    bulk = test_client.patch(
+        "/api/applications",
+        headers=admin_headers,
+        json={"items": [{"id": application_id, "revenue": 10} for application_id in many]},
+    )
+    assert bulk.json()["updated"] == 50
+    assert int(bulk.headers["X-DB-Query-Count"]) == int(response.headers["X-DB-Query-Count"])
+
+
+def test_csv_import_runs_in_background_with_progress(client):
+    test_client, db_path = client
+    access_token = login(test_client, "admin", "admin_pass_123")["access_token"]
+    headers = auth_headers(access_token)
+    first, second = _insert_applications(db_path, [None, None])
+
+    in_url = test_client.post(f"/api/applications/import?access_token={access_token}", content=b"id,status\n")
+    assert in_url.status_code == 401
+
+    bad = test_client.post("/api/applications/import", headers=headers, content=b"id,name\n1,x\n")
+    assert bad.status_code == 400
+
+    started = test_client.post(
+        "/api/applications/import",
+        headers={**headers, "Content-Type": "text/csv"},
+        content=f"id,status,revenue\n{first},approved,1500\n{second},paid,\n".encode(),
+    )
+    assert started.status_code == 202, started.text
+    job_id = started.json()["id"]
+
+    deadline = time.monotonic() + 5
+    job = started.json()
+    while job["status"] in ("queued", "running") and time.monotonic() < deadline:
+        time.sleep(0.02)
+        job = test_client.get(f"/api/applications/import/{job_id}", headers=headers).json()
+
+    assert job["status"] == "done", job
+    assert (job["rows_read"], job["rows_applied"], job["rows_failed"], job["percent"]) == (2, 1, 1, 100.0)
+    assert job["errors"][0]["line"] == 3
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT status, revenue FROM applications WHERE id = ?", (first,)).fetchone() == (
+            "approved",
+            1500.0,
+        )
+    assert test_client.get("/api/applications/import/unknown", headers=headers).status_code == 404
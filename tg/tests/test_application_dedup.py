@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+import importlib.util
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture()
+def db_env() -> dict[str, str]:
+    return {"APPLICATION_DEDUP_WINDOW_SECONDS": "3600"}
+
+
+@pytest.fixture()
+def dedup_db(db_module, db_path: Path):
+    spec = importlib.util.spec_from_file_location(
+        "application_dedup_migration",
+        Path(__file__).resolve().parents[1] / "migrations" / "versions" / "0007_application_dedup.py",
+    )
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    with sqlite3.connect(db_path) as conn:
+        migration.upgrade(conn)
+    return db_module
+
+
+def _application(telegram_id: int, phone: str, submitted_at: datetime | None = None) -> dict:
+    return {
+        "telegram_id": telegram_id,
+        "username": "",
+        "first_name": "Ivan",
+        "phone": phone,
+        "age": 25,
+        "citizenship": "Российская Федерация",
+        "source": "",
+        "submitted_at": (submitted_at or datetime.now()).strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def test_duplicates_return_existing_application(dedup_db) -> None:
+    db_module = dedup_db
+    async def scenario() -> None:
+        first = await db_module.save_application(_application(1, "+7 999 000-00-00"))
+        assert first.created
+
+        # Same account: answered from memory.
+        repeat = await db_module.save_application(_application(1, "+79990000001"))
+        assert repeat == (first.id, False)
+        assert db_module.APPLICATION_DUPLICATES.value(source="memory") == 1
+
+        # Same phone after a restart (empty memory): found through the index.
+        db_module.recent_applicants.clear()
+        same_phone = await db_module.save_application(_application(2, "+79990000000"))
+        assert same_phone == (first.id, False)
+        assert db_module.APPLICATION_DUPLICATES.value(source="database") == 1
+
+        other = await db_module.save_application(_application(3, "+79990000002"))
+        assert other.created
+
+    asyncio.run(scenario())
+    with sqlite3.connect(db_module.DB_PATH) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM applications").fetchone()[0] == 2
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM applications "
+            "WHERE phone_normalized = ? AND submitted_at >= ?",
+            ("79990000000", "2000-01-01"),
+        ).fetchall()
+    assert "idx_applications_phone_submitted" in " ".join(str(row) for row in plan)
+
+
+def test_application_outside_window_is_not_duplicate(dedup_db) -> None:
+    db_module = dedup_db
+    async def scenario() -> bool:
+        old = datetime.now() - timedelta(hours=2)
+        await db_module.save_application(_application(1, "+79990000000", submitted_at=old))
+        db_module.recent_applicants.clear()
+        return (await db_module.save_application(_application(1, "+79990000000"))).created
+
+    assert asyncio.run(scenario())
+
+
+def test_duplicate_found_late_in_window_expires_with_original_application(dedup_db) -> None:
+    db_module = dedup_db
+
+    async def scenario() -> None:
+        submitted = datetime.now() - timedelta(seconds=3500)
+        first = await db_module.save_application(_application(1, "+79990000000", submitted_at=submitted))
+        db_module.recent_applicants.clear()
+
+        repeat = await db_module.save_application(_application(1, "+79990000000"))
+        assert repeat == (first.id, False)
+        assert db_module.recent_applicants.lookup(1, None) == first.id
+
+        # The cached hit ends with the original application's window, even
+        # though it was only just remembered.
+        later = submitted.timestamp() + 3600 + 1
+        assert db_module.recent_applicants.lookup(1, None, now=later) is None
+
+    asyncio.run(scenario())
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import importlib
+import sqlite3
+import time
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture()
+def events(migrated_db: Path):
+    db_path = migrated_db
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany(
+            "INSERT INTO users (id, login, password_hash, name, role) VALUES (?, ?, '-', ?, 'investor')",
+            [(1, "one", "One"), (2, "two", "Two")],
+        )
+        conn.executemany(
+            "INSERT INTO campaigns (id, investor_id, name, budget) VALUES (?, ?, ?, 100)",
+            [(10, 1, "A"), (20, 2, "B")],
+        )
+
+    # import_module, not `from api import events`: the package attribute would
+    # still point at the module imported by an earlier test.
+    events_module = importlib.import_module("api.events")
+    applications = importlib.import_module("api.routers.applications")
+
+    yield events_module, applications.load_changed_after, db_path
+
+
+def _insert_application(db_path: Path, campaign_id: int) -> None:
+    # Written through a separate connection, like the bot process does.
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            """
+            INSERT INTO applications (telegram_id, phone, age, citizenship, submitted_at, campaign_id)
+            VALUES (?, '+79990000000', 25, 'RU', datetime('now'), ?)
+            """,
+            (campaign_id * 100, campaign_id),
+        )
+
+
+def test_watcher_publishes_other_process_changes_to_scoped_subscribers(events) -> None:
+    events_module, loader, db_path = events
+    bus = events_module.ApplicationEventBus(queue_size=10)
+    watcher = events_module.ApplicationWatcher(bus, loader)
+
+    async def scenario() -> None:
+        async with events_module.db_session() as db:
+            _insert_application(db_path, 10)
+            # The first tick only records the high-water marks.
+            assert await watcher.tick(db) == 0
+            admin = bus.subscribe(None)
+            investor_two = bus.subscribe(2)
+
+            assert await watcher.tick(db) == 0
+            _insert_application(db_path, 10)
+            _insert_application(db_path, 20)
+            with sqlite3.connect(db_path) as conn:
+                conn.execute("UPDATE applications SET contacted = 1 WHERE id = 1")
+            assert await watcher.tick(db) == 3
+            assert await watcher.tick(db) == 0
+
+        received = [admin.queue.get_nowait() for _ in range(3)]
+        assert [(e.kind, e.data["id"]) for e in received] == [
+            ("application.created", 2),
+            ("application.created", 3),
+            ("application.updated", 1),
+        ]
+        assert [e.event_id for e in received] == [2, 3, 4]
+        assert received[2].data["contacted"] is True
+
+        event = investor_two.queue.get_nowait()
+        assert (event.kind, event.investor_id, event.data["campaign_name"]) == ("application.created", 2, "B")
+        assert investor_two.queue.empty()
+        assert event.encode().startswith(b"id: 3\nevent: application.created\ndata: {")
+
+    asyncio.run(scenario())
+
+
+def test_slow_subscriber_gets_resync_instead_of_unbounded_buffer(events) -> None:
+    events_module, _, _ = events
+    bus = events_module.ApplicationEventBus(queue_size=2)
+    subscription = bus.subscribe(None)
+
+    for event_id in range(1, 6):
+        bus.publish(events_module.ApplicationEvent("application.created", event_id, 1, {}))
+
+    assert subscription.overflowed
+    assert subscription.queue.get_nowait() is events_module.RESYNC
+    assert subscription.queue.empty()
+
+
+def test_stream_ends_when_token_expires_or_user_is_deactivated(events, monkeypatch) -> None:
+    events_module, _, db_path = events
+    applications = importlib.import_module("api.routers.applications")
+
+    async def collect(session_expires_at: float) -> list[bytes]:
+        subscription = events_module.application_events.subscribe(1)
+        return [chunk async for chunk in applications._event_stream(subscription, 1, session_expires_at)]
+
+    # Default 15 s heartbeat: the stream still ends at the token's expiry.
+    chunks = asyncio.run(collect(time.time() + 0.2))
+    assert chunks == [b"retry: 5000\n\n", events_module.SESSION_EXPIRED.encode()]
+    assert events_module.application_events.subscriber_count == 0
+
+    monkeypatch.setattr(
+        applications,
+        "settings",
+        dataclasses.replace(applications.settings, stream_heartbeat_seconds=0.05),
+    )
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE users SET is_active = 0 WHERE id = 1")
+    chunks = asyncio.run(collect(time.time() + 3600))
+    assert chunks[-1] == events_module.SESSION_EXPIRED.encode()
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import sqlite3
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+
+def _load_snapshot_module():
+    tg_dir = Path(__file__).resolve().parents[1]
+    tg_dir_str = str(tg_dir)
+    if tg_dir_str not in sys.path:
+        sys.path.insert(0, tg_dir_str)
+
+    from backups import snapshot
+
+    return snapshot
+
+
+def _create_source_db(db_path: Path, rows: int = 500) -> None:
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("CREATE TABLE applications (id INTEGER PRIMARY KEY, phone TEXT NOT NULL)")
+        conn.executemany(
+            "INSERT INTO applications (phone) VALUES (?)",
+            [(f"+7900{i:07d}",) for i in range(rows)],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def test_snapshot_is_consistent_and_verified(tmp_path: Path) -> None:
+    snapshot = _load_snapshot_module()
+    db_path = tmp_path / "applications.db"
+    _create_source_db(db_path)
+
+    writer = sqlite3.connect(db_path)
+    try:
+        writer.execute("INSERT INTO applications (phone) VALUES ('+79990000000')")
+        writer.commit()
+        created = snapshot.create_snapshot(
+            db_path,
+            tmp_path / "backups",
+            pages_per_step=1,
+            step_sleep=0,
+        )
+    finally:
+        writer.close()
+
+    assert created.path.exists()
+    assert not list((tmp_path / "backups").glob("*.partial"))
+    assert snapshot.verify_snapshot(created.path) == []
+
+    with sqlite3.connect(created.path) as conn:
+        count = conn.execute("SELECT COUNT(*) FROM applications").fetchone()[0]
+    assert count == 501
+
+
+def test_verify_reports_corrupted_snapshot(tmp_path: Path) -> None:
+    snapshot = _load_snapshot_module()
+    broken = tmp_path / "applications-20240101-000000.db"
+    broken.write_bytes(b"not a sqlite database" * 100)
+
+    assert snapshot.verify_snapshot(broken) != []
+
+
+def test_rotation_keeps_recent_and_daily_snapshots(tmp_path: Path) -> None:
+    snapshot = _load_snapshot_module()
+    db_path = tmp_path / "applications.db"
+    backup_dir = tmp_path / "backups"
+    _create_source_db(db_path, rows=10)
+
+    base = datetime(2024, 5, 10, 12, 0, 0, tzinfo=timezone.utc)
+    moments = [
+        base - timedelta(days=3),
+        base - timedelta(days=2, hours=2),
+        base - timedelta(days=2),
+        base - timedelta(days=1),
+        base - timedelta(hours=1),
+        base,
+    ]
+    for moment in moments:
+        snapshot.create_snapshot(db_path, backup_dir, now=moment)
+
+    removed = snapshot.rotate_snapshots(backup_dir, keep_last=2, keep_daily=3)
+    kept = [item.created_at for item in snapshot.list_snapshots(backup_dir)]
+
+    assert kept == [base, base - timedelta(hours=1), base - timedelta(days=1), base - timedelta(days=2)]
+    assert len(removed) == 2
+
+
+def test_snapshots_in_the_same_second_do_not_clobber_each_other(tmp_path: Path) -> None:
+    snapshot = _load_snapshot_module()
+    db_path = tmp_path / "applications.db"
+    backup_dir = tmp_path / "backups"
+    _create_source_db(db_path, rows=10)
+
+    moment = datetime(2024, 5, 10, 12, 0, 0, 100, tzinfo=timezone.utc)
+    first = snapshot.create_snapshot(db_path, backup_dir, now=moment)
+    second = snapshot.create_snapshot(db_path, backup_dir, now=moment.replace(microsecond=200))
+    assert first.path != second.path
+    assert [item.created_at for item in snapshot.list_snapshots(backup_dir)] == [second.created_at, moment]
+
+    with pytest.raises(snapshot.BackupError, match="already exists"):
+        snapshot.create_snapshot(db_path, backup_dir, now=moment)
+
+    # A snapshot in progress under the same name is left alone.
+    in_progress = backup_dir / (snapshot.snapshot_name(moment.replace(microsecond=300)) + snapshot.PARTIAL_SUFFIX)
+    in_progress.write_bytes(b"being written")
+    with pytest.raises(snapshot.BackupError, match="being written"):
+        snapshot.create_snapshot(db_path, backup_dir, now=moment.replace(microsecond=300))
+    assert in_progress.read_bytes() == b"being written"
+
+    # Names from before microseconds were added are still listed and rotated.
+    (backup_dir / "applications-20240101-000000.db").write_bytes(first.path.read_bytes())
+    assert snapshot.list_snapshots(backup_dir)[-1].created_at == datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def test_backup_dir_holds_only_snapshots_after_create_and_rotate(tmp_path: Path) -> None:
+    snapshot = _load_snapshot_module()
+    db_path = tmp_path / "applications.db"
+    backup_dir = tmp_path / "backups"
+    _create_source_db(db_path, rows=10)
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("PRAGMA journal_mode=WAL").fetchone() == ("wal",)
+
+    base = datetime(2024, 5, 10, 12, 0, 0, tzinfo=timezone.utc)
+    created = [
+        snapshot.create_snapshot(db_path, backup_dir, now=base + timedelta(hours=hours))
+        for hours in range(3)
+    ]
+    with sqlite3.connect(created[-1].path) as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone() == ("delete",)
+    assert snapshot.verify_snapshot(created[-1].path) == []
+    assert sorted(path.name for path in backup_dir.iterdir()) == sorted(item.path.name for item in created)
+
+    # Left behind by snapshots taken while copies stayed in WAL mode.
+    (backup_dir / "applications-20240101-000000.db.partial-wal").write_bytes(b"")
+    (backup_dir / "applications-20240101-000000.db.partial-shm").write_bytes(b"")
+    (backup_dir / (created[0].path.name + "-wal")).write_bytes(b"")
+    snapshot.rotate_snapshots(backup_dir, keep_last=1, keep_daily=0)
+    assert [path.name for path in backup_dir.iterdir()] == [created[-1].path.name]
+
+
+def test_interrupted_snapshot_releases_its_name(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    snapshot = _load_snapshot_module()
+    db_path = tmp_path / "applications.db"
+    backup_dir = tmp_path / "backups"
+    _create_source_db(db_path, rows=10)
+    moment = datetime(2024, 5, 10, 12, 0, 0, tzinfo=timezone.utc)
+
+    def interrupted(*args, **kwargs) -> None:
+        raise KeyboardInterrupt
+
+    with monkeypatch.context() as patch:
+        patch.setattr(snapshot, "_copy_database", interrupted)
+        with pytest.raises(KeyboardInterrupt):
+            snapshot.create_snapshot(db_path, backup_dir, now=moment)
+    assert list(backup_dir.iterdir()) == []
+
+    assert snapshot.create_snapshot(db_path, backup_dir, now=moment).path.exists()
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+import importlib.util
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture()
+def campaigns_db(db_module, db_path: Path):
+    spec = importlib.util.spec_from_file_location(
+        "table_versions_migration",
+        Path(__file__).resolve().parents[1] / "migrations" / "versions" / "0006_table_versions.py",
+    )
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            """
+            CREATE TABLE campaigns (
+                id INTEGER PRIMARY KEY, investor_id INTEGER NOT NULL, name TEXT NOT NULL,
+                budget REAL NOT NULL, status TEXT NOT NULL DEFAULT 'active',
+                created_at TEXT NOT NULL DEFAULT (datetime('now'))
+            )
+            """
+        )
+        migration.upgrade(conn)
+        conn.execute("INSERT INTO campaigns (id, investor_id, name, budget) VALUES (5, 1, 'A', 100)")
+    return db_module
+
+
+def _execute(db_path: Path, sql: str) -> None:
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(sql)
+
+
+def test_campaign_cache_reloads_only_when_campaigns_change(campaigns_db, db_path: Path) -> None:
+    db_module = campaigns_db
+    cache = db_module.CampaignCache(check_interval=0)
+
+    async def scenario() -> None:
+        assert (await db_module.get_active_campaign(5)) is not None
+        assert (await cache.get(5))["name"] == "A"
+        assert await cache.get(999) is None
+        reloads = db_module.CAMPAIGN_CACHE_RELOADS.value()
+
+        _execute(
+            db_path,
+            "INSERT INTO applications (telegram_id, phone, age, citizenship, submitted_at) "
+            "VALUES (1, '+70000000000', 20, 'RU', datetime('now'))",
+        )
+        assert (await cache.get(5))["status"] == "active"
+        assert db_module.CAMPAIGN_CACHE_RELOADS.value() == reloads
+
+        _execute(db_path, "UPDATE campaigns SET status = 'paused' WHERE id = 5")
+        assert (await cache.get(5))["status"] == "paused"
+        assert db_module.CAMPAIGN_CACHE_RELOADS.value() == reloads + 1
+
+    asyncio.run(scenario())
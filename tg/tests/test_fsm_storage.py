@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+import sqlite3
+import time
+from pathlib import Path
+
+import pytest
+from aiogram.fsm.storage.base import StorageKey
+
+
+@pytest.fixture()
+def storage_module(db_module):
+    return importlib.import_module("services.fsm_storage")
+
+
+KEY = StorageKey(bot_id=1, chat_id=10, user_id=10)
+
+
+def _rows(db_path: Path) -> list[tuple]:
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute("SELECT key, state, data FROM fsm_storage").fetchall()
+
+
+def test_writes_are_coalesced_and_survive_restart(storage_module, tmp_path: Path) -> None:
+    async def scenario() -> tuple[int, str | None, dict]:
+        storage = storage_module.SQLiteStorage()
+        await storage.set_state(KEY, "ApplicationForm:waiting_for_phone")
+        await storage.update_data(KEY, {"source": "ads"})
+        await storage.update_data(KEY, {"phone": "+79990000000"})
+        assert _rows(tmp_path / "applications.db") == []
+        written = await storage.flush()
+        await storage.close()
+
+        restarted = storage_module.SQLiteStorage()
+        state = await restarted.get_state(KEY)
+        data = await restarted.get_data(KEY)
+        await restarted.close()
+        return written, state, data
+
+    written, state, data = asyncio.run(scenario())
+    assert written == 1
+    assert state == "ApplicationForm:waiting_for_phone"
+    assert data == {"source": "ads", "phone": "+79990000000"}
+
+
+def test_clear_deletes_row_and_ttl_expires_sessions(storage_module, tmp_path: Path) -> None:
+    async def scenario() -> None:
+        storage = storage_module.SQLiteStorage(ttl_seconds=60, cache_size=1)
+        other = StorageKey(bot_id=1, chat_id=20, user_id=20)
+        await storage.set_state(KEY, "ApplicationForm:waiting_for_age")
+        await storage.set_state(other, "ApplicationForm:waiting_for_name")
+        await storage.flush()
+
+        await storage.set_state(KEY, None)
+        await storage.set_data(KEY, {})
+        await storage.flush()
+        assert [row[0] for row in _rows(tmp_path / "applications.db")] == ["fsm:1:20:20:default"]
+
+        assert await storage.sweep(now=time.time() + 120) == 1
+        assert _rows(tmp_path / "applications.db") == []
+        assert await storage.get_state(other) is None
+        await storage.close()
+
+    asyncio.run(scenario())
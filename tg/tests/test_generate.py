@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+
+
+def _load_generator():
+    tg_dir = str(Path(__file__).resolve().parents[1])
+    if tg_dir not in sys.path:
+        sys.path.insert(0, tg_dir)
+
+    for module_name in list(sys.modules):
+        if module_name.startswith("migrations."):
+            sys.modules.pop(module_name, None)
+
+    from migrations import generate
+
+    return generate
+
+
+def _dump(path: Path) -> list[tuple]:
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT * FROM applications ORDER BY id").fetchall()
+    finally:
+        conn.close()
+
+
+def test_generator_is_deterministic_and_keeps_schema(tmp_path: Path) -> None:
+    generate = _load_generator()
+    config = generate.GeneratorConfig(
+        investors=3,
+        campaigns_per_investor=2,
+        applications=2000,
+        refresh_tokens_per_user=2,
+        password_hash="not-a-real-hash",
+        batch_size=300,
+        commit_every=700,
+        end=datetime(2026, 1, 31, 23, 59, 59),
+    )
+
+    first = generate.create_database(tmp_path / "a.db", config)
+    generate.create_database(tmp_path / "b.db", config)
+
+    assert first.applications == 2000
+    assert first.refresh_tokens == first.users * 2
+    assert _dump(tmp_path / "a.db") == _dump(tmp_path / "b.db")
+
+    conn = sqlite3.connect(tmp_path / "a.db")
+    try:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert {"idx_applications_campaign_id", "idx_applications_phone_submitted"} <= indexes
+        orphans = conn.execute(
+            """
+            SELECT COUNT(*) FROM applications a
+            LEFT JOIN campaigns c ON c.id = a.campaign_id
+            WHERE a.campaign_id IS NOT NULL AND c.id IS NULL
+            """
+        ).fetchone()[0]
+        assert orphans == 0
+        assert conn.execute("SELECT MAX(submitted_at) FROM applications").fetchone()[0] <= "2026-01-31 23:59:59"
+    finally:
+        conn.close()
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+TG_DIR = Path(__file__).resolve().parents[1]
+if str(TG_DIR) not in sys.path:
+    sys.path.insert(0, str(TG_DIR))
+
+from telemetry.loop_monitor import LOOP_BLOCKED, LoopLagMonitor  # noqa: E402
+
+
+def _blocking_call() -> None:
+    time.sleep(0.3)
+
+
+def test_blocking_call_is_measured_and_its_stack_captured() -> None:
+    async def scenario() -> LoopLagMonitor:
+        monitor = LoopLagMonitor(interval=0.02, block_threshold=0.1, capture_stacks=True)
+        monitor.start()
+        await asyncio.sleep(0.05)
+        _blocking_call()
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+        return monitor
+
+    blocked_before = LOOP_BLOCKED.value()
+    monitor = asyncio.run(scenario())
+
+    assert LOOP_BLOCKED.value() > blocked_before
+    assert monitor.last_stack is not None
+    assert "_blocking_call" in monitor.last_stack
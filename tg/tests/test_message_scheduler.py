@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import SendMessage
+
+TG_DIR = Path(__file__).resolve().parents[1]
+if str(TG_DIR) not in sys.path:
+    sys.path.insert(0, str(TG_DIR))
+
+from services.sender import MessageScheduler, TokenBucket  # noqa: E402
+
+
+class FakeBot:
+    def __init__(self, retry_after_first: int = 0) -> None:
+        self.calls: list[tuple[float, int, str]] = []
+        self._retry_after_first = retry_after_first
+
+    async def __call__(self, method: SendMessage) -> str:
+        if self._retry_after_first:
+            retry_after, self._retry_after_first = self._retry_after_first, 0
+            raise TelegramRetryAfter(method=method, message="Too Many Requests", retry_after=retry_after)
+        self.calls.append((time.monotonic(), int(method.chat_id), method.text))
+        return method.text
+
+
+def test_token_bucket_delay() -> None:
+    bucket = TokenBucket(rate=2.0, capacity=1.0)
+    now = time.monotonic()
+    assert bucket.delay(now) == 0.0
+    bucket.consume(now)
+    assert 0.49 < bucket.delay(now) <= 0.5
+
+
+def test_scheduler_keeps_per_chat_order_and_rate() -> None:
+    async def scenario() -> FakeBot:
+        bot = FakeBot()
+        scheduler = MessageScheduler(bot, global_rate=100, chat_rate=20, chat_burst=1)
+        scheduler.start()
+        futures = [scheduler.submit(SendMessage(chat_id=1, text=f"a{i}")) for i in range(5)]
+        futures += [scheduler.submit(SendMessage(chat_id=2, text=f"b{i}")) for i in range(5)]
+        assert scheduler.pending == 10
+        await asyncio.gather(*futures)
+        await scheduler.stop()
+        return bot
+
+    bot = asyncio.run(scenario())
+    chat_1 = [call for call in bot.calls if call[1] == 1]
+    assert [text for _, _, text in chat_1] == [f"a{i}" for i in range(5)]
+    gaps = [later[0] - earlier[0] for earlier, later in zip(chat_1, chat_1[1:])]
+    assert min(gaps) >= 0.04
+
+
+def test_scheduler_honours_retry_after() -> None:
+    async def scenario() -> tuple[FakeBot, float]:
+        bot = FakeBot(retry_after_first=1)
+        scheduler = MessageScheduler(bot)
+        scheduler.start()
+        started = time.monotonic()
+        result = await scheduler.submit(SendMessage(chat_id=7, text="hello"))
+        await scheduler.stop()
+        assert result == "hello"
+        return bot, time.monotonic() - started
+
+    bot, elapsed = asyncio.run(scenario())
+    assert len(bot.calls) == 1
+    assert elapsed >= 1.0
+
+
+class FloodBot:
+    """First message to each chat in `flooded` gets RetryAfter."""
+
+    def __init__(self, flooded: set[int], retry_after: int = 1) -> None:
+        self.flooded = set(flooded)
+        self.retry_after = retry_after
+        self.sent_at: dict[str, float] = {}
+
+    async def __call__(self, method: SendMessage) -> str:
+        if method.chat_id in self.flooded:
+            self.flooded.discard(method.chat_id)
+            raise TelegramRetryAfter(method=method, message="Too Many Requests", retry_after=self.retry_after)
+        self.sent_at[method.text] = time.monotonic()
+        return method.text
+
+
+def test_retry_after_from_several_chats_pauses_every_chat() -> None:
+    async def scenario(flooded: set[int]) -> float:
+        bot = FloodBot(flooded)
+        scheduler = MessageScheduler(bot, flood_chats=2, flood_window=5)
+        scheduler.start()
+        started = time.monotonic()
+        futures = [scheduler.submit(SendMessage(chat_id=chat, text=f"to {chat}")) for chat in (1, 2)]
+        await asyncio.sleep(0.1)
+        # Chat 3 never got RetryAfter itself.
+        await scheduler.submit(SendMessage(chat_id=3, text="to 3"))
+        await asyncio.gather(*futures)
+        await scheduler.stop()
+        return bot.sent_at["to 3"] - started
+
+    # One chat flood-limited: the others keep sending.
+    assert asyncio.run(scenario({1})) < 0.5
+    # Two chats within the window: the whole bot waits out retry_after.
+    assert asyncio.run(scenario({1, 2})) >= 0.9
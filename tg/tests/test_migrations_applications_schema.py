@@ -117,7 +117,8 @@ def test_migration_repairs_schema_when_0001_applied_before_table_creation(tmp_pa
         conn.commit()
 
         applied = migrate_to_latest(conn)
-        assert applied == ["0002", "0003"]
+        assert "0001" not in applied
+        assert applied[:2] == ["0002", "0003"]
 
         columns = _application_columns(conn)
         assert "campaign_id" in columns
@@ -131,3 +132,20 @@ def test_migration_repairs_schema_when_0001_applied_before_table_creation(tmp_pa
         assert row == (7, "new")
     finally:
         conn.close()
+
+
+def test_migrate_to_moves_down_and_back_up(tmp_path: Path) -> None:
+    _load_migrator()
+    from migrations.runner import _get_applied_revisions, _load_migrations, migrate_to
+
+    revisions = [m.revision for m in _load_migrations()]
+    conn = sqlite3.connect(tmp_path / "applications.db")
+    conn.execute("PRAGMA foreign_keys = ON")
+    try:
+        assert migrate_to(conn, revisions[-1]) == revisions
+        assert migrate_to(conn, "0002") == list(reversed(revisions[2:]))
+        assert _get_applied_revisions(conn) == ["0001", "0002"]
+        assert migrate_to(conn, "0002") == []
+        assert migrate_to(conn, revisions[-1]) == revisions[2:]
+    finally:
+        conn.close()
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+
+class FakeSender:
+    """Stands in for MessageScheduler: `submit` returns a future per message."""
+
+    def __init__(self, fail_chats: tuple[int, ...] = (), on_send=None) -> None:
+        self.fail_chats = fail_chats
+        self.on_send = on_send
+        self.sent: list[str] = []
+
+    def submit(self, method):
+        return asyncio.ensure_future(self._send(method))
+
+    async def _send(self, method) -> str:
+        if method.chat_id in self.fail_chats:
+            raise RuntimeError("Forbidden: bot was blocked by the user")
+        self.sent.append(method.text)
+        if self.on_send is not None:
+            await self.on_send(method)
+        return method.text
+
+
+@pytest.fixture()
+def outbox(db_module):
+    return db_module, importlib.import_module("services.outbox")
+
+
+def _application(telegram_id: int) -> dict:
+    return {
+        "telegram_id": telegram_id,
+        "username": "",
+        "first_name": "Ivan",
+        "phone": f"+7999000{telegram_id:04d}",
+        "age": 25,
+        "citizenship": "RU",
+        "source": "",
+        "submitted_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def _notification(chat_id: int | None, text: str) -> dict:
+    return {"kind": "new_application", "chat_id": chat_id, "payload": {"text": text}}
+
+
+def _outbox_rows(db_path: Path) -> list[tuple]:
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(
+            """
+            SELECT status, attempts, last_error IS NOT NULL,
+                   CAST(strftime('%s', next_attempt_at) - strftime('%s', 'now') AS INTEGER)
+            FROM notification_outbox ORDER BY id
+            """
+        ).fetchall()
+
+
+def test_application_and_alert_are_written_in_one_transaction(outbox, db_path: Path) -> None:
+    db_module, _ = outbox
+
+    async def scenario() -> None:
+        saved = await db_module.save_application(_application(1), _notification(100, "new"))
+        assert saved.created
+        # chat_id is NOT NULL: the failing outbox insert must take the
+        # application down with it.
+        with pytest.raises(sqlite3.IntegrityError):
+            await db_module.save_application(_application(2), _notification(None, "broken"))
+
+    asyncio.run(scenario())
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT telegram_id FROM applications").fetchall() == [(1,)]
+        assert conn.execute("SELECT application_id FROM notification_outbox").fetchall() == [(1,)]
+
+
+def test_failed_alert_is_retried_with_backoff_then_given_up(outbox, db_path: Path) -> None:
+    db_module, outbox_module = outbox
+    sender = FakeSender(fail_chats=(200,))
+    worker = outbox_module.OutboxWorker(sender, max_attempts=3, base_backoff=5, max_backoff=8)
+    assert [worker._backoff(attempt) for attempt in (1, 2, 3)] == [5, 8, 8]
+
+    async def scenario() -> None:
+        await db_module.save_application(_application(1), _notification(100, "ok"))
+        await db_module.save_application(_application(2), _notification(200, "blocked"))
+        assert await worker.drain_once() == 2
+        assert sender.sent == ["ok"]
+        # Not due yet: the retry waits for its backoff.
+        assert await worker.drain_once() == 0
+
+    asyncio.run(scenario())
+    sent, retry = _outbox_rows(db_path)
+    assert sent[:2] == ("sent", 1)
+    assert retry[:3] == ("pending", 1, 1) and 4 <= retry[3] <= 5
+
+    async def retry_until_given_up() -> None:
+        for _ in range(2):
+            with sqlite3.connect(db_path) as conn:
+                conn.execute("UPDATE notification_outbox SET next_attempt_at = datetime('now') WHERE id = 2")
+            assert await worker.drain_once() == 1
+
+    asyncio.run(retry_until_given_up())
+    assert _outbox_rows(db_path)[1][:3] == ("failed", 3, 1)
+    assert outbox_module.OUTBOX_PENDING.value() == 0
+
+
+def test_wake_during_drain_delivers_without_waiting_for_poll(outbox) -> None:
+    db_module, outbox_module = outbox
+
+    async def scenario() -> list[str]:
+        delivered = asyncio.Event()
+        worker: outbox_module.OutboxWorker
+
+        async def on_send(method) -> None:
+            if method.text == "first":
+                # Committed and announced while the worker is mid-drain.
+                await db_module.save_application(_application(2), _notification(100, "second"))
+                worker.wake()
+            else:
+                delivered.set()
+
+        sender = FakeSender(on_send=on_send)
+        worker = outbox_module.OutboxWorker(sender, poll_interval=60)
+        await db_module.save_application(_application(1), _notification(100, "first"))
+        worker.start()
+        try:
+            await asyncio.wait_for(delivered.wait(), timeout=5)
+        finally:
+            await worker.stop()
+        return sender.sent
+
+    assert asyncio.run(scenario()) == ["first", "second"]
+    # stop() let the batch in progress mark its row instead of cancelling it.
+    assert [row[0] for row in _outbox_rows(db_module.DB_PATH)] == ["sent", "sent"]
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+import logging
+import time
+
+import pytest
+
+
+@pytest.fixture()
+def db_env() -> dict[str, str]:
+    return {"DB_SLOW_QUERY_MS": "0"}
+
+
+def _load_db():
+    return importlib.import_module("database.db"), importlib.import_module("database.instrumentation")
+
+
+def test_n_plus_one_is_reported_and_slow_queries_are_explained(db_path, caplog):
+    db, instrumentation = _load_db()
+
+    async def scenario() -> None:
+        async with db.connect() as conn:
+            await conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+            await conn.executemany("INSERT INTO items (name) VALUES (?)", [("a",), ("b",), ("c",)])
+            await conn.commit()
+
+            with instrumentation.assert_max_queries(1) as tracker:
+                cursor = await conn.execute("SELECT id, name FROM items WHERE id IN (1, 2, 3)")
+                assert len(await cursor.fetchall()) == 3
+            assert tracker.repeated() == []
+
+            with pytest.raises(AssertionError, match="3x SELECT name FROM items WHERE id = \\?"):
+                with instrumentation.assert_max_queries(2):
+                    for item_id in (1, 2, 3):
+                        await conn.execute("SELECT name FROM items WHERE id = ?", (item_id,))
+
+    with caplog.at_level(logging.WARNING, logger="database.instrumentation"):
+        asyncio.run(scenario())
+
+    slow = [r.getMessage() for r in caplog.records if "WHERE id = ?" in r.getMessage()]
+    # Every execution is logged, the plan only the first time.
+    assert len(slow) == 3
+    assert "plan:" in slow[0] and "SEARCH items" in slow[0]
+    assert all("plan:" not in message for message in slow[1:])
+
+
+def test_statement_time_excludes_event_loop_lag(db_path):
+    db, instrumentation = _load_db()
+
+    async def scenario() -> float:
+        async with db.connect() as conn:
+            with instrumentation.track_queries() as tracker:
+                query = asyncio.create_task(conn.execute("SELECT 1"))
+                await asyncio.sleep(0)
+                # The loop is blocked while the worker thread runs the query.
+                time.sleep(0.3)
+                await query
+            return tracker.total_seconds
+
+    assert asyncio.run(scenario()) < 0.1
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture()
+def importer(migrated_db: Path):
+    db_path = migrated_db
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("INSERT INTO users (id, login, password_hash, name, role) VALUES (1, 'one', '-', 'One', 'investor')")
+        conn.execute("INSERT INTO campaigns (id, investor_id, name, budget) VALUES (10, 1, 'A', 100)")
+        conn.executemany(
+            """
+            INSERT INTO applications (telegram_id, phone, age, citizenship, submitted_at, campaign_id)
+            VALUES (?, '+79990000000', 25, 'RU', datetime('now'), ?)
+            """,
+            [(1, 10), (2, 10), (3, None)],
+        )
+
+    yield importlib.import_module("reconciliation.importer"), db_path
+
+
+def _write_csv(tmp_path: Path, text: str) -> Path:
+    path = tmp_path / "payout.csv"
+    path.write_bytes(text.encode("utf-8-sig"))
+    return path
+
+
+def _applications(db_path: Path) -> list[tuple]:
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute("SELECT id, COALESCE(status, 'new'), revenue FROM applications ORDER BY id").fetchall()
+
+
+def test_import_applies_valid_rows_in_batches_and_reports_the_rest(importer, tmp_path: Path) -> None:
+    module, db_path = importer
+    path = _write_csv(
+        tmp_path,
+        "application_id;status;revenue\n"
+        "1;Approved;2 500,50\n"
+        "2;;100\n"
+        "\n"
+        "3;paid;1\n"
+        "4;approved;1\n"
+        "1;rejected;\n"
+        "x;approved;1\n"
+        "2;;-5\n",
+    )
+
+    progress = asyncio.run(module.import_csv(path, batch_size=2, batch_pause=0))
+
+    assert (progress.rows_read, progress.rows_applied, progress.rows_failed) == (7, 2, 5)
+    assert [(e.line, e.id, e.error) for e in progress.errors] == [
+        (5, "3", "Unknown status 'paid'; expected one of: new, in_progress, approved, rejected."),
+        (6, "4", "Application not found."),
+        (7, "1", "Duplicate id in file."),
+        (8, "x", "Invalid id."),
+        (9, "2", "Revenue must be a non-negative number."),
+    ]
+    assert progress.percent == 100.0
+    assert _applications(db_path) == [(1, "approved", 2500.5), (2, "new", 100.0), (3, "new", None)]
+
+
+def test_import_scope_dry_run_and_bad_header(importer, tmp_path: Path) -> None:
+    module, db_path = importer
+    path = _write_csv(tmp_path, "id,revenue\n1,10\n3,20\n")
+
+    dry = asyncio.run(module.import_csv(path, investor_id=1, dry_run=True))
+    assert (dry.rows_applied, [e.error for e in dry.errors]) == (1, ["You cannot update this application."])
+    assert _applications(db_path)[0] == (1, "new", None)
+
+    scoped = asyncio.run(module.import_csv(path, investor_id=1))
+    assert scoped.rows_applied == 1
+    assert [row[2] for row in _applications(db_path)] == [10.0, None, None]
+
+    with pytest.raises(module.ImportFormatError, match="status or revenue"):
+        asyncio.run(module.import_csv(_write_csv(tmp_path, "id,name\n1,x\n")))
+
+
+def test_import_job_does_not_count_against_the_submitting_request(importer, tmp_path: Path) -> None:
+    _, db_path = importer
+    jobs = importlib.import_module("reconciliation.jobs")
+    instrumentation = importlib.import_module("database.instrumentation")
+    path = _write_csv(tmp_path, "id,status,revenue\n1,approved,100\n2,approved,200\n")
+
+    async def scenario():
+        manager = jobs.ImportJobManager(batch_size=1, batch_pause=0)
+        with instrumentation.track_queries() as tracker:
+            job = manager.submit(path, owner_id=1, investor_id=None)
+        await job.task
+        return job, tracker
+
+    job, tracker = asyncio.run(scenario())
+    assert job.status == jobs.DONE and job.progress.rows_applied == 2
+    assert tracker.count == 0
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+import logging
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture()
+def db_env() -> dict[str, str]:
+    return {"DB_BUSY_TIMEOUT_MS": "50"}
+
+
+@pytest.fixture()
+def checkpoint_module(db_module):
+    return importlib.import_module("database.checkpoint")
+
+
+def _commit(db_path: Path, rows: int = 20) -> None:
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany(
+            """
+            INSERT INTO applications (telegram_id, phone, age, citizenship, submitted_at)
+            VALUES (?, '+70000000000', 20, 'RU', datetime('now'))
+            """,
+            [(index,) for index in range(rows)],
+        )
+
+
+def test_passive_while_busy_and_truncate_once_idle(checkpoint_module, db_module, db_path: Path) -> None:
+    manager = checkpoint_module.WalCheckpointManager(max_wal_bytes=0)
+    truncate_runs = checkpoint_module.CHECKPOINT_DURATION.count(mode="truncate")
+    passive_runs = checkpoint_module.CHECKPOINT_DURATION.count(mode="passive")
+
+    async def scenario() -> list[str]:
+        modes = []
+        async with db_module.connect() as db:
+            _commit(db_path)
+            modes.append(await manager.tick(db))
+            # Another connection committed since the previous tick.
+            _commit(db_path)
+            modes.append(await manager.tick(db))
+            assert checkpoint_module.WAL_SIZE_BYTES.value() > 0
+            # Nothing committed since: the WAL is reset to zero bytes.
+            modes.append(await manager.tick(db))
+            assert db_module.wal_path().stat().st_size == 0
+            modes.append(await manager.tick(db))
+        return modes
+
+    assert asyncio.run(scenario()) == ["passive", "passive", "truncate", "skip"]
+    assert checkpoint_module.WAL_SIZE_BYTES.value() == 0
+    assert checkpoint_module.CHECKPOINT_DURATION.count(mode="passive") == passive_runs + 2
+    assert checkpoint_module.CHECKPOINT_DURATION.count(mode="truncate") == truncate_runs + 1
+
+
+def test_oversized_wal_is_truncated_under_load_and_warns_when_blocked(
+    checkpoint_module,
+    db_module,
+    db_path: Path,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    manager = checkpoint_module.WalCheckpointManager(max_wal_bytes=1)
+    busy_before = checkpoint_module.CHECKPOINT_BUSY.value(mode="truncate")
+
+    async def scenario() -> None:
+        async with db_module.connect() as db:
+            _commit(db_path)
+            assert await manager.tick(db) == "truncate"
+            assert db_module.wal_path().stat().st_size == 0
+
+            _commit(db_path)
+            reader = sqlite3.connect(db_path, isolation_level=None)
+            try:
+                # An open read transaction keeps the WAL in use.
+                reader.execute("BEGIN")
+                reader.execute("SELECT COUNT(*) FROM applications").fetchone()
+                with caplog.at_level(logging.WARNING, logger="database.checkpoint"):
+                    assert await manager.tick(db) == "truncate"
+            finally:
+                reader.close()
+            assert db_module.wal_path().stat().st_size > 0
+
+    asyncio.run(scenario())
+    assert checkpoint_module.CHECKPOINT_BUSY.value(mode="truncate") == busy_before + 1
+    assert "TRUNCATE checkpoint was blocked" in caplog.text
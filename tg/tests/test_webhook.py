@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+
+import httpx
+from aiogram import Bot, Dispatcher, Router
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.types import Message
+from aiohttp import web
+
+TG_DIR = Path(__file__).resolve().parents[1]
+if str(TG_DIR) not in sys.path:
+    sys.path.insert(0, str(TG_DIR))
+
+from services.webhook import SECRET_HEADER, UpdateProcessor, create_webhook_app  # noqa: E402
+
+TOKEN = "42:TEST"
+SECRET = "test-secret"
+
+
+class FakeTelegram:
+    """Local stand-in for api.telegram.org that records sendMessage calls."""
+
+    def __init__(self) -> None:
+        self.sent: list[tuple[int, str]] = []
+        self._runner: web.AppRunner | None = None
+        self.base_url = ""
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        form = await request.post()
+        if method.lower() == "sendmessage":
+            self.sent.append((int(form["chat_id"]), str(form["text"])))
+        return web.json_response(
+            {
+                "ok": True,
+                "result": {
+                    "message_id": len(self.sent),
+                    "date": 0,
+                    "chat": {"id": int(form.get("chat_id", 0)), "type": "private"},
+                    "text": str(form.get("text", "")),
+                },
+            }
+        )
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}"
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+
+def _update(update_id: int, user_id: int, text: str) -> dict:
+    user = {"id": user_id, "is_bot": False, "first_name": "U"}
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": user_id, "type": "private"},
+            "from": user,
+            "text": text,
+        },
+    }
+
+
+def test_webhook_dedupes_and_keeps_per_user_order() -> None:
+    async def scenario() -> tuple[FakeTelegram, list[int]]:
+        telegram = FakeTelegram()
+        await telegram.start()
+        bot = Bot(TOKEN, session=AiohttpSession(api=TelegramAPIServer.from_base(telegram.base_url)))
+
+        router = Router()
+
+        @router.message()
+        async def echo(message: Message) -> None:
+            # Earlier updates sleep longer: without ordering they would finish last.
+            await asyncio.sleep(0.05 if message.text.endswith("0") else 0.0)
+            await message.answer(message.text)
+
+        dp = Dispatcher()
+        dp.include_router(router)
+        processor = UpdateProcessor(dp, bot, max_concurrency=4)
+        app = create_webhook_app(processor, path="/hook", secret_token=SECRET)
+
+        statuses = []
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bot") as client:
+            bad = await client.post("/hook", json=_update(1, 7, "x"), headers={SECRET_HEADER: "nope"})
+            statuses.append(bad.status_code)
+            non_ascii = await client.post("/hook", json=_update(1, 7, "x"), headers={SECRET_HEADER: "сек".encode()})
+            statuses.append(non_ascii.status_code)
+            headers = {SECRET_HEADER: SECRET}
+            for update_id, user_id, text in [(1, 7, "a0"), (2, 7, "a1"), (1, 7, "a0"), (3, 8, "b0")]:
+                response = await client.post("/hook", json=_update(update_id, user_id, text), headers=headers)
+                statuses.append(response.status_code)
+
+        await processor.stop()
+        await bot.session.close()
+        await telegram.stop()
+        return telegram, statuses
+
+    telegram, statuses = asyncio.run(scenario())
+    assert statuses == [403, 403, 200, 200, 200, 200]
+    assert [text for chat_id, text in telegram.sent if chat_id == 7] == ["a0", "a1"]
+    assert sorted(telegram.sent) == [(7, "a0"), (7, "a1"), (8, "b0")]
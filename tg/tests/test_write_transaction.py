@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+INSERT_SQL = (
+    "INSERT INTO applications (telegram_id, phone, age, citizenship, submitted_at) "
+    "VALUES (1, '+70000000000', 20, 'RU', datetime('now'))"
+)
+
+
+@pytest.fixture()
+def db_env() -> dict[str, str]:
+    return {"DB_BUSY_TIMEOUT_MS": "50"}
+
+
+def _count_rows(db_path: Path) -> int:
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM applications").fetchone()[0]
+
+
+def test_write_transaction_times_out_while_other_writer_holds_lock(db_module) -> None:
+    blocker = sqlite3.connect(db_module.DB_PATH, isolation_level=None)
+    blocker.execute("BEGIN IMMEDIATE")
+
+    async def scenario() -> None:
+        async with db_module.connect() as conn:
+            with pytest.raises(db_module.DatabaseBusyError):
+                async with db_module.write_transaction(conn, site="test", deadline_ms=200):
+                    await conn.execute(INSERT_SQL)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        blocker.execute("ROLLBACK")
+        blocker.close()
+
+    assert db_module.LOCK_TIMEOUTS.value(site="test") == 1
+    assert _count_rows(db_module.DB_PATH) == 0
+
+
+def test_write_transaction_retries_until_lock_is_released(db_module) -> None:
+    blocker = sqlite3.connect(db_module.DB_PATH, isolation_level=None, check_same_thread=False)
+    blocker.execute("BEGIN IMMEDIATE")
+
+    async def scenario() -> None:
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.2, blocker.execute, "COMMIT")
+        async with db_module.connect() as conn:
+            async with db_module.write_transaction(conn, site="retry", deadline_ms=5000):
+                await conn.execute(INSERT_SQL)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        blocker.close()
+
+    assert db_module.LOCK_RETRIES.value(site="retry") >= 1
+    assert _count_rows(db_module.DB_PATH) == 1
+
+
+def test_write_transaction_rolls_back_on_error(db_module) -> None:
+    async def scenario() -> None:
+        async with db_module.connect() as conn:
+            with pytest.raises(RuntimeError):
+                async with db_module.write_transaction(conn, site="rollback"):
+                    await conn.execute(INSERT_SQL)
+                    raise RuntimeError("boom")
+
+    asyncio.run(scenario())
+    assert _count_rows(db_module.DB_PATH) == 0